@@ -2,7 +2,7 @@ from django.contrib import admin
 
 from common.utils.explorer import get_explorer_link
 
-from .models import AtomicTx, ChainSwap
+from .models import AtomicTx, ChainSwap, IndexedUTXO
 
 
 @admin.register(AtomicTx)
@@ -39,3 +39,13 @@ class ChainSwapAdmin(admin.ModelAdmin):
         if obj.export_exists():
             return obj.export_tx.amount
         return None
+
+
+@admin.register(IndexedUTXO)
+class IndexedUTXOAdmin(admin.ModelAdmin):
+    list_filter = ('chain', 'source_chain', 'spent')
+    search_fields = ('tx_id', 'address')
+    readonly_fields = ('created_date', 'modified_date', 'tx_id', 'output_index', 'chain', 'source_chain', 'address',
+                       'asset_id', 'amount', 'reserved_by', 'spent', 'spent_by')
+    exclude = ('raw',)
+    list_display = ('id', 'chain', 'source_chain', 'address', 'amount', 'reserved_by', 'spent')
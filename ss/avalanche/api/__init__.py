@@ -1 +1,2 @@
-from .api import AvalancheClient  # noqa
+from .api import (AsyncAvalancheClient, AvalancheBatch, AvalancheClient, create_async_avalanche_client,  # noqa
+                  get_avalanche_client)
@@ -1,20 +1,54 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterator
+
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+
+from avalanche.constants import CChainAlias, PChainAlias, XChainAlias
+from avalanche.datastructures.evm import UTXO
+from avalanche.encoding import HEX, decode_many
 
 from .validator import Validator
 
+logger = logging.getLogger(__name__)
+
 
-class AvalancheClient:
+class BaseAvalancheClient:
     """
     Avalanche Go HTTP/RPC client.
+
+    Builds the JSON-RPC requests for each API method. Subclasses decide how a request
+    is sent by implementing _call. Idempotent reads are retried with exponential backoff,
+    calls which issue transactions are never retried.
     """
     C_CHAIN = "/ext/bc/C/avax"
     X_CHAIN = "/ext/bc/X"
     P_CHAIN = "/ext/bc/P"
 
-    def __init__(self, rpc_url=None):
+    # HTTP status codes that indicate the node is temporarily unable to serve a read
+    RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+    def __init__(self, rpc_url=None, pool_size=10, connect_timeout=3.05, read_timeout=30, max_retries=3,
+                 backoff_factor=0.5, encoding=HEX):
         if rpc_url is None:
             raise Exception("RPC URL is not set")
         self.url = rpc_url
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        # Encoding used for transactions and UTXOs unless a call asks for another
+        self.encoding = encoding
+        self._request_ids = itertools.count(1)
 
     @property
     def rpc_url(self):
@@ -32,113 +66,394 @@ class AvalancheClient:
     def p_chain_rpc_url(self):
         return self.rpc_url + self.P_CHAIN
 
-    def evm_get_atomic_tx(self, tx_id):
-        response = requests.post(self.c_chain_rpc_url, json={
+    def _backoff_delay(self, attempt: int) -> float:
+        return self.backoff_factor * (2 ** attempt)
+
+    @staticmethod
+    def _describe(body) -> str:
+        if isinstance(body, list):
+            return f'Batch of {len(body)}'
+        return body['method']
+
+    def _request_body(self, method: str, params: dict) -> dict:
+        return {
             "jsonrpc": "2.0",
-            "id": 1,
-            "method": "avax.getAtomicTxStatus",
-            "params": {
-                "txID": tx_id
-            }
+            "id": next(self._request_ids),
+            "method": method,
+            "params": params,
+        }
+
+    def _call(self, url: str, method: str, params: dict, idempotent=True):
+        raise NotImplementedError
+
+    @staticmethod
+    def _get_current_validators_params(node_ids: list[str] = None, encoding="cb58") -> dict:
+        return {
+            "nodeIDs": node_ids or [],  # empty array returns all validators
+            "encoding": encoding
+        }
+
+    @staticmethod
+    def _validators_from_response(response) -> list[Validator]:
+        if response.status_code != 200:
+            raise Exception("Failed to get current validators")
+        data = response.json()
+        validators = [Validator.from_json(d) for d in data["result"]["validators"]]
+        return validators
+
+    def evm_get_atomic_tx(self, tx_id):
+        return self._call(self.c_chain_rpc_url, "avax.getAtomicTxStatus", {
+            "txID": tx_id
         })
-        return response
 
-    def evm_issue_tx(self, tx: str, encoding="cb58"):
-        response = requests.post(self.c_chain_rpc_url, json={
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "avax.issueTx",
-            "params": {
-                "tx": tx,
-                "encoding": encoding
-            }
+    def avm_get_tx_status(self, tx_id):
+        return self._call(self.x_chain_rpc_url, "avm.getTxStatus", {
+            "txID": tx_id
         })
-        return response
 
-    def evm_get_utxos(self, addresses: list[str], source_chain: str, limit=1024, encoding="cb58"):
-        body = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "avax.getUTXOs",
-            "params": {
-                "addresses": addresses,
-                "sourceChain": source_chain,
-                "limit": limit,
-                "encoding": encoding,
-            }
+    def platform_get_tx_status(self, tx_id):
+        return self._call(self.p_chain_rpc_url, "platform.getTxStatus", {
+            "txID": tx_id
+        })
+
+    def evm_issue_tx(self, tx: str, encoding=None):
+        return self._call(self.c_chain_rpc_url, "avax.issueTx", {
+            "tx": tx,
+            "encoding": encoding or self.encoding
+        }, idempotent=False)
+
+    def evm_get_utxos(self, addresses: list[str], source_chain: str, limit=1024, encoding=None,
+                      start_index=None):
+        params = {
+            "addresses": addresses,
+            "sourceChain": source_chain,
+            "limit": limit,
+            "encoding": encoding or self.encoding,
         }
-        return requests.post(self.c_chain_rpc_url, json=body)
+        if start_index is not None:
+            params["startIndex"] = start_index
 
-    def avm_get_utxos(self, addresses: list[str], source_chain=None, limit=1024, encoding="cb58"):
-        body = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "avm.getUTXOs",
-            "params": {
-                "addresses": addresses,
-                "limit": limit,
-                "encoding": encoding,
-            }
+        return self._call(self.c_chain_rpc_url, "avax.getUTXOs", params)
+
+    def avm_get_utxos(self, addresses: list[str], source_chain=None, limit=1024, encoding=None, start_index=None):
+        params = {
+            "addresses": addresses,
+            "limit": limit,
+            "encoding": encoding or self.encoding,
         }
         if source_chain is not None:
-            body["params"]["sourceChain"] = source_chain
+            params["sourceChain"] = source_chain
+        if start_index is not None:
+            params["startIndex"] = start_index
 
-        return requests.post(self.x_chain_rpc_url, json=body)
+        return self._call(self.x_chain_rpc_url, "avm.getUTXOs", params)
 
-    def platform_get_utxos(self, addresses: list[str], source_chain=None, limit=1024, encoding="cb58"):
-        body = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "platform.getUTXOs",
-            "params": {
-                "addresses": addresses,
-                "limit": limit,
-                "encoding": encoding,
-            }
+    def platform_get_utxos(self, addresses: list[str], source_chain=None, limit=1024, encoding=None,
+                           start_index=None):
+        params = {
+            "addresses": addresses,
+            "limit": limit,
+            "encoding": encoding or self.encoding,
         }
         if source_chain is not None:
-            body["params"]["sourceChain"] = source_chain
+            params["sourceChain"] = source_chain
+        if start_index is not None:
+            params["startIndex"] = start_index
 
-        return requests.post(self.p_chain_rpc_url, json=body)
+        return self._call(self.p_chain_rpc_url, "platform.getUTXOs", params)
 
-    def avm_issue_tx(self, tx: str, encoding="cb58"):
-        response = requests.post(self.x_chain_rpc_url, json={
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "avm.issueTx",
-            "params": {
-                "tx": tx,
-                "encoding": encoding
-            }
-        })
-        return response
+    def avm_issue_tx(self, tx: str, encoding=None):
+        return self._call(self.x_chain_rpc_url, "avm.issueTx", {
+            "tx": tx,
+            "encoding": encoding or self.encoding
+        }, idempotent=False)
 
-    def platform_issue_tx(self, tx: str, encoding="cb58"):
-        response = requests.post(self.p_chain_rpc_url, json={
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "platform.issueTx",
-            "params": {
-                "tx": tx,
-                "encoding": encoding
-            }
-        })
-        return response
+    def platform_issue_tx(self, tx: str, encoding=None):
+        return self._call(self.p_chain_rpc_url, "platform.issueTx", {
+            "tx": tx,
+            "encoding": encoding or self.encoding
+        }, idempotent=False)
+
+
+class AvalancheClient(BaseAvalancheClient):
+    """
+    Synchronous Avalanche client. All calls share one pooled keep-alive session so that
+    consecutive requests to the node reuse open connections.
+    """
+
+    def __init__(self, rpc_url=None, **kwargs):
+        super().__init__(rpc_url, **kwargs)
+        self.session = self._create_session(self.pool_size)
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _backoff(self, attempt: int):
+        time.sleep(self._backoff_delay(attempt))
+
+    def _post(self, url: str, body, idempotent=True) -> requests.Response:
+        """
+        POST a JSON-RPC body to the node using the pooled session.
+        Only idempotent requests are retried on connection errors, timeouts or
+        temporary server errors. Issuing a transaction twice is never safe to assume.
+        """
+        retries = self.max_retries if idempotent else 0
+        for attempt in range(retries + 1):
+            try:
+                response = self.session.post(url, json=body, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == retries:
+                    raise
+                logger.warning(f'{self._describe(body)} request to {url} failed ({e}), retrying')
+            else:
+                if response.status_code not in self.RETRY_STATUS_CODES or attempt == retries:
+                    return response
+                logger.warning(f'{self._describe(body)} request to {url} returned {response.status_code}, retrying')
+            self._backoff(attempt)
+
+    def _call(self, url: str, method: str, params: dict, idempotent=True):
+        return self._post(url, self._request_body(method, params), idempotent=idempotent)
+
+    def iter_utxo_bytes(self, chain: str, addresses: list[str], source_chain=None, limit=1024) -> Iterator[bytes]:
+        """
+        Lazily yield the serialized bytes of every UTXO held by the addresses on the given
+        chain alias (C, P or X), following the endIndex cursor one page at a time.
+        Paging may return a UTXO more than once, so repeats are skipped.
+        """
+        get_utxos = {
+            CChainAlias: self.evm_get_utxos,
+            PChainAlias: self.platform_get_utxos,
+            XChainAlias: self.avm_get_utxos,
+        }[chain]
+        seen = set()
+        start_index = None
+        while True:
+            response = get_utxos(addresses, source_chain=source_chain, limit=limit, encoding=self.encoding,
+                                 start_index=start_index)
+            if response.status_code != 200:
+                raise Exception(f"Failed to get UTXOs, status code {response.status_code}")
+            data = response.json()
+            if 'error' in data:
+                raise Exception(f"Failed to get UTXOs: {data['error']}")
+
+            result = data['result']
+            for raw in decode_many(result['utxos'], result.get('encoding', self.encoding)):
+                key = UTXO.id_from_bytes(raw)
+                if key not in seen:
+                    seen.add(key)
+                    yield raw
+
+            if int(result['numFetched']) < limit:
+                return
+            start_index = result['endIndex']
+
+    def iter_utxos(self, chain: str, addresses: list[str], source_chain=None, limit=1024) -> Iterator[UTXO]:
+        """
+        As iter_utxo_bytes, decoding each UTXO as it is reached.
+        """
+        for raw in self.iter_utxo_bytes(chain, addresses, source_chain=source_chain, limit=limit):
+            yield UTXO.from_bytes(raw)
+
+    def batch(self) -> 'AvalancheBatch':
+        """
+        Collect calls and send them as JSON-RPC batches, one POST per chain endpoint.
+        Use as a context manager; the batch is sent when the block exits without error.
+        """
+        return AvalancheBatch(self)
 
     def platform_get_current_validators(self, node_ids: list[str] = None, encoding="cb58"):
-        if node_ids is None:
-            node_ids = []
-        response = requests.post(self.p_chain_rpc_url, json={
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "platform.getCurrentValidators",
-            "params": {
-                "nodeIDs": node_ids,  # empty array returns all validators
-                "encoding": encoding
-            }
-        })
+        response = self._call(self.p_chain_rpc_url, "platform.getCurrentValidators",
+                              self._get_current_validators_params(node_ids, encoding))
+        return self._validators_from_response(response)
+
+
+class RPCResponse:
+    """
+    The parts of a requests.Response used by callers, for responses read by the async client.
+    """
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncAvalancheClient(BaseAvalancheClient):
+    """
+    asyncio Avalanche client with the same methods as AvalancheClient, each returning a
+    coroutine. Many lookups can be run concurrently with asyncio.gather over one pooled
+    aiohttp session. The session is bound to the running event loop, so close the client
+    (or use it as an async context manager) before the loop ends.
+    """
+
+    def __init__(self, rpc_url=None, **kwargs):
+        super().__init__(rpc_url, **kwargs)
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connect_timeout, read_timeout = self.timeout
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _post(self, url: str, body, idempotent=True) -> RPCResponse:
+        retries = self.max_retries if idempotent else 0
+        for attempt in range(retries + 1):
+            try:
+                async with self.session.post(url, json=body) as response:
+                    result = RPCResponse(response.status, await response.text())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == retries:
+                    raise
+                logger.warning(f'{self._describe(body)} request to {url} failed ({e!r}), retrying')
+            else:
+                if result.status_code not in self.RETRY_STATUS_CODES or attempt == retries:
+                    return result
+                logger.warning(f'{self._describe(body)} request to {url} returned {result.status_code}, retrying')
+            await asyncio.sleep(self._backoff_delay(attempt))
+
+    async def _call(self, url: str, method: str, params: dict, idempotent=True) -> RPCResponse:
+        return await self._post(url, self._request_body(method, params), idempotent=idempotent)
+
+    async def platform_get_current_validators(self, node_ids: list[str] = None, encoding="cb58"):
+        response = await self._call(self.p_chain_rpc_url, "platform.getCurrentValidators",
+                                    self._get_current_validators_params(node_ids, encoding))
+        return self._validators_from_response(response)
+
+
+class BatchResponse:
+    """
+    Placeholder returned for each call queued on an AvalancheBatch. Once the batch has
+    been sent it exposes the same status_code and json() as a requests.Response.
+    """
+
+    def __init__(self, request_id: int):
+        self.request_id = request_id
+        self.status_code = None
+        self._data = None
+
+    def resolve(self, status_code: int, data: dict):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self) -> dict:
+        if self.status_code is None:
+            raise Exception("Batch has not been sent")
+        return self._data
+
+
+class AvalancheBatch(BaseAvalancheClient):
+    """
+    Queues calls made on it instead of sending them, only the request methods of
+    BaseAvalancheClient are available. Calls are grouped by endpoint and each group is
+    sent through the client as a single JSON-RPC batch POST, with the responses matched
+    back to their requests by id.
+    """
+
+    def __init__(self, client: AvalancheClient):
+        super().__init__(client.url, encoding=client.encoding)
+        self.client = client
+        # Request ids must be unique across the client and its batches
+        self._request_ids = client._request_ids
+        self._queue = defaultdict(list)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.send()
+
+    def __len__(self):
+        return sum(len(calls) for calls in self._queue.values())
+
+    def _call(self, url: str, method: str, params: dict, idempotent=True) -> BatchResponse:
+        body = self._request_body(method, params)
+        placeholder = BatchResponse(body["id"])
+        self._queue[url].append((body, placeholder, idempotent))
+        return placeholder
+
+    def send(self):
+        queue, self._queue = self._queue, defaultdict(list)
+        for url, calls in queue.items():
+            bodies = [body for body, _, _ in calls]
+            # A batch is only retried if every call within it is safe to repeat
+            idempotent = all(idempotent for _, _, idempotent in calls)
+            response = self.client._post(url, bodies, idempotent=idempotent)
+            self._resolve(response, calls)
+
+    @staticmethod
+    def _resolve(response: requests.Response, calls: list):
         if response.status_code != 200:
-            raise Exception("Failed to get current validators")
+            error = {"code": response.status_code, "message": response.text}
+            for body, placeholder, _ in calls:
+                placeholder.resolve(response.status_code, {"jsonrpc": "2.0", "id": body["id"], "error": error})
+            return
+
         data = response.json()
-        validators = [Validator.from_json(d) for d in data["result"]["validators"]]
-        return validators
+        if isinstance(data, dict):
+            # The node rejected the batch as a whole
+            for _, placeholder, _ in calls:
+                placeholder.resolve(response.status_code, data)
+            return
+
+        results = {item.get("id"): item for item in data}
+        for body, placeholder, _ in calls:
+            result = results.get(body["id"])
+            if result is None:
+                result = {"jsonrpc": "2.0", "id": body["id"], "error": {"message": "No response in batch"}}
+            placeholder.resolve(response.status_code, result)
+
+
+def _client_options() -> dict:
+    return {
+        'pool_size': settings.AVAX_RPC_POOL_SIZE,
+        'connect_timeout': settings.AVAX_RPC_CONNECT_TIMEOUT,
+        'read_timeout': settings.AVAX_RPC_READ_TIMEOUT,
+        'max_retries': settings.AVAX_RPC_MAX_RETRIES,
+        'backoff_factor': settings.AVAX_RPC_BACKOFF_FACTOR,
+        'encoding': settings.AVAX_RPC_ENCODING,
+    }
+
+
+@lru_cache(maxsize=None)
+def _shared_avalanche_client(rpc_url: str) -> AvalancheClient:
+    return AvalancheClient(rpc_url=rpc_url, **_client_options())
+
+
+def get_avalanche_client() -> AvalancheClient:
+    """
+    Return the AvalancheClient shared by everything running in this process, so that
+    connections to the node are pooled across tasks rather than opened per call.
+    """
+    return _shared_avalanche_client(settings.AVAX_RPC_URL)
+
+
+def create_async_avalanche_client() -> AsyncAvalancheClient:
+    """
+    Return a new AsyncAvalancheClient configured from settings. Unlike the synchronous
+    client this is not shared, as its session belongs to the event loop it is used in.
+    """
+    return AsyncAvalancheClient(rpc_url=settings.AVAX_RPC_URL, **_client_options())
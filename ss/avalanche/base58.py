@@ -22,7 +22,7 @@
 
 # Imports
 from enum import Enum, auto, unique
-from typing import Dict
+from typing import Dict, Iterable, List
 
 from bip_utils.base58.base58_ex import Base58ChecksumError
 from bip_utils.utils.misc import BytesUtils, CryptoUtils
@@ -48,6 +48,14 @@ class Base58Const:
         Base58Alphabets.BITCOIN: "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz",
         Base58Alphabets.RIPPLE: "rpshnaf39wBUDNEGHJKLM4PQRST7VWXYZ2bcdeCg65jkm8oFqi1tuvAxyz",
     }
+    # Reverse lookup of each alphabet, character to digit value
+    DIGITS: Dict[Base58Alphabets, Dict[str, int]] = {
+        alph_idx: {c: i for i, c in enumerate(alphabet)} for alph_idx, alphabet in ALPHABETS.items()
+    }
+    # Number of digits converted at a time. RADIX ** CHUNK_LEN still fits in a machine word,
+    # so the big integer is only touched once per chunk rather than once per digit
+    CHUNK_LEN: int = 10
+    CHUNK_RADIX: int = RADIX ** CHUNK_LEN
 
 
 class Base58Utils:
@@ -84,21 +92,24 @@ class Base58Encoder:
         if not isinstance(alph_idx, Base58Alphabets):
             raise TypeError("Alphabet index is not an enumerative of Base58Alphabets")
 
-        enc = ""
-
         # Get alphabet
         alphabet = Base58Const.ALPHABETS[alph_idx]
 
         # Convert bytes to integer
-        val = BytesUtils.ToInteger(data_bytes)
+        val = int.from_bytes(data_bytes, 'big')
 
-        # Algorithm implementation
+        # Split the integer into chunks of digits, least significant first, then expand each chunk
+        digits = []
         while val > 0:
-            val, mod = divmod(val, Base58Const.RADIX)
-            enc = alphabet[mod] + enc
+            val, chunk = divmod(val, Base58Const.CHUNK_RADIX)
+            for _ in range(Base58Const.CHUNK_LEN):
+                chunk, mod = divmod(chunk, Base58Const.RADIX)
+                digits.append(alphabet[mod])
+        # The last chunk is zero filled, these are not part of the encoding
+        enc = ''.join(reversed(digits)).lstrip(alphabet[0])
 
         # Get number of leading zeros
-        n = len(data_bytes) - len(data_bytes.lstrip(b"\x00"))
+        n = len(data_bytes) - len(bytes(data_bytes).lstrip(b'\x00'))
         # Add padding
         return (alphabet[0] * n) + enc
 
@@ -119,6 +130,32 @@ class Base58Encoder:
         # Append checksum and encode all together
         return Base58Encoder.Encode(data_bytes + Base58Utils.ComputeChecksum(data_bytes), alph_idx)
 
+    @staticmethod
+    def EncodeMany(data_bytes_list: Iterable[bytes],
+                   alph_idx: Base58Alphabets = Base58Alphabets.BITCOIN) -> List[str]:
+        """
+        Encode a batch of bytes into Base58 strings.
+        Args:
+            data_bytes_list (iterable)          : Data bytes to encode
+            alph_idx (Base58Alphabets, optional): Alphabet index, Bitcoin by default
+        Returns:
+            list[str]: Encoded strings, in the same order
+        """
+        return [Base58Encoder.Encode(data_bytes, alph_idx) for data_bytes in data_bytes_list]
+
+    @staticmethod
+    def CheckEncodeMany(data_bytes_list: Iterable[bytes],
+                        alph_idx: Base58Alphabets = Base58Alphabets.BITCOIN) -> List[str]:
+        """
+        Encode a batch of bytes into Base58 strings with checksum.
+        Args:
+            data_bytes_list (iterable)          : Data bytes to encode
+            alph_idx (Base58Alphabets, optional): Alphabet index, Bitcoin by default
+        Returns:
+            list[str]: Encoded strings with checksum, in the same order
+        """
+        return [Base58Encoder.CheckEncode(data_bytes, alph_idx) for data_bytes in data_bytes_list]
+
 
 class Base58Decoder:
     """Base58 decoder class. It provides methods for decoding and checksum decoding Base58 format."""
@@ -134,6 +171,7 @@ class Base58Decoder:
         Returns:
             bytes: Decoded bytes
         Raises:
+            ValueError: If the string contains characters outside the alphabet
             TypeError: If alphabet index is not a Base58Alphabets enumerative
         """
         if not isinstance(alph_idx, Base58Alphabets):
@@ -141,21 +179,26 @@ class Base58Decoder:
 
         # Get alphabet
         alphabet = Base58Const.ALPHABETS[alph_idx]
+        digits = Base58Const.DIGITS[alph_idx]
 
-        # Convert string to integer
+        # Convert string to integer, Horner style, a chunk of digits at a time
         val = 0
-        for i, c in enumerate(data_str[::-1]):
-            val += alphabet.index(c) * (Base58Const.RADIX ** i)
-
-        dec = bytearray()
-        while val > 0:
-            val, mod = divmod(val, 2**8)
-            dec.append(mod)
+        try:
+            for i in range(0, len(data_str), Base58Const.CHUNK_LEN):
+                chunk_str = data_str[i:i + Base58Const.CHUNK_LEN]
+                chunk = 0
+                for c in chunk_str:
+                    chunk = chunk * Base58Const.RADIX + digits[c]
+                val = val * Base58Const.RADIX ** len(chunk_str) + chunk
+        except KeyError as ex:
+            raise ValueError(f'Invalid Base58 character {ex}') from None
+
+        dec = val.to_bytes((val.bit_length() + 7) // 8, 'big')
 
         # Get padding length
         pad_len = len(data_str) - len(data_str.lstrip(alphabet[0]))
         # Add padding
-        return (b"\x00" * pad_len) + bytes(dec[::-1])
+        return (b'\x00' * pad_len) + dec
 
     @staticmethod
     def CheckDecode(data_str: str,
@@ -190,3 +233,31 @@ class Base58Decoder:
             )
 
         return data_bytes
+
+    @staticmethod
+    def DecodeMany(data_str_list: Iterable[str],
+                   alph_idx: Base58Alphabets = Base58Alphabets.BITCOIN) -> List[bytes]:
+        """
+        Decode a batch of Base58 strings.
+        Args:
+            data_str_list (iterable)            : Data strings to decode
+            alph_idx (Base58Alphabets, optional): Alphabet index, Bitcoin by default
+        Returns:
+            list[bytes]: Decoded bytes, in the same order
+        """
+        return [Base58Decoder.Decode(data_str, alph_idx) for data_str in data_str_list]
+
+    @staticmethod
+    def CheckDecodeMany(data_str_list: Iterable[str],
+                        alph_idx: Base58Alphabets = Base58Alphabets.BITCOIN) -> List[bytes]:
+        """
+        Decode a batch of Base58 strings with checksum.
+        Args:
+            data_str_list (iterable)            : Data strings to decode
+            alph_idx (Base58Alphabets, optional): Alphabet index, Bitcoin by default
+        Returns:
+            list[bytes]: Decoded bytes (checksums removed), in the same order
+        Raises:
+            Base58ChecksumError: If any checksum is not valid
+        """
+        return [Base58Decoder.CheckDecode(data_str, alph_idx) for data_str in data_str_list]
@@ -1,8 +1,13 @@
+from functools import lru_cache
+
 from bip_utils import Bech32Decoder, Bip32Secp256k1, Bip44PublicKey
 
 from common.bip import Bip44Coins, Bip44ConfGetter
 from common.bip.address import FujiCChainAddrEncoder
 
+# Bound on the number of cached addresses
+ADDRESS_CACHE_SIZE = 4096
+
 
 def bech32_to_bytes(addr: str) -> bytes:
     if addr.startswith('fuji'):
@@ -11,6 +16,7 @@ def bech32_to_bytes(addr: str) -> bytes:
     return Bech32Decoder.Decode('avax', addr)
 
 
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
 def bech32_address_from_public_key(public_key: bytes, coin: Bip44Coins):
     if coin in (Bip44Coins.FB_C_CHAIN, Bip44Coins.AVAX_C_CHAIN, Bip44Coins.AVAX_C_CHAIN):
         # The default derivation is Ethereum style address. But we want Bech32
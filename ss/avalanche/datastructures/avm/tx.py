@@ -9,7 +9,7 @@ from hexbytes import HexBytes
 from avalanche.constants import XChainAlias
 from avalanche.tools import num_to_uint32, uint_to_num
 
-from ..base import DataStructure
+from ..base import UINT32, DataStructure, unpack_bytes, unpack_list, unpack_uint32, write_list
 from ..evm.inout import TransferableInput, TransferableOutput
 
 
@@ -18,6 +18,7 @@ class BaseTx(DataStructure):
     AVM Base Transaction
     """
     TYPE_ID = num_to_uint32(0)
+    __slots__ = ('type_id', 'network_id', 'blockchain_id', 'outputs', 'inputs', 'memo')
 
     def __init__(self, network_id: bytes, blockchain_id: bytes, outputs: list[TransferableOutput],
                  inputs: list[TransferableInput], memo: bytes):
@@ -33,20 +34,14 @@ class BaseTx(DataStructure):
         assert len(self.blockchain_id) == 32
         assert len(self.memo) < 256
 
-    def _inputs_bytes(self) -> bytes:
-        input_byte_list = [input.to_bytes() for input in self.inputs]
-        num_inputs = num_to_uint32(len(self.inputs))
-        return num_inputs + b''.join(input_byte_list)
-
-    def _outputs_bytes(self) -> bytes:
-        output_byte_list = [output.to_bytes() for output in self.outputs]
-        num_outputs = num_to_uint32(len(self.outputs))
-        return num_outputs + b''.join(output_byte_list)
-
-    def to_bytes(self) -> bytes:
-        memo_len = num_to_uint32(len(self.memo))
-        return (self.type_id + self.network_id + self.blockchain_id + self._outputs_bytes() +
-                self._inputs_bytes() + memo_len + self.memo)
+    def write_into(self, buf: bytearray):
+        buf += self.type_id
+        buf += self.network_id
+        buf += self.blockchain_id
+        write_list(self.outputs, buf)
+        write_list(self.inputs, buf)
+        buf += UINT32.pack(len(self.memo))
+        buf += self.memo
 
     def __len__(self):
         size_outputs = sum([len(output) for output in self.outputs])
@@ -54,30 +49,16 @@ class BaseTx(DataStructure):
         return 52 + size_outputs + size_inputs + len(self.memo)
 
     @classmethod
-    def from_bytes(cls, raw: bytes):
+    def from_buffer(cls, buf: memoryview, offset: int = 0):
         # Ignore type_id check because it is changed by "subclasses"
-        network_id = raw[4:8]
-        blockchain_id = raw[8:40]
-        # Generate outputs
-        outputs = []
-        num_outputs = uint_to_num(raw[40:44])
-        offset = 44
-        for i in range(num_outputs):
-            output = TransferableOutput.from_bytes(raw[offset:])
-            offset += len(output)
-            outputs.append(output)
-        # Generate inputs
-        inputs = []
-        num_inputs = uint_to_num(raw[offset:offset + 4])
         offset += 4
-        for i in range(num_inputs):
-            input = TransferableInput.from_bytes(raw[offset:])
-            offset += len(input)
-            inputs.append(input)
-        memo_len = uint_to_num(raw[offset:offset + 4])
-        offset += 4
-        memo = raw[offset:offset + memo_len]
-        return cls(network_id, blockchain_id, outputs, inputs, memo)
+        network_id, offset = unpack_bytes(buf, offset, 4)
+        blockchain_id, offset = unpack_bytes(buf, offset, 32)
+        outputs, offset = unpack_list(TransferableOutput, buf, offset)
+        inputs, offset = unpack_list(TransferableInput, buf, offset)
+        memo_len, offset = unpack_uint32(buf, offset)
+        memo, offset = unpack_bytes(buf, offset, memo_len)
+        return cls(network_id, blockchain_id, outputs, inputs, memo), offset
 
     def to_dict(self) -> dict:
         return {
@@ -95,6 +76,7 @@ class AVMImportTx(DataStructure):
     """
     TYPE_ID = num_to_uint32(3)
     SOURCE_CHAIN = XChainAlias
+    __slots__ = ('base_tx', 'source_chain', 'ins')
 
     def __init__(self, base_tx: BaseTx, source_chain: bytes, ins: list[TransferableInput]):
         self.base_tx = base_tx
@@ -104,29 +86,29 @@ class AVMImportTx(DataStructure):
         self.ins = ins
         assert len(self.source_chain) == 32
 
-    def _ins_bytes(self) -> bytes:
-        input_byte_list = [input.to_bytes() for input in self.ins]
-        num_inputs = num_to_uint32(len(self.ins))
-        return num_inputs + b''.join(input_byte_list)
-
-    def to_bytes(self) -> bytes:
-        return self.base_tx.to_bytes() + self.source_chain + self._ins_bytes()
+    def write_into(self, buf: bytearray):
+        self.base_tx.write_into(buf)
+        buf += self.source_chain
+        write_list(self.ins, buf)
 
     def __len__(self):
         size_ins = sum([len(input) for input in self.ins])
         return 36 + size_ins + len(self.base_tx)
 
+    def get_inputs(self) -> list[TransferableInput]:
+        """
+        Inputs in the order their credentials appear in the signed transaction.
+        """
+        return self.base_tx.inputs + self.ins
+
     @classmethod
-    def from_bytes(cls, raw: bytes):
-        type_id = raw[0:4]
+    def from_buffer(cls, buf: memoryview, offset: int = 0):
+        type_id, _ = unpack_bytes(buf, offset, 4)
         assert type_id == cls.TYPE_ID
-        base = BaseTx.from_bytes(raw)
-        offset = len(base)
-        source_chain = raw[offset:offset + 32]
-        num_inputs = uint_to_num(raw[offset + 32:offset + 36])
-        assert num_inputs == 1
-        input = TransferableInput.from_bytes(raw[offset + 36:])
-        return cls(base, source_chain, [input])
+        base, offset = BaseTx.from_buffer(buf, offset)
+        source_chain, offset = unpack_bytes(buf, offset, 32)
+        ins, offset = unpack_list(TransferableInput, buf, offset)
+        return cls(base, source_chain, ins), offset
 
     def to_dict(self) -> dict:
         return {
@@ -142,6 +124,7 @@ class AVMExportTx(DataStructure):
     """
     TYPE_ID = num_to_uint32(4)
     SOURCE_CHAIN = XChainAlias
+    __slots__ = ('base_tx', 'destination_chain', 'outs')
 
     def __init__(self, base_tx: BaseTx, destination_chain: bytes, outs: list[TransferableOutput]):
         self.base_tx = base_tx
@@ -151,29 +134,29 @@ class AVMExportTx(DataStructure):
         self.outs = outs
         assert len(self.destination_chain) == 32
 
-    def _outs_bytes(self) -> bytes:
-        output_byte_list = [output.to_bytes() for output in self.outs]
-        num_outputs = num_to_uint32(len(self.outs))
-        return num_outputs + b''.join(output_byte_list)
-
-    def to_bytes(self) -> bytes:
-        return self.base_tx.to_bytes() + self.destination_chain + self._outs_bytes()
+    def write_into(self, buf: bytearray):
+        self.base_tx.write_into(buf)
+        buf += self.destination_chain
+        write_list(self.outs, buf)
 
     def __len__(self):
         size_outs = sum([len(output) for output in self.outs])
         return 36 + size_outs + len(self.base_tx)
 
+    def get_inputs(self) -> list[TransferableInput]:
+        """
+        Inputs in the order their credentials appear in the signed transaction.
+        """
+        return self.base_tx.inputs
+
     @classmethod
-    def from_bytes(cls, raw: bytes):
-        type_id = raw[0:4]
+    def from_buffer(cls, buf: memoryview, offset: int = 0):
+        type_id, _ = unpack_bytes(buf, offset, 4)
         assert type_id == cls.TYPE_ID
-        base = BaseTx.from_bytes(raw)
-        offset = len(base)
-        destination_chain = raw[offset:offset + 32]
-        num_outputs = uint_to_num(raw[offset + 32:offset + 36])
-        assert num_outputs == 1
-        output = TransferableOutput.from_bytes(raw[offset + 36:])
-        return cls(base, destination_chain, [output])
+        base, offset = BaseTx.from_buffer(buf, offset)
+        destination_chain, offset = unpack_bytes(buf, offset, 32)
+        outs, offset = unpack_list(TransferableOutput, buf, offset)
+        return cls(base, destination_chain, outs), offset
 
     def to_dict(self) -> dict:
         return {
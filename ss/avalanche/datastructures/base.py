@@ -4,24 +4,108 @@ the specifications located at
 https://docs.avax.network/specs/coreth-atomic-transaction-serialization
 """
 
+import struct
 from abc import ABC, abstractmethod
 
 from hexbytes import HexBytes
 
+UINT16 = struct.Struct('>H')
+UINT32 = struct.Struct('>I')
+UINT64 = struct.Struct('>Q')
+
+
+def _unpack_uint(uint: struct.Struct, buf: memoryview, offset: int) -> tuple[int, int]:
+    if offset + uint.size > len(buf):
+        raise ValueError(f'Buffer too short, expected {uint.size} bytes at offset {offset}')
+    return uint.unpack_from(buf, offset)[0], offset + uint.size
+
+
+def unpack_uint16(buf: memoryview, offset: int) -> tuple[int, int]:
+    return _unpack_uint(UINT16, buf, offset)
+
+
+def unpack_uint32(buf: memoryview, offset: int) -> tuple[int, int]:
+    return _unpack_uint(UINT32, buf, offset)
+
+
+def unpack_uint64(buf: memoryview, offset: int) -> tuple[int, int]:
+    return _unpack_uint(UINT64, buf, offset)
+
+
+def unpack_bytes(buf: memoryview, offset: int, length: int) -> tuple[bytes, int]:
+    """
+    Copy a single fixed length field out of the buffer, returning it and the offset after it.
+    """
+    end = offset + length
+    if end > len(buf):
+        raise ValueError(f'Buffer too short, expected {length} bytes at offset {offset}')
+    return bytes(buf[offset:end]), end
+
+
+def unpack_list(item_class, buf: memoryview, offset: int) -> tuple[list, int]:
+    """
+    Parse a uint32 length prefixed list of data structures.
+    """
+    count, offset = unpack_uint32(buf, offset)
+    items = []
+    for _ in range(count):
+        item, offset = item_class.from_buffer(buf, offset)
+        items.append(item)
+    return items, offset
+
+
+def write_list(items: list, buf: bytearray):
+    """
+    Write a uint32 length prefixed list of data structures.
+    """
+    buf += UINT32.pack(len(items))
+    for item in items:
+        item.write_into(buf)
+
 
 class DataStructure(ABC):
     """
     Abstract parent class for all Avalanche data structures.
     """
+    __slots__ = ()
 
     @abstractmethod
+    def write_into(self, buf: bytearray):
+        """
+        Append the serialized data structure to buf. Nested data structures write
+        into the same buffer, so a whole transaction is serialized in a single pass.
+        :return:
+        """
+        raise NotImplementedError
+
     def to_bytes(self) -> bytes:
         """
         Returns a byte representation of the data structure.
         :return:
         """
+        buf = bytearray()
+        self.write_into(buf)
+        return bytes(buf)
+
+    @classmethod
+    def from_buffer(cls, buf: memoryview, offset: int = 0) -> tuple['DataStructure', int]:
+        """
+        Parse the data structure starting at offset in the buffer without copying
+        anything but the fields themselves. Returns the data structure and the offset
+        of the first byte after it.
+        :return:
+        """
         raise NotImplementedError
 
+    @classmethod
+    def from_bytes(cls, raw: bytes):
+        """
+        Parse the data structure from the start of any bytes-like object.
+        :return:
+        """
+        data_structure, _ = cls.from_buffer(memoryview(raw), 0)
+        return data_structure
+
     def to_hex(self) -> str:
         """
         Returns a hex string representation of the data structure bytes.
@@ -6,7 +6,7 @@ https://docs.avax.network/specs/coreth-atomic-transaction-serialization#credenti
 
 from hexbytes import HexBytes
 
-from avalanche.datastructures.base import DataStructure
+from avalanche.datastructures.base import UINT32, DataStructure
 from avalanche.tools import num_to_uint32
 
 
@@ -15,21 +15,18 @@ class SECP256K1Credential(DataStructure):
     A secp256k1 credential contains a list of 65-byte recoverable signatures.
     """
     TYPE_ID = num_to_uint32(0x00000009)
+    __slots__ = ('signatures',)
 
     def __init__(self, signatures: list[bytes]):
-        self.type_id = self.TYPE_ID
         self.signatures = signatures
-        assert len(self.type_id) == 4
         for signature in self.signatures:
             assert len(signature) == 65
 
-    def _signatures_bytes(self):
-        signatures_byte_list = [sig for sig in self.signatures]
-        num_inputs = num_to_uint32(len(self.signatures))
-        return num_inputs + b''.join(signatures_byte_list)
-
-    def to_bytes(self):
-        return self.type_id + self._signatures_bytes()
+    def write_into(self, buf: bytearray):
+        buf += self.TYPE_ID
+        buf += UINT32.pack(len(self.signatures))
+        for signature in self.signatures:
+            buf += signature
 
     def __len__(self):
         return 8 + 65 * len(self.signatures)
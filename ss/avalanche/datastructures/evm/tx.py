@@ -9,7 +9,7 @@ from hexbytes import HexBytes
 from avalanche.constants import CChainAlias
 from avalanche.tools import num_to_uint32, uint_to_num
 
-from ..base import DataStructure
+from ..base import DataStructure, unpack_bytes, unpack_list, write_list
 from .inout import EVMInput, EVMOutput, TransferableInput, TransferableOutput
 
 
@@ -19,6 +19,7 @@ class EVMExportTx(DataStructure):
     """
     TYPE_ID = num_to_uint32(1)
     SOURCE_CHAIN = CChainAlias
+    __slots__ = ('type_id', 'network_id', 'blockchain_id', 'destination_chain', 'inputs', 'exported_outs')
 
     def __init__(self, network_id: bytes, blockchain_id: bytes, destination_chain: bytes,
                  inputs: list[EVMInput], exported_outs: list[TransferableOutput]):
@@ -34,51 +35,33 @@ class EVMExportTx(DataStructure):
         assert len(self.blockchain_id) == 32
         assert len(self.destination_chain) == 32
 
-    def _inputs_bytes(self) -> bytes:
-        input_byte_list = [input.to_bytes() for input in self.inputs]
-        num_inputs = num_to_uint32(len(self.inputs))
-        return num_inputs + b''.join(input_byte_list)
-
-    def _outputs_bytes(self) -> bytes:
-        output_byte_list = [output.to_bytes() for output in self.exported_outs]
-        num_outputs = num_to_uint32(len(self.exported_outs))
-        return num_outputs + b''.join(output_byte_list)
-
-    def to_bytes(self) -> bytes:
-        return (self.type_id + self.network_id + self.blockchain_id + self.destination_chain + self._inputs_bytes() +
-                self._outputs_bytes())
+    def write_into(self, buf: bytearray):
+        buf += self.type_id
+        buf += self.network_id
+        buf += self.blockchain_id
+        buf += self.destination_chain
+        write_list(self.inputs, buf)
+        write_list(self.exported_outs, buf)
 
     def __len__(self):
         return 80 + len(self.inputs) + len(self.exported_outs)
 
-    @classmethod
-    def _inputs_from_bytes(cls, raw: bytes):
-        num_inputs = uint_to_num(raw[72:76])
-        start_offset = 76
-        end_offset = start_offset + 68  # EVMInput always 68 bytes long
-        inputs = []
-        # For now we know there is only one input, later remove this check
-        assert num_inputs == 1
-        for i in range(num_inputs):
-            inputs.append(EVMInput.from_bytes(raw[start_offset:end_offset]))
-            start_offset = end_offset
-            end_offset += 68
-        return inputs
+    def get_inputs(self) -> list[EVMInput]:
+        """
+        Inputs in the order their credentials appear in the signed transaction.
+        """
+        return self.inputs
 
     @classmethod
-    def from_bytes(cls, raw: bytes):
-        type_id = raw[0:4]
+    def from_buffer(cls, buf: memoryview, offset: int = 0):
+        type_id, offset = unpack_bytes(buf, offset, 4)
         assert type_id == cls.TYPE_ID
-        network_id = raw[4:8]
-        blockchain_id = raw[8:40]
-        destination_chain = raw[40:72]
-        inputs = cls._inputs_from_bytes(raw)
-        # Generate outputs
-        output_offset = 76 + 68 * len(inputs)
-        num_outputs = uint_to_num(raw[output_offset:output_offset + 4])
-        assert num_outputs == 1
-        exported_outs = [TransferableOutput.from_bytes(raw[output_offset + 4:])]
-        return cls(network_id, blockchain_id, destination_chain, inputs, exported_outs)
+        network_id, offset = unpack_bytes(buf, offset, 4)
+        blockchain_id, offset = unpack_bytes(buf, offset, 32)
+        destination_chain, offset = unpack_bytes(buf, offset, 32)
+        inputs, offset = unpack_list(EVMInput, buf, offset)
+        exported_outs, offset = unpack_list(TransferableOutput, buf, offset)
+        return cls(network_id, blockchain_id, destination_chain, inputs, exported_outs), offset
 
     def to_dict(self) -> dict:
         return {
@@ -96,6 +79,7 @@ class EVMImportTx(DataStructure):
     """
     TYPE_ID = num_to_uint32(0)
     SOURCE_CHAIN = CChainAlias
+    __slots__ = ('type_id', 'network_id', 'blockchain_id', 'source_chain', 'imported_inputs', 'outs')
 
     def __init__(self, network_id: bytes, blockchain_id: bytes, source_chain: bytes,
                  imported_inputs: list[TransferableInput], outs: list[EVMOutput]):
@@ -111,47 +95,33 @@ class EVMImportTx(DataStructure):
         assert len(self.blockchain_id) == 32
         assert len(self.source_chain) == 32
 
-    def _inputs_bytes(self) -> bytes:
-        input_byte_list = [input.to_bytes() for input in self.imported_inputs]
-        num_inputs = num_to_uint32(len(self.imported_inputs))
-        return num_inputs + b''.join(input_byte_list)
-
-    def _outputs_bytes(self) -> bytes:
-        output_byte_list = [output.to_bytes() for output in self.outs]
-        num_outputs = num_to_uint32(len(self.outs))
-        return num_outputs + b''.join(output_byte_list)
-
-    def to_bytes(self) -> bytes:
-        return (self.type_id + self.network_id + self.blockchain_id + self.source_chain +
-                self._inputs_bytes() + self._outputs_bytes())
+    def write_into(self, buf: bytearray):
+        buf += self.type_id
+        buf += self.network_id
+        buf += self.blockchain_id
+        buf += self.source_chain
+        write_list(self.imported_inputs, buf)
+        write_list(self.outs, buf)
 
     def __len__(self):
         return 80 + len(self.imported_inputs) + len(self.outs)
 
+    def get_inputs(self) -> list[TransferableInput]:
+        """
+        Inputs in the order their credentials appear in the signed transaction.
+        """
+        return self.imported_inputs
+
     @classmethod
-    def from_bytes(cls, raw: bytes):
-        type_id = raw[0:4]
+    def from_buffer(cls, buf: memoryview, offset: int = 0):
+        type_id, offset = unpack_bytes(buf, offset, 4)
         assert type_id == cls.TYPE_ID
-        network_id = raw[4:8]
-        blockchain_id = raw[8:40]
-        source_chain = raw[40:72]
-        # Generate inputs
-        imported_inputs = []
-        num_inputs = uint_to_num(raw[72:76])
-        offset = 76
-        for i in range(num_inputs):
-            input = TransferableInput.from_bytes(raw[offset:])
-            offset += len(input)
-            imported_inputs.append(input)
-        # Generate outputs
-        outs = []
-        num_outputs = uint_to_num(raw[offset:offset + 4])
-        offset += 4
-        for i in range(num_outputs):
-            output = EVMOutput.from_bytes(raw[offset:])
-            offset += len(output)
-            outs.append(output)
-        return cls(network_id, blockchain_id, source_chain, imported_inputs, outs)
+        network_id, offset = unpack_bytes(buf, offset, 4)
+        blockchain_id, offset = unpack_bytes(buf, offset, 32)
+        source_chain, offset = unpack_bytes(buf, offset, 32)
+        imported_inputs, offset = unpack_list(TransferableInput, buf, offset)
+        outs, offset = unpack_list(EVMOutput, buf, offset)
+        return cls(network_id, blockchain_id, source_chain, imported_inputs, outs), offset
 
     def to_dict(self) -> dict:
         return {
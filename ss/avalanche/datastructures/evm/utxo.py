@@ -1,8 +1,8 @@
 from hexbytes import HexBytes
 
-from avalanche.tools import num_to_uint16, uint_to_num
+from avalanche.tools import num_to_uint16
 
-from ..base import DataStructure
+from ..base import UINT32, DataStructure, unpack_bytes, unpack_uint32
 from .inout import SECPTransferOutput
 
 
@@ -11,38 +11,47 @@ class UTXO(DataStructure):
     A UTXO is a standalone representation of a transaction output.
     """
     CODEC_ID = num_to_uint16(0)
+    __slots__ = ('tx_id', 'output_index', 'asset_id', 'output')
 
-    def __init__(self, tx_id: bytes, output_index: bytes, asset_id: bytes, output: SECPTransferOutput):
-        self.codec_id = self.CODEC_ID
+    def __init__(self, tx_id: bytes, output_index: int, asset_id: bytes, output: SECPTransferOutput):
         self.tx_id = tx_id
         self.output_index = output_index
         self.asset_id = asset_id
         self.output = output
-        assert len(self.codec_id) == 2
         assert len(self.tx_id) == 32
-        assert len(self.output_index) == 4
         assert len(self.asset_id) == 32
 
-    def to_bytes(self):
-        return self.codec_id + self.tx_id + self.output_index + self.asset_id + self.output.to_bytes()
+    def write_into(self, buf: bytearray):
+        buf += self.CODEC_ID
+        buf += self.tx_id
+        buf += UINT32.pack(self.output_index)
+        buf += self.asset_id
+        self.output.write_into(buf)
 
     def __len__(self):
         return 70 + len(self.output)
 
+    @staticmethod
+    def id_from_bytes(raw: bytes) -> tuple[bytes, int]:
+        """
+        The (tx_id, output_index) pair identifying a serialized UTXO, without decoding the output.
+        """
+        return bytes(raw[2:34]), UINT32.unpack_from(raw, 34)[0]
+
     @classmethod
-    def from_bytes(cls, raw: bytes):
-        codec_id = raw[0:2]
+    def from_buffer(cls, buf: memoryview, offset: int = 0):
+        codec_id, offset = unpack_bytes(buf, offset, 2)
         assert codec_id == cls.CODEC_ID
-        tx_id = raw[2:34]
-        utxo_index = raw[34:38]
-        asset_id = raw[38:70]
-        output = SECPTransferOutput.from_bytes(raw[70:])
-        return cls(tx_id, utxo_index, asset_id, output)
+        tx_id, offset = unpack_bytes(buf, offset, 32)
+        utxo_index, offset = unpack_uint32(buf, offset)
+        asset_id, offset = unpack_bytes(buf, offset, 32)
+        output, offset = SECPTransferOutput.from_buffer(buf, offset)
+        return cls(tx_id, utxo_index, asset_id, output), offset
 
     def to_dict(self) -> dict:
         return {
             'tx_id': HexBytes(self.tx_id).hex(),
-            'output_index': uint_to_num(self.output_index),
+            'output_index': self.output_index,
             'asset_id': HexBytes(self.asset_id).hex(),
             'output': self.output.to_dict()
         }
@@ -10,6 +10,7 @@ class PlatformImportTx(AVMImportTx):
     """
     TYPE_ID = num_to_uint32(0x00000011)
     SOURCE_CHAIN = PChainAlias
+    __slots__ = ()
 
 
 class PlatformExportTx(AVMExportTx):
@@ -18,3 +19,4 @@ class PlatformExportTx(AVMExportTx):
     """
     TYPE_ID = num_to_uint32(0x00000012)
     SOURCE_CHAIN = PChainAlias
+    __slots__ = ()
@@ -6,10 +6,10 @@ https://docs.avax.network/specs/coreth-atomic-transaction-serialization
 
 import hashlib
 
-from avalanche.tools import num_to_uint16, num_to_uint32, uint_to_num
+from avalanche.tools import num_to_uint16, uint_to_num
 
 from .avm.tx import AVMExportTx, AVMImportTx
-from .base import DataStructure
+from .base import DataStructure, unpack_bytes, write_list
 from .credential import Credential
 from .evm.tx import EVMExportTx, EVMImportTx
 from .platform.tx import PlatformExportTx, PlatformImportTx
@@ -28,28 +28,42 @@ class UnsignedTransaction(DataStructure):
         PlatformExportTx.TYPE_ID: PlatformExportTx,
         PlatformImportTx.TYPE_ID: PlatformImportTx,
     }
+    __slots__ = ('codec_id', 'atomic_tx', '_bytes', '_hash')
 
     def __init__(self, atomic_tx: AtomicTx):
+        """
+        The atomic transaction must not be modified once it is wrapped, its bytes and
+        hash are computed once and then cached.
+        """
         self.codec_id = num_to_uint16(0)
         self.atomic_tx = atomic_tx
+        self._bytes = None
+        self._hash = None
         assert len(self.codec_id) == 2
 
+    def write_into(self, buf: bytearray):
+        buf += self.to_bytes()
+
     def to_bytes(self) -> bytes:
-        return self.codec_id + self.atomic_tx.to_bytes()
+        if self._bytes is None:
+            buf = bytearray(self.codec_id)
+            self.atomic_tx.write_into(buf)
+            self._bytes = bytes(buf)
+        return self._bytes
 
     def hash(self) -> bytes:
-        m = hashlib.sha256()
-        m.update(self.to_bytes())
-        return m.digest()
+        if self._hash is None:
+            self._hash = hashlib.sha256(self.to_bytes()).digest()
+        return self._hash
 
     @classmethod
-    def from_bytes(cls, raw: bytes):
-        codec_id = uint_to_num(raw[0:2])
-        assert codec_id == 0
-        type_id = raw[2:6]
+    def from_buffer(cls, buf: memoryview, offset: int = 0):
+        codec_id, offset = unpack_bytes(buf, offset, 2)
+        assert uint_to_num(codec_id) == 0
+        type_id, _ = unpack_bytes(buf, offset, 4)
         AtomicTxClass = cls.TYPE_MAP[type_id]
-        atomic_tx = AtomicTxClass.from_bytes(raw[2:])
-        return cls(atomic_tx)
+        atomic_tx, offset = AtomicTxClass.from_buffer(buf, offset)
+        return cls(atomic_tx), offset
 
     def get_tx_type(self):
         return self.TYPE_MAP[self.atomic_tx.TYPE_ID]
@@ -69,6 +83,7 @@ class SignedTransaction(DataStructure):
     Contains an unsigned AtomicTX and credentials.
     """
     CODEC_ID = num_to_uint16(0)
+    __slots__ = ('codec_id', 'atomic_tx', 'credentials')
 
     def __init__(self, atomic_tx: AtomicTx, credentials: list[Credential]):
         self.codec_id = self.CODEC_ID
@@ -76,13 +91,10 @@ class SignedTransaction(DataStructure):
         self.credentials = credentials
         assert len(self.codec_id) == 2
 
-    def _credentials_bytes(self) -> bytes:
-        credential_byte_list = [credential.to_bytes() for credential in self.credentials]
-        num_credentials = num_to_uint32(len(self.credentials))
-        return num_credentials + b''.join(credential_byte_list)
-
-    def to_bytes(self) -> bytes:
-        return self.codec_id + self.atomic_tx.to_bytes() + self._credentials_bytes()
+    def write_into(self, buf: bytearray):
+        buf += self.codec_id
+        self.atomic_tx.write_into(buf)
+        write_list(self.credentials, buf)
 
     def to_dict(self) -> dict:
         return {
@@ -0,0 +1,54 @@
+"""
+Encodings AvalancheGo accepts for transactions and UTXOs. Both append a 4 byte sha256
+checksum to the data. Hex is far cheaper to encode and decode than CB58, so it is the
+default, but CB58 is still read so that existing data remains usable.
+"""
+import hashlib
+from typing import Iterable
+
+from avalanche.base58 import Base58Decoder, Base58Encoder
+
+CB58 = 'cb58'
+HEX = 'hex'
+
+ENCODINGS = (CB58, HEX)
+
+CHECKSUM_BYTE_LEN = 4
+
+
+def _checksum(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()[-CHECKSUM_BYTE_LEN:]
+
+
+def detect_encoding(data: str) -> str:
+    return HEX if data.startswith('0x') else CB58
+
+
+def encode(data: bytes, encoding: str = HEX) -> str:
+    if encoding == HEX:
+        return '0x' + (data + _checksum(data)).hex()
+    if encoding == CB58:
+        return Base58Encoder.CheckEncode(data)
+    raise ValueError(f'Unsupported encoding {encoding}')
+
+
+def decode(data: str, encoding: str = None) -> bytes:
+    """
+    Decode data in the given encoding, checking the checksum. If no encoding is
+    given it is detected from the data.
+    """
+    if encoding is None:
+        encoding = detect_encoding(data)
+    if encoding == HEX:
+        raw = bytes.fromhex(data[2:] if data.startswith('0x') else data)
+        value, checksum = raw[:-CHECKSUM_BYTE_LEN], raw[-CHECKSUM_BYTE_LEN:]
+        if checksum != _checksum(value):
+            raise ValueError('Invalid checksum')
+        return value
+    if encoding == CB58:
+        return Base58Decoder.CheckDecode(data)
+    raise ValueError(f'Unsupported encoding {encoding}')
+
+
+def decode_many(data_list: Iterable[str], encoding: str = None) -> list[bytes]:
+    return [decode(data, encoding) for data in data_list]
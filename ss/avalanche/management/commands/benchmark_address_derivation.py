@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from avalanche.bech32 import bech32_address_from_public_key
+from common.bip import Bip44Coins
+from common.bip.bip32 import eth_address_from_public_key, fireblocks_public_key
+from common.bip.derivation import derive_addresses
+
+
+class Command(BaseCommand):
+    help = 'Compare bulk address derivation against repeated fireblocks_public_key calls.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='44/1/0/0', help='Parent derivation path')
+        parser.add_argument('--start', type=int, default=0)
+        parser.add_argument('--count', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=1, help='Processes used for bulk derivation')
+
+    def _derive_individually(self, prefix: str, start: int, count: int):
+        for index in range(start, start + count):
+            pub_key = fireblocks_public_key(f'{prefix}/{index}').ToBytes()
+            eth_address_from_public_key(pub_key)
+            bech32_address_from_public_key(pub_key, Bip44Coins.FB_P_CHAIN)
+            bech32_address_from_public_key(pub_key, Bip44Coins.FB_X_CHAIN)
+
+    def _time(self, label: str, count: int, func, *args, **kwargs) -> float:
+        started = time.perf_counter()
+        func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{label}: {elapsed:.3f}s ({count / elapsed:.0f} addresses/s)')
+        return elapsed
+
+    def handle(self, *args, **options):
+        prefix = options['prefix'].strip('/')
+        start, count, workers = options['start'], options['count'], options['workers']
+
+        individual = self._time('fireblocks_public_key', count, self._derive_individually, prefix, start, count)
+        bulk = self._time(f'derive_addresses ({workers} workers)', count,
+                          lambda: sum(1 for _ in derive_addresses(prefix, start, count, workers=workers)))
+        self.stdout.write(self.style.SUCCESS(f'Bulk derivation is {individual / bulk:.1f}x faster'))
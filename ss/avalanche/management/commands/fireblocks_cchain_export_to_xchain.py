@@ -1,15 +1,15 @@
 from hexbytes import HexBytes
 
-from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from avalanche.api import AvalancheClient
+from avalanche.api import get_avalanche_client
 from avalanche.base58 import Base58Decoder, Base58Encoder
 from avalanche.bech32 import bech32_address_from_public_key, bech32_to_bytes
 from avalanche.constants import DEFAULTS
 from avalanche.datastructures import SECP256K1Credential, SignedTransaction, UnsignedTransaction
 from avalanche.datastructures.evm import EVMExportTx, EVMInput, SECPTransferOutput, TransferableOutput
-from avalanche.tools import num_to_uint32, num_to_uint64
+from avalanche.encoding import CB58
+from avalanche.tools import num_to_uint32
 from avalanche.web3 import AvaWeb3
 from common.bip.bip32 import fireblocks_public_key
 from common.bip.bip44_coins import Bip44Coins
@@ -69,14 +69,14 @@ class Command(BaseCommand):
         export_fee = 350937
         nonce = self.get_nonce('0x37925525b620412183D4d8F71e6f64b5e64420C4')
 
-        locktime = num_to_uint64(0)
-        threshold = num_to_uint32(1)
+        locktime = 0
+        threshold = 1
         network_id = num_to_uint32(5)
 
         print('-----------Inputs / Outputs ---------')
-        in1 = EVMInput(c_address, num_to_uint64(amount + export_fee), avax_asset_id_buf, num_to_uint64(nonce))
+        in1 = EVMInput(c_address, amount + export_fee, avax_asset_id_buf, nonce)
         print(in1.to_hex())
-        sec_out = SECPTransferOutput(num_to_uint64(amount), locktime, threshold, [x_address])
+        sec_out = SECPTransferOutput(amount, locktime, threshold, [x_address])
         print(sec_out.to_hex())
         xfer_out = TransferableOutput(avax_asset_id_buf, sec_out)
         print(xfer_out.to_hex())
@@ -104,7 +104,7 @@ class Command(BaseCommand):
         b58_signed_tx = Base58Encoder.CheckEncode(signed_tx.to_bytes())
         print(b58_signed_tx)
         print('-----------Transmission to Network-----------')
-        client = AvalancheClient(RPC_URL=settings.AVAX_RPC_URL)
-        response = client.evm_issue_tx(tx=b58_signed_tx)
+        client = get_avalanche_client()
+        response = client.evm_issue_tx(tx=b58_signed_tx, encoding=CB58)
         if response.status_code == 200:
             print(response.json())
@@ -1,9 +1,8 @@
 from hexbytes import HexBytes
 
-from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from avalanche.api import AvalancheClient
+from avalanche.api import get_avalanche_client
 from avalanche.base58 import Base58Decoder, Base58Encoder
 from avalanche.bech32 import bech32_address_from_public_key, bech32_to_bytes
 from avalanche.constants import DEFAULTS
@@ -11,7 +10,8 @@ from avalanche.datastructures import SECP256K1Credential, SignedTransaction, Uns
 from avalanche.datastructures.avm import AVMImportTx, BaseTx
 from avalanche.datastructures.evm import (UTXO, SECPTransferInput, SECPTransferOutput, TransferableInput,
                                           TransferableOutput)
-from avalanche.tools import num_to_uint32, num_to_uint64, uint_to_num
+from avalanche.encoding import CB58
+from avalanche.tools import num_to_uint32
 from common.bip.bip32 import fireblocks_public_key
 from common.bip.bip44_coins import Bip44Coins
 from fireblocks.client import get_fireblocks_client
@@ -32,8 +32,8 @@ class Command(BaseCommand):
     def get_utxos(self):
         address = self._get_x_chain_bech32()
         c_chain_blockchain_id_str: str = DEFAULTS['networks'][self.network_id]['C']['blockchainID']
-        client = AvalancheClient(RPC_URL=settings.AVAX_RPC_URL)
-        response = client.avm_get_utxos(addresses=[address], source_chain=c_chain_blockchain_id_str)
+        client = get_avalanche_client()
+        response = client.avm_get_utxos(addresses=[address], source_chain=c_chain_blockchain_id_str, encoding=CB58)
         print(response.json())
         return response.json()
 
@@ -52,20 +52,20 @@ class Command(BaseCommand):
 
             amount = utxo.output.amount
             fee = 1000000
-            amt = uint_to_num(amount) - fee
+            amt = amount - fee
             asset_id = utxo.asset_id
-            locktime = num_to_uint64(0)
-            threshold = num_to_uint32(1)
+            locktime = 0
+            threshold = 1
             x_address = self._get_x_chain_address()
 
             print('-----------Outputs ---------')
-            sec_out = SECPTransferOutput(num_to_uint64(amt), locktime, threshold, [x_address])
+            sec_out = SECPTransferOutput(amt, locktime, threshold, [x_address])
             print(sec_out.to_hex())
             xfer_out = TransferableOutput(asset_id, sec_out)
             outputs.append(xfer_out)
             print(xfer_out.to_hex())
             print('-----------Inputs ---------')
-            index = num_to_uint32(0)
+            index = 0
             sec_in = SECPTransferInput(amount=amount, address_indices=[index])
             print(sec_in.to_hex())
             xfer_in = TransferableInput(tx_id=utxo.tx_id, utxo_index=utxo.output_index, asset_id=asset_id,
@@ -134,7 +134,7 @@ class Command(BaseCommand):
         b58_signed_tx = Base58Encoder.CheckEncode(signed_tx.to_bytes())
         print(b58_signed_tx)
         print('-----------Transmission to Network-----------')
-        client = AvalancheClient(RPC_URL=settings.AVAX_RPC_URL)
-        response = client.avm_issue_tx(tx=b58_signed_tx)
+        client = get_avalanche_client()
+        response = client.avm_issue_tx(tx=b58_signed_tx, encoding=CB58)
         if response.status_code == 200:
             print(response.json())
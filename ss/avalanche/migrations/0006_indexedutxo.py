@@ -0,0 +1,43 @@
+# Generated by Django 4.0.4 on 2026-10-18 08:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avalanche', '0005_alter_chainswap_import_tx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexedUTXO',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('modified_date', models.DateTimeField(auto_now=True)),
+                ('tx_id', models.CharField(help_text='Hex encoded ID of the transaction that created the UTXO', max_length=64)),
+                ('output_index', models.PositiveIntegerField()),
+                ('chain', models.CharField(help_text='Chain alias the UTXO can be spent on', max_length=1)),
+                ('source_chain', models.CharField(blank=True, help_text='Chain alias the UTXO was exported from, blank if not in shared memory', max_length=1)),
+                ('address', models.TextField(help_text='Bech32 address holding the UTXO')),
+                ('asset_id', models.CharField(help_text='Hex encoded asset ID', max_length=64)),
+                ('amount', models.PositiveBigIntegerField(help_text='Amount in nAVAX')),
+                ('raw', models.BinaryField(help_text='Serialized UTXO')),
+                ('spent', models.BooleanField(default=False)),
+                ('spent_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='spent_utxos', to='avalanche.atomictx')),
+            ],
+            options={
+                'ordering': ['created_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='indexedutxo',
+            index=models.Index(fields=['chain', 'source_chain', 'address', 'spent'], name='avalanche_i_chain_3f5d13_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='indexedutxo',
+            constraint=models.UniqueConstraint(fields=('tx_id', 'output_index'), name='unique_utxo_id'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0.4 on 2026-10-18 08:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avalanche', '0006_indexedutxo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='indexedutxo',
+            name='reserved_by',
+            field=models.ForeignKey(blank=True, help_text='Transaction being built or in flight that will spend this UTXO', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reserved_utxos', to='avalanche.atomictx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.4 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avalanche', '0007_indexedutxo_reserved_by'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='atomictx',
+            name='signed_transaction',
+            field=models.TextField(blank=True, help_text='Hex (or CB58) encoded signed transaction'),
+        ),
+        migrations.AlterField(
+            model_name='atomictx',
+            name='unsigned_transaction',
+            field=models.TextField(blank=True, help_text='Hex (or CB58) encoded unsigned transaction'),
+        ),
+    ]
@@ -1,20 +1,27 @@
 import logging
 import uuid
+from functools import lru_cache
 
 from django_fsm import FSMField, transition
 from extended_choices import Choices
 
 from django.db import models
 
-from avalanche.base58 import Base58Decoder
 from avalanche.datastructures import UnsignedTransaction
+from avalanche.datastructures.evm import UTXO
 from avalanche.datastructures.types import AtomicTx as AtomicTxType
+from avalanche.encoding import decode
 from common.constants import MAX_DEC_PLACES
 from common.validators import validate_p_or_c, validate_positive
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _decode_unsigned_transaction(unsigned_transaction: str) -> UnsignedTransaction:
+    return UnsignedTransaction.from_bytes(decode(unsigned_transaction))
+
+
 class AtomicTx(models.Model):
     """
     An export or import transaction on the avalanche network.
@@ -43,10 +50,10 @@ class AtomicTx(models.Model):
                                  help_text="Amount in AVAX")
     description = models.TextField()
 
-    unsigned_transaction = models.TextField(blank=True, help_text="Base58 encoded unsigned transaction")
+    unsigned_transaction = models.TextField(blank=True, help_text="Hex (or CB58) encoded unsigned transaction")
     fireblocks_tx_id = models.TextField(blank=True)
 
-    signed_transaction = models.TextField(blank=True, help_text="Base58 encoded signed transaction")
+    signed_transaction = models.TextField(blank=True, help_text="Hex (or CB58) encoded signed transaction")
     status = FSMField(max_length=30, choices=STATUS, default=STATUS.NEW)
     avalanche_tx_id = models.TextField(blank=True)
 
@@ -57,12 +64,24 @@ class AtomicTx(models.Model):
         return f'AtomicTx({self.id})'
 
     def get_unsigned_transaction(self) -> UnsignedTransaction:
-        data = Base58Decoder.CheckDecode(str(self.unsigned_transaction))
-        return UnsignedTransaction.from_bytes(data)
+        """
+        The decoded transaction is cached on the instance and per process by the encoded
+        value, so a row is decoded at most once. The result must not be modified.
+        """
+        unsigned_transaction = str(self.unsigned_transaction)
+        cached = getattr(self, '_unsigned_transaction_cache', None)
+        if cached is None or cached[0] != unsigned_transaction:
+            cached = (unsigned_transaction, _decode_unsigned_transaction(unsigned_transaction))
+            self._unsigned_transaction_cache = cached
+        return cached[1]
 
     def get_atomic_transaction(self) -> AtomicTxType:
         return self.get_unsigned_transaction().atomic_tx
 
+    def release_utxos(self):
+        # Let UTXOs this transaction would have spent be used by another
+        self.reserved_utxos.filter(spent=False).update(reserved_by=None)
+
     @transition(field=status, source=STATUS.NEW, target=STATUS.SUBMITTED)
     def submit(self):
         # Send transaction to Fireblocks for signing
@@ -85,16 +104,16 @@ class AtomicTx(models.Model):
 
     @transition(field=status, source=STATUS.BROADCAST, target=STATUS.CONFIRMED)
     def confirm(self):
-        # Transaction successfully broadcast, tx_id returned
+        # Transaction accepted by the Avalanche network
         pass
 
     @transition(field=status, source=[STATUS.NEW], target=STATUS.REJECTED)
     def reject(self):
-        pass
+        self.release_utxos()
 
     @transition(field=status, source=[STATUS.NEW, STATUS.SUBMITTED, STATUS.BROADCAST], target=STATUS.FAILED)
     def fail(self):
-        pass
+        self.release_utxos()
 
 
 class ChainSwap(models.Model):
@@ -168,3 +187,45 @@ class ChainSwap(models.Model):
     @transition(field=status, source=[STATUS.EXPORTING, STATUS.IMPORTING], target=STATUS.FAILED)
     def fail(self):
         pass
+
+
+class IndexedUTXO(models.Model):
+    """
+    A UTXO held by one of our addresses, as last seen on the Avalanche network.
+    Kept up to date from getUTXOs and from the atomic transactions we issue, so that
+    transactions can be built from a database query rather than a scan of the node.
+    """
+    created_date = models.DateTimeField(auto_now_add=True)
+    modified_date = models.DateTimeField(auto_now=True)
+
+    tx_id = models.CharField(max_length=64, help_text='Hex encoded ID of the transaction that created the UTXO')
+    output_index = models.PositiveIntegerField()
+    chain = models.CharField(max_length=1, help_text='Chain alias the UTXO can be spent on')
+    source_chain = models.CharField(max_length=1, blank=True,
+                                    help_text='Chain alias the UTXO was exported from, blank if not in shared memory')
+    address = models.TextField(help_text='Bech32 address holding the UTXO')
+    asset_id = models.CharField(max_length=64, help_text='Hex encoded asset ID')
+    amount = models.PositiveBigIntegerField(help_text='Amount in nAVAX')
+    raw = models.BinaryField(help_text='Serialized UTXO')
+
+    reserved_by = models.ForeignKey('AtomicTx', on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='reserved_utxos',
+                                    help_text='Transaction being built or in flight that will spend this UTXO')
+    spent = models.BooleanField(default=False)
+    spent_by = models.ForeignKey('AtomicTx', on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='spent_utxos')
+
+    class Meta:
+        ordering = ['created_date']
+        constraints = [
+            models.UniqueConstraint(fields=['tx_id', 'output_index'], name='unique_utxo_id'),
+        ]
+        indexes = [
+            models.Index(fields=['chain', 'source_chain', 'address', 'spent']),
+        ]
+
+    def __str__(self):
+        return f'IndexedUTXO({self.tx_id}:{self.output_index})'
+
+    def get_utxo(self) -> UTXO:
+        return UTXO.from_bytes(bytes(self.raw))
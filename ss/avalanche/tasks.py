@@ -2,9 +2,15 @@ import logging
 
 from celery import shared_task
 
+from django.conf import settings
+
 from .models import AtomicTx, ChainSwap
+from .utils.cchain_import_from_pchain import CChainImportFromPChain
 from .utils.chain_swap import create_import_tx
-from .utils.tx_builder import broadcast_transaction, check_for_signature, send_for_signing
+from .utils.pchain_export_to_cchain import PChainExportToCChain
+from .utils.pchain_import_from_cchain import PChainImportFromCChain
+from .utils.tx_builder import (broadcast_transaction, check_batch_for_signature, check_for_signature,
+                               check_transaction_status, send_batch_for_signing, send_for_signing)
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +22,42 @@ def process_atomic_transaction():
     Check all transactions in the AWAITING_SIGNATURE state. Once signatures are ready will be turned into signed
     transactions, ready for transmission.
     Check all transactions in the SIGNED state. Broadcast these transactions to the avalanche network.
+    Check all transactions in the BROADCAST state. Confirm these once accepted by the avalanche network.
     """
     logger.info('Processing atomic transactions')
-    for tx in AtomicTx.objects.filter(status=AtomicTx.STATUS.NEW):
-        logger.info(f'Sending transaction {tx} with status: {tx.status} for signing')
-        send_for_signing(tx)
-    for tx in AtomicTx.objects.filter(status=AtomicTx.STATUS.AWAITING_SIGNATURE):
-        logger.info(f'Checking transaction {tx} with status: {tx.status} for signature')
-        check_for_signature(tx)
+    if settings.FIREBLOCKS_BATCH_SIGNING:
+        new_txs = list(AtomicTx.objects.filter(status=AtomicTx.STATUS.NEW))
+        logger.info(f'Sending {len(new_txs)} transactions for signing as one batch')
+        send_batch_for_signing(new_txs)
+        awaiting_txs = list(AtomicTx.objects.filter(status=AtomicTx.STATUS.AWAITING_SIGNATURE))
+        logger.info(f'Checking {len(awaiting_txs)} transactions for signature')
+        check_batch_for_signature(awaiting_txs)
+    else:
+        for tx in AtomicTx.objects.filter(status=AtomicTx.STATUS.NEW):
+            logger.info(f'Sending transaction {tx} with status: {tx.status} for signing')
+            send_for_signing(tx)
+        for tx in AtomicTx.objects.filter(status=AtomicTx.STATUS.AWAITING_SIGNATURE):
+            logger.info(f'Checking transaction {tx} with status: {tx.status} for signature')
+            check_for_signature(tx)
     for tx in AtomicTx.objects.filter(status=AtomicTx.STATUS.SIGNED):
         logger.info(f'Broadcasting transaction {tx} with status: {tx.status}')
         broadcast_transaction(tx)
+    broadcast_txs = list(AtomicTx.objects.filter(status=AtomicTx.STATUS.BROADCAST).exclude(avalanche_tx_id=''))
+    if broadcast_txs:
+        logger.info(f'Checking status of {len(broadcast_txs)} broadcast transactions')
+        check_transaction_status(broadcast_txs)
+
+
+@shared_task
+def sync_utxo_index():
+    """
+    Bring the UTXO index up to date with the node for every builder that spends UTXOs.
+    Transactions we issue update the index once confirmed, this picks up everything else,
+    such as UTXOs received from elsewhere. Builders only read the index.
+    """
+    logger.info('Syncing UTXO index')
+    for builder in (PChainExportToCChain, CChainImportFromPChain, PChainImportFromCChain):
+        builder(network_id=settings.NETWORK_ID).sync_utxos()
 
 
 @shared_task
@@ -0,0 +1,15 @@
+"""
+Transactions shared by the avalanche tests.
+"""
+
+# Unsigned P-Chain export to C-Chain, spending two UTXOs
+PCHAIN_EXPORT = bytes.fromhex(
+    '00000000001200000005000000000000000000000000000000000000000000000000000000000000000000000'
+    '00000000002b17d5b96f75198af0a0347588b3305978667baa3629894085e42045074c76782000000003d9bdac0'
+    'ed1d761330cf680efdeb1a42159eb387d6d2950c96f7d28f61bbe2aa00000005000000003b9aca0000000001000'
+    '00000823904f704522e7ab5e4c161d0e02e089b0383600ba28836aba44e4cacca08c2000000003d9bdac0ed1d76'
+    '1330cf680efdeb1a42159eb387d6d2950c96f7d28f61bbe2aa00000005000000003b9aca0000000001000000000'
+    '000001c464220502d436861696e206578706f727420746f20432d436861696e7fc93d85c6d62c5b2ac0b519c870'
+    '10ea5294012d1e407030d6acd0021cac10d5000000013d9bdac0ed1d761330cf680efdeb1a42159eb387d6d2950'
+    'c96f7d28f61bbe2aa00000007000000003b8b87c000000000000000000000000100000001e5649e7ec3f3be0117'
+    'd9828db8be18f0eb3dea9b')
@@ -3,8 +3,9 @@ from hexbytes import HexBytes
 from django.test import TestCase
 
 from avalanche.bech32 import address_from_public_key, bech32_address_from_public_key
-from common.bip.bip32 import eth_address_from_public_key
+from common.bip.bip32 import derive_range, eth_address_from_public_key, fireblocks_public_key
 from common.bip.bip44_coins import Bip44Coins
+from common.bip.derivation import derive_addresses
 
 
 class AddressDerivationTestCase(TestCase):
@@ -23,3 +24,27 @@ class AddressDerivationTestCase(TestCase):
         pub_key = HexBytes('03e41e35a559e169f80f5241c518580e15cfc7f497d4ab3e580ff4e6c03b2f5219')
         addr = bech32_address_from_public_key(pub_key, Bip44Coins.FB_C_CHAIN)
         self.assertEqual(addr, 'C-fuji1p57arzes0y609q57fu4gtwd8ervwfy0nzdrlu2')
+
+    def test_derive_range(self):
+        keys = derive_range('44/1/0/0', 3, 2)
+        self.assertEqual([path for path, _ in keys], ['44/1/0/0/3', '44/1/0/0/4'])
+        for path, pub_key in keys:
+            self.assertEqual(pub_key.ToBytes(), fireblocks_public_key(path).ToBytes())
+
+    def test_bech32_address_derivation_cached(self):
+        pub_key = fireblocks_public_key('44/1/0/0/0').ToBytes()
+        self.assertIs(bech32_address_from_public_key(pub_key, Bip44Coins.FB_P_CHAIN),
+                      bech32_address_from_public_key(pub_key, Bip44Coins.FB_P_CHAIN))
+        self.assertNotEqual(bech32_address_from_public_key(pub_key, Bip44Coins.FB_P_CHAIN),
+                            bech32_address_from_public_key(pub_key, Bip44Coins.FB_X_CHAIN))
+
+    def test_derive_addresses(self):
+        addresses = list(derive_addresses('44/1/0/0', 0, 5, chunk_size=2))
+        self.assertEqual([address.path for address in addresses], [f'44/1/0/0/{i}' for i in range(5)])
+        for address in addresses:
+            pub_key = fireblocks_public_key(address.path).ToBytes()
+            self.assertEqual(address.public_key, pub_key)
+            self.assertEqual(address.eth_address, eth_address_from_public_key(pub_key))
+            self.assertEqual(address.p_address, bech32_address_from_public_key(pub_key, Bip44Coins.FB_P_CHAIN))
+            self.assertEqual(address.x_address, bech32_address_from_public_key(pub_key, Bip44Coins.FB_X_CHAIN))
+        self.assertEqual(list(derive_addresses('44/1/0/0', 0, 5, workers=2, chunk_size=2)), addresses)
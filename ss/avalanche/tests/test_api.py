@@ -1,13 +1,19 @@
+import asyncio
 import json
 import time
 from unittest import mock
 
+import aiohttp
+import requests
 from web3 import Web3
 from web3.types import Wei
 
 from django.test import TestCase
 
+from ..api import AsyncAvalancheClient, AvalancheClient, get_avalanche_client
 from ..api.validator import Delegator, Validator
+from ..datastructures.evm import UTXO, SECPTransferOutput
+from ..encoding import CB58, HEX, encode
 
 
 class APITestCase(TestCase):
@@ -69,3 +75,187 @@ class APITestCase(TestCase):
         one_year = 60 * 60 * 24 * 365
         validator = Validator("foo", 0, Web3.toWei(0, "ether"), 1, time.time() + one_year, [])
         self.assertEqual(validator.remaining_time, one_year)
+
+
+def _response(status_code, data=None):
+    response = mock.MagicMock(status_code=status_code)
+    response.json.return_value = data
+    return response
+
+
+@mock.patch('avalanche.api.api.time.sleep', mock.MagicMock())
+class AvalancheClientTestCase(TestCase):
+
+    def setUp(self):
+        self.client = AvalancheClient(rpc_url='http://node:9650', max_retries=2)
+        self.client.session = mock.MagicMock()
+
+    def test_shared_client_is_reused(self):
+        self.assertIs(get_avalanche_client(), get_avalanche_client())
+
+    def test_read_uses_session_and_timeout(self):
+        self.client.session.post.return_value = _response(200)
+        self.client.evm_get_atomic_tx('tx')
+        self.client.session.post.assert_called_once()
+        args, kwargs = self.client.session.post.call_args
+        self.assertEqual(args[0], 'http://node:9650/ext/bc/C/avax')
+        self.assertEqual(kwargs['timeout'], self.client.timeout)
+
+    def test_read_retried_on_server_error(self):
+        self.client.session.post.side_effect = [_response(503), requests.ConnectionError(), _response(200)]
+        response = self.client.platform_get_utxos(['P-fuji1'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.session.post.call_count, 3)
+
+    def test_read_gives_up_after_max_retries(self):
+        self.client.session.post.side_effect = requests.Timeout()
+        with self.assertRaises(requests.Timeout):
+            self.client.avm_get_utxos(['X-fuji1'])
+        self.assertEqual(self.client.session.post.call_count, 3)
+
+    def test_issue_tx_is_not_retried(self):
+        self.client.session.post.return_value = _response(503)
+        response = self.client.platform_issue_tx('tx')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.client.session.post.call_count, 1)
+
+    def test_request_ids_are_unique(self):
+        self.client.session.post.return_value = _response(200)
+        self.client.evm_get_atomic_tx('a')
+        self.client.evm_get_atomic_tx('b')
+        ids = [c.kwargs['json']['id'] for c in self.client.session.post.call_args_list]
+        self.assertEqual(len(set(ids)), 2)
+
+    def test_batch_groups_calls_by_endpoint(self):
+        def post(url, json, timeout):
+            return _response(200, [{'jsonrpc': '2.0', 'id': body['id'], 'result': body['method']}
+                                   for body in reversed(json)])
+        self.client.session.post.side_effect = post
+
+        with self.client.batch() as batch:
+            first = batch.evm_get_atomic_tx('a')
+            second = batch.evm_get_atomic_tx('b')
+            utxos = batch.platform_get_utxos(['P-fuji1'])
+            self.assertEqual(len(batch), 3)
+            with self.assertRaises(Exception):
+                first.json()
+
+        self.assertEqual(self.client.session.post.call_count, 2)
+        self.assertEqual(first.json()['id'], first.request_id)
+        self.assertEqual(second.json()['id'], second.request_id)
+        self.assertNotEqual(first.request_id, second.request_id)
+        self.assertEqual(utxos.status_code, 200)
+        self.assertEqual(utxos.json()['result'], 'platform.getUTXOs')
+
+    def test_batch_error_applies_to_all_calls(self):
+        self.client.session.post.return_value = _response(500)
+        batch = self.client.batch()
+        first = batch.evm_get_atomic_tx('a')
+        second = batch.evm_get_atomic_tx('b')
+        batch.send()
+        self.assertEqual(first.status_code, 500)
+        self.assertIn('error', second.json())
+
+    def test_batch_with_issue_tx_is_not_retried(self):
+        self.client.session.post.return_value = _response(503)
+        with self.client.batch() as batch:
+            batch.evm_get_atomic_tx('a')
+            batch.evm_issue_tx('tx')
+        self.assertEqual(self.client.session.post.call_count, 1)
+
+    def test_batch_only_has_request_methods(self):
+        batch = self.client.batch()
+        for name in ('platform_get_current_validators', 'iter_utxos', 'iter_utxo_bytes', 'batch'):
+            self.assertFalse(hasattr(batch, name), name)
+
+    def _encoded_utxo(self, index: int, encoding=HEX) -> str:
+        output = SECPTransferOutput(1000 + index, 0, 1, [bytes(20)])
+        utxo = UTXO(bytes(32), index, bytes(32), output)
+        return encode(utxo.to_bytes(), encoding)
+
+    def test_iter_utxos_follows_end_index(self):
+        pages = [
+            {'numFetched': '2', 'utxos': [self._encoded_utxo(0), self._encoded_utxo(1)],
+             'endIndex': {'address': 'P-fuji1', 'utxo': 'b'}},
+            # Paging may repeat the last UTXO of the previous page
+            {'numFetched': '2', 'utxos': [self._encoded_utxo(1), self._encoded_utxo(2)],
+             'endIndex': {'address': 'P-fuji1', 'utxo': 'c'}},
+            {'numFetched': '1', 'utxos': [self._encoded_utxo(3)], 'endIndex': {'address': 'P-fuji1', 'utxo': 'd'}},
+        ]
+        self.client.session.post.side_effect = [_response(200, {'result': page}) for page in pages]
+
+        utxos = self.client.iter_utxos('P', ['P-fuji1'], limit=2)
+        first = next(utxos)
+        self.assertIsInstance(first, UTXO)
+        # Only the first page has been requested so far
+        self.assertEqual(self.client.session.post.call_count, 1)
+
+        rest = list(utxos)
+        self.assertEqual([u.output_index for u in [first] + rest], [0, 1, 2, 3])
+        self.assertEqual(rest[-1].output.amount, 1003)
+        bodies = [c.kwargs['json'] for c in self.client.session.post.call_args_list]
+        self.assertEqual(bodies[0]['params']['encoding'], HEX)
+        self.assertNotIn('startIndex', bodies[0]['params'])
+        self.assertEqual(bodies[1]['params']['startIndex'], pages[0]['endIndex'])
+        self.assertEqual(bodies[2]['params']['startIndex'], pages[1]['endIndex'])
+
+    def test_iter_utxos_cb58(self):
+        self.client = AvalancheClient(rpc_url='http://node:9650', encoding=CB58)
+        self.client.session = mock.MagicMock()
+        page = {'numFetched': '1', 'utxos': [self._encoded_utxo(7, CB58)], 'encoding': CB58,
+                'endIndex': {'address': 'C-fuji1', 'utxo': 'a'}}
+        self.client.session.post.return_value = _response(200, {'result': page})
+        utxos = list(self.client.iter_utxos('C', ['C-fuji1'], source_chain='P'))
+        self.assertEqual(utxos[0].output_index, 7)
+        self.assertEqual(self.client.session.post.call_args.kwargs['json']['params']['encoding'], CB58)
+
+    def test_iter_utxos_error(self):
+        self.client.session.post.return_value = _response(200, {'error': {'message': 'bad address'}})
+        with self.assertRaises(Exception):
+            list(self.client.iter_utxos('X', ['X-fuji1']))
+
+
+def _async_response(status, data=None):
+    response = mock.MagicMock(status=status)
+    response.text = mock.AsyncMock(return_value=json.dumps(data))
+    context = mock.MagicMock()
+    context.__aenter__.return_value = response
+    return context
+
+
+@mock.patch('avalanche.api.api.asyncio.sleep', mock.AsyncMock())
+class AsyncAvalancheClientTestCase(TestCase):
+
+    def setUp(self):
+        self.client = AsyncAvalancheClient(rpc_url='http://node:9650', max_retries=2)
+        self.client._session = mock.MagicMock(closed=False)
+
+    async def test_concurrent_calls(self):
+        self.client._session.post.side_effect = lambda url, json: _async_response(
+            200, {'jsonrpc': '2.0', 'id': json['id'], 'result': {'url': url}})
+        responses = await asyncio.gather(
+            self.client.evm_get_utxos(['C-fuji1'], source_chain='P'),
+            self.client.avm_get_utxos(['X-fuji1']),
+            self.client.platform_get_utxos(['P-fuji1']),
+        )
+        self.assertEqual([r.json()['result']['url'] for r in responses], [
+            'http://node:9650/ext/bc/C/avax', 'http://node:9650/ext/bc/X', 'http://node:9650/ext/bc/P'])
+        ids = {r.json()['id'] for r in responses}
+        self.assertEqual(len(ids), 3)
+
+    async def test_read_retried_on_connection_error(self):
+        self.client._session.post.side_effect = [aiohttp.ClientConnectionError(), _async_response(503),
+                                                 _async_response(200, {'result': {}})]
+        response = await self.client.evm_get_atomic_tx('tx')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client._session.post.call_count, 3)
+
+    async def test_issue_tx_is_not_retried(self):
+        self.client._session.post.return_value = _async_response(502)
+        response = await self.client.avm_issue_tx('tx')
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(self.client._session.post.call_count, 1)
+
+    async def test_get_current_validators(self):
+        self.client._session.post.return_value = _async_response(200, {'result': {'validators': []}})
+        self.assertEqual(await self.client.platform_get_current_validators(), [])
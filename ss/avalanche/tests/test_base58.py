@@ -0,0 +1,44 @@
+from bip_utils.base58.base58_ex import Base58ChecksumError
+
+from django.test import TestCase
+
+from ..base58 import Base58Alphabets, Base58Decoder, Base58Encoder
+
+
+class Base58TestCase(TestCase):
+    VECTORS = [
+        (b'', ''),
+        (b'\x00', '1'),
+        (b'\x00\x00\x01', '112'),
+        (b'hello world', 'StV1DL6CwTryKyV'),
+        (bytes.fromhex('00eb15231dfceb60925886b67d065299925915aeb172c06647'), '1NS17iag9jJgTHD1VXjvLCEnZuQ3rJDE9L'),
+    ]
+
+    def test_encode_decode(self):
+        for data, encoded in self.VECTORS:
+            self.assertEqual(Base58Encoder.Encode(data), encoded)
+            self.assertEqual(Base58Decoder.Decode(encoded), data)
+
+    def test_cb58_blockchain_id(self):
+        # Fuji C-Chain blockchain ID
+        blockchain_id = 'yH8D7ThNJkxmtkuv2jgBa4P1Rn3Qpr4pPr7QYNfcdoS6k6HWp'
+        data = Base58Decoder.CheckDecode(blockchain_id)
+        self.assertEqual(data.hex(), '7fc93d85c6d62c5b2ac0b519c87010ea5294012d1e407030d6acd0021cac10d5')
+        self.assertEqual(Base58Encoder.CheckEncode(data), blockchain_id)
+
+    def test_round_trip_large(self):
+        data = b'\x00\x00' + bytes(range(256)) * 16
+        for alphabet in Base58Alphabets:
+            encoded = Base58Encoder.CheckEncode(data, alphabet)
+            self.assertEqual(Base58Decoder.CheckDecode(encoded, alphabet), data)
+
+    def test_many(self):
+        data = [vector[0] for vector in self.VECTORS]
+        self.assertEqual(Base58Encoder.EncodeMany(data), [vector[1] for vector in self.VECTORS])
+        self.assertEqual(Base58Decoder.CheckDecodeMany(Base58Encoder.CheckEncodeMany(data)), data)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Base58Decoder.Decode('0OIl')
+        with self.assertRaises(Base58ChecksumError):
+            Base58Decoder.CheckDecode('StV1DL6CwTryKyV')
@@ -2,8 +2,8 @@ from hexbytes import HexBytes
 
 from django.test import TestCase
 
-from avalanche.datastructures import UnsignedTransaction
-from avalanche.datastructures.evm import EVMExportTx, EVMImportTx
+from avalanche.datastructures import SECP256K1Credential, SignedTransaction, UnsignedTransaction
+from avalanche.datastructures.evm import UTXO, EVMExportTx, EVMImportTx, SECPTransferOutput
 from avalanche.datastructures.platform import PlatformExportTx, PlatformImportTx
 
 
@@ -60,3 +60,45 @@ class DataStructureTestCase(TestCase):
         self.assertEqual(tx.codec_id.hex(), "0000")
         self.assertIsInstance(tx.atomic_tx, EVMImportTx)
         self.assertEqual(tx.hash().hex(), "9cbf5e59ab703fb847089a044a36bfa48425c8e47492f5f98e5d1b179b2f220e")
+
+    def test_from_buffer_at_offset(self):
+        data = bytes(HexBytes('0x000000000000000000057fc93d85c6d62c5b2ac0b519c87010ea5294012d1e407030d6acd0021cac10d5'
+                              '000000000000000000000000000000000000000000000000000000000000000000000001339ec139e45e76'
+                              '295ba81c6054ca4b9cc16ec6b0f02158bea5caf982ad4fad52000000003d9bdac0ed1d761330cf680efdeb'
+                              '1a42159eb387d6d2950c96f7d28f61bbe2aa00000005000000003b8b87c0000000010000000000000001379'
+                              '25525b620412183d4d8f71e6f64b5e64420c4000000003b862ce73d9bdac0ed1d761330cf680efdeb1a4215'
+                              '9eb387d6d2950c96f7d28f61bbe2aa'))
+        buf = memoryview(bytearray(b'\xff' * 3 + data + data))
+        tx, offset = UnsignedTransaction.from_buffer(buf, 3)
+        self.assertEqual(offset, 3 + len(data))
+        self.assertEqual(tx.to_bytes(), data)
+        tx, offset = UnsignedTransaction.from_buffer(buf, offset)
+        self.assertEqual(offset, len(buf))
+        self.assertEqual(tx.hash().hex(), '9cbf5e59ab703fb847089a044a36bfa48425c8e47492f5f98e5d1b179b2f220e')
+        with self.assertRaises(ValueError):
+            UnsignedTransaction.from_bytes(data[:-1])
+
+    def test_utxo_native_fields(self):
+        output = SECPTransferOutput(1000000000, 0, 1, [bytes(20)])
+        utxo = UTXO.from_bytes(UTXO(bytes([1]) * 32, 3, bytes(32), output).to_bytes())
+        self.assertEqual(utxo.output_index, 3)
+        self.assertEqual(utxo.output.amount, 1000000000)
+        self.assertEqual(utxo.output.threshold, 1)
+        self.assertFalse(hasattr(utxo, '__dict__'))
+        self.assertFalse(hasattr(utxo.output, '__dict__'))
+
+    def test_serialization_is_cached(self):
+        data = HexBytes('0x000000000000000000057fc93d85c6d62c5b2ac0b519c87010ea5294012d1e407030d6acd0021cac10d50000'
+                        '00000000000000000000000000000000000000000000000000000000000000000001339ec139e45e76295ba81c6'
+                        '054ca4b9cc16ec6b0f02158bea5caf982ad4fad52000000003d9bdac0ed1d761330cf680efdeb1a42159eb387d6'
+                        'd2950c96f7d28f61bbe2aa00000005000000003b8b87c000000001000000000000000137925525b620412183d4d'
+                        '8f71e6f64b5e64420c4000000003b862ce73d9bdac0ed1d761330cf680efdeb1a42159eb387d6d2950c96f7d28f'
+                        '61bbe2aa')
+        tx = UnsignedTransaction.from_bytes(data)
+        self.assertIs(tx.to_bytes(), tx.to_bytes())
+        self.assertIs(tx.hash(), tx.hash())
+        self.assertEqual(tx.to_hex(), data.hex())
+
+        credential = SECP256K1Credential([bytes(65)])
+        signed_tx = SignedTransaction(tx.atomic_tx, [credential])
+        self.assertEqual(signed_tx.to_bytes(), bytes(data) + b'\x00\x00\x00\x01' + credential.to_bytes())
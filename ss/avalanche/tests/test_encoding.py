@@ -0,0 +1,34 @@
+from django.test import TestCase
+
+from ..encoding import CB58, HEX, decode, decode_many, detect_encoding, encode
+
+
+class EncodingTestCase(TestCase):
+    # Fuji C-Chain blockchain ID
+    DATA = bytes.fromhex('7fc93d85c6d62c5b2ac0b519c87010ea5294012d1e407030d6acd0021cac10d5')
+    CB58_DATA = 'yH8D7ThNJkxmtkuv2jgBa4P1Rn3Qpr4pPr7QYNfcdoS6k6HWp'
+
+    def test_encode(self):
+        self.assertEqual(encode(self.DATA, CB58), self.CB58_DATA)
+        hex_data = encode(self.DATA)
+        self.assertTrue(hex_data.startswith('0x'))
+        # Data followed by the same 4 byte checksum used by CB58
+        self.assertEqual(bytes.fromhex(hex_data[2:]), self.DATA + bytes.fromhex('89e57ad9'))
+
+    def test_decode(self):
+        hex_data = encode(self.DATA, HEX)
+        self.assertEqual(decode(hex_data, HEX), self.DATA)
+        self.assertEqual(decode(self.CB58_DATA, CB58), self.DATA)
+        self.assertEqual(decode_many([hex_data, self.CB58_DATA]), [self.DATA, self.DATA])
+
+    def test_detect_encoding(self):
+        self.assertEqual(detect_encoding(encode(self.DATA)), HEX)
+        self.assertEqual(detect_encoding(self.CB58_DATA), CB58)
+
+    def test_invalid_checksum(self):
+        with self.assertRaises(ValueError):
+            decode('0x' + (self.DATA + bytes(4)).hex())
+
+    def test_unsupported_encoding(self):
+        with self.assertRaises(ValueError):
+            encode(self.DATA, 'base64')
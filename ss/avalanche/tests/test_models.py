@@ -3,8 +3,12 @@ from decimal import Decimal
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 
+from ..base58 import Base58Encoder
+from ..datastructures.platform import PlatformExportTx
+from ..encoding import encode
 from ..factories import AtomicTxFactory, ChainSwapFactory
 from ..models import AtomicTx, ChainSwap
+from .fixtures import PCHAIN_EXPORT
 
 
 class ModelTestCase(TestCase):
@@ -21,6 +25,26 @@ class ModelTestCase(TestCase):
             tx.full_clean()
         self.assertIn('amount', ex.exception.message_dict)
 
+    def test_atomic_tx_unsigned_transaction_encodings(self):
+        # An unsigned P-Chain export, stored as hex and as legacy CB58
+        data = PCHAIN_EXPORT
+        for encoded in (encode(data), Base58Encoder.CheckEncode(data)):
+            tx = AtomicTxFactory(unsigned_transaction=encoded)
+            self.assertIsInstance(tx.get_atomic_transaction(), PlatformExportTx)
+            self.assertEqual(tx.get_unsigned_transaction().to_bytes(), data)
+
+    def test_atomic_tx_unsigned_transaction_cached(self):
+        data = PCHAIN_EXPORT
+        tx = AtomicTxFactory(unsigned_transaction=encode(data))
+        unsigned_tx = tx.get_unsigned_transaction()
+        self.assertIs(tx.get_unsigned_transaction(), unsigned_tx)
+        # Other instances of the same row share the decoded transaction
+        self.assertIs(AtomicTx.objects.get(pk=tx.pk).get_unsigned_transaction(), unsigned_tx)
+        # Changing the field invalidates the cache
+        tx.unsigned_transaction = Base58Encoder.CheckEncode(data[:-1] + b'\x9c')
+        self.assertIsNot(tx.get_unsigned_transaction(), unsigned_tx)
+        self.assertEqual(tx.get_unsigned_transaction().to_bytes()[-1], 0x9c)
+
     def test_chain_swap_factory(self):
         swap = ChainSwapFactory()
         self.assertEqual(swap.source_chain, 'P')
@@ -0,0 +1,184 @@
+from unittest import mock
+
+from eth_keys import keys
+
+from django.test import TestCase
+
+from common.bip.bip32 import fireblocks_public_key
+from common.bip.bip44_coins import Bip44Coins
+
+from ..api import AvalancheClient
+from ..base58 import Base58Encoder
+from ..bech32 import bech32_address_from_public_key, bech32_to_bytes
+from ..constants import CChainAlias, PChainAlias
+from ..datastructures import UnsignedTransaction
+from ..datastructures.evm import UTXO, SECPTransferOutput
+from ..encoding import encode
+from ..factories import AtomicTxFactory
+from ..models import AtomicTx, IndexedUTXO
+from ..utils.cchain_import_from_pchain import (IMPORT_FEE, IMPORT_FEE_PER_INPUT, MAX_IMPORT_INPUTS,
+                                               CChainImportFromPChain)
+from ..utils.tx_builder import (build_credentials, check_batch_for_signature, check_transaction_status,
+                                send_batch_for_signing)
+from .fixtures import PCHAIN_EXPORT
+
+PRIVATE_KEY = keys.PrivateKey(b'\x01' * 32)
+
+
+class FakePublicKey:
+
+    def ToBytes(self):
+        return PRIVATE_KEY.public_key.to_compressed_bytes()
+
+
+def signed_message(message_hash: bytes) -> dict:
+    sig = PRIVATE_KEY.sign_msg_hash(message_hash)
+    return {
+        'content': message_hash.hex(),
+        'algorithm': 'MPC_ECDSA_SECP256K1',
+        'derivationPath': [44, 1, 0, 0, 0],
+        'signature': {
+            'fullSig': sig.to_bytes()[:64].hex(),
+            'r': sig.r.to_bytes(32, byteorder='big').hex(),
+            's': sig.s.to_bytes(32, byteorder='big').hex(),
+            'v': sig.v,
+        },
+    }
+
+
+@mock.patch('avalanche.utils.tx_builder.get_fireblocks_client')
+class BatchSigningTestCase(TestCase):
+
+    def setUp(self):
+        # Two P-Chain exports which only differ in the last byte of the output address
+        self.txs = [AtomicTxFactory(unsigned_transaction=encode(PCHAIN_EXPORT)),
+                    AtomicTxFactory(unsigned_transaction=encode(PCHAIN_EXPORT[:-1] + b'\x9c'))]
+        self.hashes = [tx.get_unsigned_transaction().hash() for tx in self.txs]
+
+    def test_send_batch_for_signing(self, mock_client):
+        mock_client.return_value.vault_raw_messages.return_value = {'id': 'fb-1', 'status': 'SUBMITTED'}
+        send_batch_for_signing(self.txs)
+
+        mock_client.return_value.vault_raw_messages.assert_called_once_with(
+            vault_account_id='0', asset_id='AVAXTEST', message_hashes=[h.hex() for h in self.hashes],
+            note='Test atomic transaction; Test atomic transaction')
+        for tx in AtomicTx.objects.all():
+            self.assertEqual(tx.status, AtomicTx.STATUS.AWAITING_SIGNATURE)
+            self.assertEqual(tx.fireblocks_tx_id, 'fb-1')
+
+    def test_send_batch_for_signing_rejected(self, mock_client):
+        mock_client.return_value.vault_raw_messages.return_value = {'id': 'fb-1', 'status': 'REJECTED'}
+        send_batch_for_signing(self.txs)
+        for tx in AtomicTx.objects.all():
+            self.assertEqual(tx.status, AtomicTx.STATUS.SUBMITTED)
+            self.assertEqual(tx.fireblocks_tx_id, '')
+
+    @mock.patch('avalanche.utils.tx_builder.fireblocks_public_key', return_value=FakePublicKey())
+    def test_check_batch_for_signature(self, mock_public_key, mock_client):
+        mock_client.return_value.get_transaction_by_id.return_value = {
+            'id': 'fb-1',
+            'status': 'COMPLETED',
+            # Signed messages are not necessarily returned in the order they were sent
+            'signedMessages': [signed_message(h) for h in reversed(self.hashes)],
+        }
+        AtomicTx.objects.update(status=AtomicTx.STATUS.AWAITING_SIGNATURE, fireblocks_tx_id='fb-1')
+        txs = list(AtomicTx.objects.all())
+        check_batch_for_signature(txs)
+
+        # The shared Fireblocks transaction is only fetched once
+        mock_client.return_value.get_transaction_by_id.assert_called_once_with(txid='fb-1')
+        for tx in txs:
+            tx.refresh_from_db()
+            self.assertEqual(tx.status, AtomicTx.STATUS.SIGNED)
+        self.assertNotEqual(txs[0].signed_transaction, txs[1].signed_transaction)
+
+
+class TransactionStatusTestCase(TestCase):
+
+    @mock.patch('avalanche.utils.tx_builder.get_avalanche_client')
+    def test_statuses_checked_in_one_batch(self, mock_client):
+        client = AvalancheClient(rpc_url='http://node:9650')
+        client.session = mock.MagicMock()
+        mock_client.return_value = client
+        statuses = ['Committed', 'Dropped', 'Processing']
+        txs = [AtomicTxFactory(unsigned_transaction=encode(PCHAIN_EXPORT), status=AtomicTx.STATUS.BROADCAST,
+                               avalanche_tx_id=Base58Encoder.CheckEncode(bytes([i]) * 32),
+                               to_address='C-fuji1u4jfulkr7wlqz97es2xm30sc7r4nm65m20zhy0')
+               for i in range(len(statuses))]
+        status_by_id = {tx.avalanche_tx_id: status for tx, status in zip(txs, statuses)}
+
+        def post(url, json, timeout):
+            return mock.MagicMock(status_code=200, json=mock.MagicMock(return_value=[
+                {'jsonrpc': '2.0', 'id': body['id'], 'result': {'status': status_by_id[body['params']['txID']]}}
+                for body in json]))
+        client.session.post.side_effect = post
+
+        check_transaction_status(txs)
+
+        client.session.post.assert_called_once()
+        self.assertEqual(client.session.post.call_args.args[0], 'http://node:9650/ext/bc/P')
+        self.assertEqual([AtomicTx.objects.get(pk=tx.pk).status for tx in txs], [
+            AtomicTx.STATUS.CONFIRMED, AtomicTx.STATUS.FAILED, AtomicTx.STATUS.BROADCAST])
+
+
+class MultiInputImportTestCase(TestCase):
+
+    def setUp(self):
+        pub_key = fireblocks_public_key('44/1/0/0/0')
+        self.destination_address = bech32_address_from_public_key(pub_key.ToBytes(), Bip44Coins.FB_C_CHAIN)
+        self.owner = bech32_to_bytes(self.destination_address.split('-')[1])
+        self.builder = CChainImportFromPChain(network_id=5)
+        self.asset_id = self.builder._get_avax_asset_id()
+
+    def indexed_utxo(self, tx_id: bytes, amount: int, addresses: list[bytes]):
+        utxo = UTXO(tx_id, 0, self.asset_id, SECPTransferOutput(amount, 0, 1, addresses))
+        return mock.Mock(get_utxo=mock.Mock(return_value=utxo))
+
+    def test_import_many_utxos(self):
+        other = b'\x11' * 20
+        utxos = [
+            self.indexed_utxo(b'\x02' * 32, 2000000, [self.owner]),
+            self.indexed_utxo(b'\x01' * 32, 3000000, [other, self.owner]),
+            # Dust costs more to import than it is worth
+            self.indexed_utxo(b'\x03' * 32, IMPORT_FEE_PER_INPUT, [self.owner]),
+            # Not ours to spend
+            self.indexed_utxo(b'\x04' * 32, 4000000, [other]),
+        ]
+        with mock.patch.object(self.builder, 'get_utxos', return_value=utxos):
+            import_tx = self.builder.build_import_tx(self.destination_address)
+
+        self.assertEqual(len(self.builder.utxos), 2)
+        # Inputs are sorted and spend from the index of our address in each UTXO
+        self.assertEqual([xfer_in.tx_id for xfer_in in import_tx.imported_inputs], [b'\x01' * 32, b'\x02' * 32])
+        self.assertEqual([xfer_in.input.address_indices for xfer_in in import_tx.imported_inputs], [[1], [0]])
+        # A single consolidated output paying one fee for the whole import
+        self.assertEqual(len(import_tx.outs), 1)
+        self.assertEqual(import_tx.outs[0].amount, 5000000 - IMPORT_FEE - IMPORT_FEE_PER_INPUT)
+
+        # One credential per input, which survives a round trip through the serialization
+        credentials = build_credentials(import_tx, b'\x00' * 65)
+        self.assertEqual([len(cred.signatures) for cred in credentials], [1, 1])
+        unsigned_tx = UnsignedTransaction(import_tx)
+        decoded, _ = UnsignedTransaction.from_buffer(memoryview(unsigned_tx.to_bytes()))
+        self.assertEqual(len(decoded.atomic_tx.get_inputs()), 2)
+
+    def test_import_fee_not_covered(self):
+        utxos = [self.indexed_utxo(b'\x01' * 32, IMPORT_FEE, [self.owner])]
+        with mock.patch.object(self.builder, 'get_utxos', return_value=utxos):
+            with self.assertRaises(Exception):
+                self.builder.build_import_tx(self.destination_address)
+
+    def test_dust_does_not_crowd_out_spendable_utxos(self):
+        def index(tx_id: bytes, amount: int):
+            utxo = UTXO(tx_id, 0, self.asset_id, SECPTransferOutput(amount, 0, 1, [self.owner]))
+            IndexedUTXO.objects.create(tx_id=tx_id.hex(), output_index=0, chain=CChainAlias, source_chain=PChainAlias,
+                                       address=self.destination_address, asset_id=self.asset_id.hex(),
+                                       amount=amount, raw=utxo.to_bytes())
+
+        for i in range(MAX_IMPORT_INPUTS + 6):
+            index(i.to_bytes(32, byteorder='big'), IMPORT_FEE_PER_INPUT)
+        index(b'\xff' * 32, 2000000)
+
+        import_tx = self.builder.build_import_tx(self.destination_address)
+        self.assertEqual([xfer_in.tx_id for xfer_in in import_tx.imported_inputs], [b'\xff' * 32])
+        self.assertEqual(import_tx.outs[0].amount, 2000000 - IMPORT_FEE)
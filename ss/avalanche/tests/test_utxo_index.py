@@ -0,0 +1,144 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from ..base58 import Base58Encoder
+from ..constants import DEFAULTS
+from ..datastructures.evm import UTXO, SECPTransferOutput
+from ..factories import AtomicTxFactory
+from ..models import AtomicTx, IndexedUTXO
+from ..tasks import sync_utxo_index
+from ..utils.pchain_export_to_cchain import PChainExportToCChain
+from ..utils.utxo_index import available_utxos, record_atomic_tx, reserve_utxos, sync_utxos, unspent_utxos
+from .fixtures import PCHAIN_EXPORT
+
+P_ADDRESS = 'P-fuji1u4jfulkr7wlqz97esg5m30scluhnm65mkj5mqg'
+
+
+def _utxo_bytes(tx_id: int, index: int, amount: int) -> bytes:
+    output = SECPTransferOutput(amount, 0, 1, [bytes(20)])
+    return UTXO(bytes([tx_id]) * 32, index, bytes(32), output).to_bytes()
+
+
+class UTXOIndexTestCase(TestCase):
+
+    def _sync(self, utxos: list[bytes]):
+        with mock.patch('avalanche.utils.utxo_index.get_avalanche_client') as get_client:
+            get_client.return_value.iter_utxo_bytes.return_value = iter(utxos)
+            result = sync_utxos(5, 'P', P_ADDRESS)
+            return list(result), get_client.return_value.iter_utxo_bytes
+
+    def test_sync_adds_new_utxos(self):
+        utxos, iter_utxo_bytes = self._sync([_utxo_bytes(1, 0, 100), _utxo_bytes(1, 1, 200)])
+        iter_utxo_bytes.assert_called_once_with('P', [P_ADDRESS], source_chain=None)
+        self.assertEqual(len(utxos), 2)
+        self.assertEqual(utxos[1].tx_id, (bytes([1]) * 32).hex())
+        self.assertEqual(utxos[1].output_index, 1)
+        self.assertEqual(utxos[1].amount, 200)
+        self.assertEqual(utxos[1].get_utxo().output.amount, 200)
+
+    def test_sync_marks_missing_utxos_spent(self):
+        self._sync([_utxo_bytes(1, 0, 100), _utxo_bytes(2, 0, 200)])
+        # Known UTXOs are not decoded again
+        with mock.patch('avalanche.utils.utxo_index._indexed_utxo', side_effect=AssertionError):
+            utxos, _ = self._sync([_utxo_bytes(2, 0, 200)])
+        self.assertEqual([u.amount for u in utxos], [200])
+        self.assertTrue(IndexedUTXO.objects.get(tx_id=(bytes([1]) * 32).hex()).spent)
+
+    def test_sync_keeps_spent_utxos_spent(self):
+        tx = AtomicTxFactory()
+        self._sync([_utxo_bytes(1, 0, 100)])
+        IndexedUTXO.objects.update(spent=True, spent_by=tx)
+        # The node may lag behind the transaction that was accepted
+        utxos, _ = self._sync([_utxo_bytes(1, 0, 100)])
+        self.assertEqual(utxos, [])
+        self.assertEqual(IndexedUTXO.objects.get().spent_by, tx)
+
+    def test_export_locks_only_spent_utxos(self):
+        builder = PChainExportToCChain(network_id=5)
+        address = builder._get_p_chain_bech32()
+        for tx_id in (1, 2):
+            IndexedUTXO.objects.create(tx_id=(bytes([tx_id]) * 32).hex(), output_index=0, chain='P', address=address,
+                                       asset_id='00' * 32, amount=100, raw=_utxo_bytes(tx_id, 0, 100))
+        with transaction.atomic():
+            self.assertEqual(len(builder.get_utxos()), 1)
+
+    def test_sync_source_chain(self):
+        with mock.patch('avalanche.utils.utxo_index.get_avalanche_client') as get_client:
+            get_client.return_value.iter_utxo_bytes.return_value = iter([_utxo_bytes(1, 0, 100)])
+            sync_utxos(5, 'P', P_ADDRESS, source_chain='C')
+            _, kwargs = get_client.return_value.iter_utxo_bytes.call_args
+        self.assertEqual(kwargs['source_chain'], 'yH8D7ThNJkxmtkuv2jgBa4P1Rn3Qpr4pPr7QYNfcdoS6k6HWp')
+        self.assertEqual(unspent_utxos('P', P_ADDRESS, source_chain='C').count(), 1)
+        self.assertEqual(unspent_utxos('P', P_ADDRESS).count(), 0)
+
+    @override_settings(NETWORK_ID=5)
+    def test_sync_utxo_index(self):
+        with mock.patch('avalanche.utils.utxo_index.get_avalanche_client') as get_client:
+            get_client.return_value.iter_utxo_bytes.return_value = iter([])
+            sync_utxo_index()
+        # Every chain the builders spend UTXOs from is synced
+        chain_ids = {alias: DEFAULTS['networks'][5][alias]['blockchainID'] for alias in ('C', 'P')}
+        self.assertEqual([(call.args[0], call.kwargs['source_chain'])
+                          for call in get_client.return_value.iter_utxo_bytes.call_args_list],
+                         [('P', None), ('C', chain_ids['P']), ('P', chain_ids['C'])])
+
+    def test_record_atomic_tx(self):
+        spent_tx_id = 'b17d5b96f75198af0a0347588b3305978667baa3629894085e42045074c76782'
+        IndexedUTXO.objects.create(tx_id=spent_tx_id, output_index=0, chain='P', address=P_ADDRESS,
+                                   asset_id='00' * 32, amount=1000000000, raw=b'')
+        tx = AtomicTxFactory(unsigned_transaction=Base58Encoder.CheckEncode(PCHAIN_EXPORT),
+                             avalanche_tx_id=Base58Encoder.CheckEncode(bytes([9]) * 32),
+                             to_address='C-fuji1u4jfulkr7wlqz97es2xm30sc7r4nm65m20zhy0',
+                             status=AtomicTx.STATUS.CONFIRMED)
+        record_atomic_tx(tx)
+
+        spent = IndexedUTXO.objects.get(tx_id=spent_tx_id)
+        self.assertTrue(spent.spent)
+        self.assertEqual(spent.spent_by, tx)
+
+        exported = IndexedUTXO.objects.get(tx_id=(bytes([9]) * 32).hex())
+        self.assertEqual(exported.chain, 'C')
+        self.assertEqual(exported.source_chain, 'P')
+        self.assertEqual(exported.output_index, 0)
+        self.assertEqual(exported.amount, 999000000)
+        self.assertEqual(exported.address, tx.to_address)
+        self.assertEqual(exported.get_utxo().to_bytes(), bytes(exported.raw))
+
+    def test_record_atomic_tx_skips_outputs_we_do_not_own(self):
+        tx = AtomicTxFactory(unsigned_transaction=Base58Encoder.CheckEncode(PCHAIN_EXPORT),
+                             avalanche_tx_id=Base58Encoder.CheckEncode(bytes([9]) * 32),
+                             to_address='C-fuji1zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3cd758d',
+                             status=AtomicTx.STATUS.CONFIRMED)
+        record_atomic_tx(tx)
+        self.assertFalse(IndexedUTXO.objects.filter(tx_id=(bytes([9]) * 32).hex()).exists())
+
+    def _reserved_pair(self):
+        self._sync([_utxo_bytes(1, 0, 100), _utxo_bytes(2, 0, 200)])
+        tx = AtomicTxFactory()
+        with transaction.atomic():
+            utxos = list(available_utxos('P', P_ADDRESS))
+            reserve_utxos(utxos[:1], tx)
+        return tx
+
+    def test_reserved_utxos_are_not_available(self):
+        tx = self._reserved_pair()
+        self.assertEqual(tx.reserved_utxos.count(), 1)
+        with transaction.atomic():
+            self.assertEqual([u.amount for u in available_utxos('P', P_ADDRESS)], [200])
+
+    def test_failed_tx_releases_utxos(self):
+        tx = self._reserved_pair()
+        tx.fail()
+        tx.save()
+        self.assertEqual(tx.reserved_utxos.count(), 0)
+        with transaction.atomic():
+            self.assertEqual(available_utxos('P', P_ADDRESS).count(), 2)
+
+    def test_rejected_tx_releases_utxos(self):
+        tx = self._reserved_pair()
+        tx.reject()
+        tx.save()
+        with transaction.atomic():
+            self.assertEqual(available_utxos('P', P_ADDRESS).count(), 2)
@@ -2,13 +2,14 @@ from decimal import Decimal
 
 from hexbytes import HexBytes
 
-from avalanche.base58 import Base58Decoder, Base58Encoder
+from avalanche.base58 import Base58Decoder
 from avalanche.bech32 import bech32_address_from_public_key, bech32_to_bytes
 from avalanche.constants import DEFAULTS
 from avalanche.datastructures import UnsignedTransaction
 from avalanche.datastructures.evm import EVMExportTx, EVMInput, SECPTransferOutput, TransferableOutput
+from avalanche.encoding import encode
 from avalanche.models import AtomicTx
-from avalanche.tools import num_to_uint32, num_to_uint64, to_nano_avax
+from avalanche.tools import num_to_uint32, to_nano_avax
 from avalanche.web3 import AvaWeb3
 from common.bip.bip32 import eth_address_from_public_key, fireblocks_public_key
 from common.bip.bip44_coins import Bip44Coins
@@ -48,7 +49,7 @@ class CChainExportToPChain:
                              to_address=to_address,
                              amount=amount,
                              description="Export AVAX from C-Chain to P-Chain",
-                             unsigned_transaction=Base58Encoder.CheckEncode(unsigned_tx.to_bytes()))
+                             unsigned_transaction=encode(unsigned_tx.to_bytes()))
         export_tx.save()
         print('-----------Unsigned---------')
         print(unsigned_tx.to_hex())
@@ -74,14 +75,14 @@ class CChainExportToPChain:
         export_fee = 350937
         nonce = self.get_nonce(from_address)
 
-        locktime = num_to_uint64(0)
-        threshold = num_to_uint32(1)
+        locktime = 0
+        threshold = 1
         network_id = num_to_uint32(5)
 
         print('-----------Inputs / Outputs ---------')
-        in1 = EVMInput(c_address, num_to_uint64(amount + export_fee), avax_asset_id_buf, num_to_uint64(nonce))
+        in1 = EVMInput(c_address, amount + export_fee, avax_asset_id_buf, nonce)
         print(in1.to_hex())
-        sec_out = SECPTransferOutput(num_to_uint64(amount), locktime, threshold, [p_address])
+        sec_out = SECPTransferOutput(amount, locktime, threshold, [p_address])
         print(sec_out.to_hex())
         xfer_out = TransferableOutput(avax_asset_id_buf, sec_out)
         print(xfer_out.to_hex())
@@ -2,19 +2,28 @@ from decimal import Decimal
 
 from hexbytes import HexBytes
 
-from django.conf import settings
+from django.db import transaction
 
-from avalanche.api import AvalancheClient
-from avalanche.base58 import Base58Decoder, Base58Encoder
+from avalanche.base58 import Base58Decoder
 from avalanche.bech32 import bech32_address_from_public_key, bech32_to_bytes
-from avalanche.constants import DEFAULTS
+from avalanche.constants import DEFAULTS, CChainAlias, PChainAlias
 from avalanche.datastructures import UnsignedTransaction
-from avalanche.datastructures.evm import UTXO, EVMImportTx, EVMOutput, SECPTransferInput, TransferableInput
+from avalanche.datastructures.evm import EVMImportTx, EVMOutput, SECPTransferInput, TransferableInput
+from avalanche.encoding import encode
 from avalanche.models import AtomicTx
-from avalanche.tools import num_to_uint32, num_to_uint64, uint_to_num
+from avalanche.tools import num_to_uint32
 from common.bip.bip32 import eth_address_from_public_key, fireblocks_public_key
 from common.bip.bip44_coins import Bip44Coins
 
+from .utxo_index import available_utxos, reserve_utxos, sync_utxos
+
+# Fee in nAVAX for importing a single UTXO, and for each further UTXO: the gas of an
+# input, its credential and signature verification at the minimum base fee
+IMPORT_FEE = 350937
+IMPORT_FEE_PER_INPUT = 29025
+# Keeps the import within the C-Chain atomic transaction gas limit
+MAX_IMPORT_INPUTS = 64
+
 
 class CChainImportFromPChain:
     """
@@ -23,6 +32,8 @@ class CChainImportFromPChain:
 
     def __init__(self, network_id):
         self.network_id = network_id
+        # Indexed UTXOs spent by the transaction being built, reserved once it is saved
+        self.utxos = []
 
     def get_to_address(self):
         # This is the only derivation path we are allowed on test workspace
@@ -33,6 +44,7 @@ class CChainImportFromPChain:
         print(HexBytes(p_address).hex())
         return p_address
 
+    @transaction.atomic
     def build_transaction(self):
         pub_key = fireblocks_public_key("44/1/0/0/0")
         from_address = bech32_address_from_public_key(pub_key.ToBytes(), Bip44Coins.FB_P_CHAIN)
@@ -45,19 +57,24 @@ class CChainImportFromPChain:
                              to_address=to_address,
                              amount=Decimal("1000000000"),
                              description="Import AVAX from P-Chain to C-Chain",
-                             unsigned_transaction=Base58Encoder.CheckEncode(unsigned_tx.to_bytes()))
+                             unsigned_transaction=encode(unsigned_tx.to_bytes()))
         import_tx.save()
+        reserve_utxos(self.utxos, import_tx)
         print('-----------Unsigned---------')
         print(unsigned_tx.to_hex())
         print('----------HASH----------')
         print(unsigned_tx.hash().hex())
         return import_tx
 
+    def sync_utxos(self):
+        pub_key = fireblocks_public_key('44/1/0/0/0')
+        address = bech32_address_from_public_key(pub_key.ToBytes(), Bip44Coins.FB_C_CHAIN)
+        sync_utxos(self.network_id, CChainAlias, address, source_chain=PChainAlias)
+
     def get_utxos(self, destination_address):
-        client = AvalancheClient(RPC_URL=settings.AVAX_RPC_URL)
-        response = client.evm_get_utxos(addresses=[destination_address], source_chain='P')
-        print(response.json())
-        return response.json()
+        # Skip dust before limiting the inputs, largest first, so that dust can never crowd out spendable UTXOs
+        utxos = available_utxos(CChainAlias, destination_address, source_chain=PChainAlias)
+        return utxos.filter(amount__gt=IMPORT_FEE_PER_INPUT).order_by('-amount')[:MAX_IMPORT_INPUTS]
 
     def _get_c_chain_address(self):
         # This is the only derivation path we are allowed on test workspace
@@ -67,39 +84,49 @@ class CChainImportFromPChain:
         print(addr_bytes.hex())
         return addr_bytes
 
+    def _get_avax_asset_id(self) -> bytes:
+        return Base58Decoder.CheckDecode(DEFAULTS['networks'][self.network_id]['X']['avaxAssetID'])
+
     def create_ins_and_outs(self, destination_address):
         inputs: list[TransferableInput] = []
         outputs: list[EVMOutput] = []
+        # Every UTXO is imported into a single output per asset
+        amounts: dict[bytes, int] = {}
+        _chain, _bech32 = destination_address.split('-')
+        owner = bech32_to_bytes(_bech32)
 
-        # For each UTXO we create this set of ins and outs
-        response = self.get_utxos(destination_address=destination_address)
-        utxos: list[str] = response['result']['utxos']
-        for utxo in utxos:
-            utxo_bytes = Base58Decoder.CheckDecode(utxo)
-            print(HexBytes(utxo_bytes).hex())
-            utxo = UTXO.from_bytes(utxo_bytes)
+        for indexed_utxo in self.get_utxos(destination_address=destination_address):
+            utxo = indexed_utxo.get_utxo()
             print(utxo)
+            if owner not in utxo.output.addresses or utxo.output.amount <= IMPORT_FEE_PER_INPUT:
+                # Not spendable by us, or dust that would cost more to import than it is worth
+                continue
+            self.utxos.append(indexed_utxo)
 
             amount = utxo.output.amount
             asset_id = utxo.asset_id
+            amounts[asset_id] = amounts.get(asset_id, 0) + amount
 
             print('-----------Inputs ---------')
-            index = num_to_uint32(0)
-            sec_in = SECPTransferInput(amount=amount, address_indices=[index])
+            sec_in = SECPTransferInput(amount=amount, address_indices=[utxo.output.addresses.index(owner)])
             print(sec_in.to_hex())
             xfer_in = TransferableInput(tx_id=utxo.tx_id, utxo_index=utxo.output_index, asset_id=asset_id,
                                         input=sec_in)
             print(xfer_in.to_hex())
             inputs.append(xfer_in)
 
-            print('-----------Outputs ---------')
-            c_hex_address = self._get_c_chain_address()
-            import_fee = 350937
-            amount_less_fee = num_to_uint64(uint_to_num(amount) - import_fee)
-
-            evm_output = EVMOutput(address=c_hex_address, amount=amount_less_fee, asset_id=asset_id)
-            outputs.append(evm_output)
-
+        print('-----------Outputs ---------')
+        c_hex_address = self._get_c_chain_address()
+        avax_asset_id = self._get_avax_asset_id()
+        import_fee = IMPORT_FEE + IMPORT_FEE_PER_INPUT * (len(inputs) - 1)
+        if amounts.get(avax_asset_id, 0) <= import_fee:
+            raise Exception('Not enough AVAX to pay the import fee')
+        amounts[avax_asset_id] -= import_fee
+        for asset_id, amount in sorted(amounts.items()):
+            outputs.append(EVMOutput(address=c_hex_address, amount=amount, asset_id=asset_id))
+
+        # Avalanche requires inputs to be sorted by UTXO ID
+        inputs.sort(key=lambda xfer_in: (xfer_in.tx_id, xfer_in.utxo_index))
         return outputs, inputs
 
     def build_import_tx(self, to_address: str):
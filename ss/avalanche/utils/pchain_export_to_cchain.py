@@ -2,22 +2,25 @@ from decimal import Decimal
 
 from hexbytes import HexBytes
 
-from django.conf import settings
+from django.db import transaction
 
-from avalanche.api import AvalancheClient
-from avalanche.base58 import Base58Decoder, Base58Encoder
+from avalanche.base58 import Base58Decoder
 from avalanche.bech32 import bech32_address_from_public_key, bech32_to_bytes
-from avalanche.constants import DEFAULTS
+from avalanche.constants import DEFAULTS, PChainAlias
 from avalanche.datastructures import UnsignedTransaction
 from avalanche.datastructures.avm import BaseTx
-from avalanche.datastructures.evm import (UTXO, SECPTransferInput, SECPTransferOutput, TransferableInput,
-                                          TransferableOutput)
+from avalanche.datastructures.evm import SECPTransferInput, SECPTransferOutput, TransferableInput, TransferableOutput
 from avalanche.datastructures.platform import PlatformExportTx
+from avalanche.encoding import encode
 from avalanche.models import AtomicTx
-from avalanche.tools import num_to_uint32, num_to_uint64, to_nano_avax
+from avalanche.tools import num_to_uint32, to_nano_avax
 from common.bip.bip32 import fireblocks_public_key
 from common.bip.bip44_coins import Bip44Coins
 
+from .utxo_index import available_utxos, reserve_utxos, sync_utxos
+
+MAX_EXPORT_INPUTS = 1
+
 
 class PChainExportToCChain:
     """
@@ -26,8 +29,11 @@ class PChainExportToCChain:
 
     def __init__(self, network_id):
         self.network_id = network_id
+        # Indexed UTXOs spent by the transaction being built, reserved once it is saved
+        self.utxos = []
         self.amount = None
 
+    @transaction.atomic
     def build_transaction(self, amount: Decimal):
         self.amount = to_nano_avax(amount)
 
@@ -43,30 +49,32 @@ class PChainExportToCChain:
                              to_address=to_address,
                              amount=amount,
                              description="FB P-Chain export to C-Chain",
-                             unsigned_transaction=Base58Encoder.CheckEncode(unsigned_tx.to_bytes()))
+                             unsigned_transaction=encode(unsigned_tx.to_bytes()))
         export_tx.save()
+        reserve_utxos(self.utxos, export_tx)
         return export_tx
 
+    def sync_utxos(self):
+        sync_utxos(self.network_id, PChainAlias, self._get_p_chain_bech32())
+
     def get_utxos(self):
         address = self._get_p_chain_bech32()
-        client = AvalancheClient(RPC_URL=settings.AVAX_RPC_URL)
-        response = client.platform_get_utxos(addresses=[address])
-        print(response.json())
-        return response.json()
+        # Only lock the UTXO that is spent, so concurrent builders can use the others
+        return available_utxos(PChainAlias, address)[:MAX_EXPORT_INPUTS]
 
     def _create_outputs(self):
         fee = 1000000
         total = self.amount - fee
 
-        locktime = num_to_uint64(0)
-        threshold = num_to_uint32(1)
+        locktime = 0
+        threshold = 1
         c_address = self._get_c_chain_address()
 
         avax_asset_id: str = DEFAULTS['networks'][self.network_id]['X']['avaxAssetID']
         avax_asset_id_buf = Base58Decoder.CheckDecode(avax_asset_id)
 
         print('-----------Outputs ---------')
-        sec_out = SECPTransferOutput(num_to_uint64(total), locktime, threshold, [c_address])
+        sec_out = SECPTransferOutput(total, locktime, threshold, [c_address])
         print(sec_out.to_hex())
         xfer_out = TransferableOutput(avax_asset_id_buf, sec_out)
         print(xfer_out.to_hex())
@@ -81,29 +89,24 @@ class PChainExportToCChain:
 
         print('-----------UTXOs + Inputs----------')
 
-        # For each UTXO we create an input
-        response = self.get_utxos()
-        utxos: list[str] = response['result']['utxos']
-        print(f'Num UTXOs: {len(utxos)}')
-        for utxo in utxos:
+        # For each UTXO we create an input, the export currently spends a single UTXO
+        for indexed_utxo in self.get_utxos():
+            self.utxos.append(indexed_utxo)
+            utxo = indexed_utxo.get_utxo()
             print('-----------UTXO---------')
-            utxo_bytes = Base58Decoder.CheckDecode(utxo)
-            print(HexBytes(utxo_bytes).hex())
-            utxo = UTXO.from_bytes(utxo_bytes)
             print(utxo)
 
             amount = utxo.output.amount
             asset_id = utxo.asset_id
 
             print('-----------Input---------')
-            index = num_to_uint32(0)
+            index = 0
             sec_in = SECPTransferInput(amount=amount, address_indices=[index])
             print(sec_in.to_hex())
             xfer_in = TransferableInput(tx_id=utxo.tx_id, utxo_index=utxo.output_index, asset_id=asset_id,
                                         input=sec_in)
             print(xfer_in.to_hex())
             inputs.append(xfer_in)
-            break
         return outputs, inputs
 
     def _get_c_chain_address(self):
@@ -2,22 +2,28 @@ from decimal import Decimal
 
 from hexbytes import HexBytes
 
-from django.conf import settings
+from django.db import transaction
 
-from avalanche.api import AvalancheClient
-from avalanche.base58 import Base58Decoder, Base58Encoder
+from avalanche.base58 import Base58Decoder
 from avalanche.bech32 import bech32_address_from_public_key, bech32_to_bytes
-from avalanche.constants import DEFAULTS
+from avalanche.constants import DEFAULTS, CChainAlias, PChainAlias
 from avalanche.datastructures import UnsignedTransaction
 from avalanche.datastructures.avm import BaseTx
-from avalanche.datastructures.evm import (UTXO, SECPTransferInput, SECPTransferOutput, TransferableInput,
-                                          TransferableOutput)
+from avalanche.datastructures.evm import SECPTransferInput, SECPTransferOutput, TransferableInput, TransferableOutput
 from avalanche.datastructures.platform import PlatformImportTx
+from avalanche.encoding import encode
 from avalanche.models import AtomicTx
-from avalanche.tools import num_to_uint32, num_to_uint64, uint_to_num
+from avalanche.tools import num_to_uint32
 from common.bip.bip32 import eth_address_from_public_key, fireblocks_public_key
 from common.bip.bip44_coins import Bip44Coins
 
+from .utxo_index import available_utxos, reserve_utxos, sync_utxos
+
+# Fee in nAVAX for an import, independent of the number of UTXOs
+IMPORT_FEE = 1000000
+# Keeps the import well below the maximum transaction size
+MAX_IMPORT_INPUTS = 256
+
 
 class PChainImportFromCChain:
     """
@@ -26,7 +32,10 @@ class PChainImportFromCChain:
 
     def __init__(self, network_id):
         self.network_id = network_id
+        # Indexed UTXOs spent by the transaction being built, reserved once it is saved
+        self.utxos = []
 
+    @transaction.atomic
     def build_transaction(self):
         pub_key = fireblocks_public_key("44/1/0/0/0")
         from_address = eth_address_from_public_key(pub_key.ToBytes())
@@ -39,53 +48,64 @@ class PChainImportFromCChain:
                              to_address=to_address,
                              amount=Decimal("1000000000"),
                              description="FB P-Chain import from C-Chain",
-                             unsigned_transaction=Base58Encoder.CheckEncode(unsigned_tx.to_bytes()))
+                             unsigned_transaction=encode(unsigned_tx.to_bytes()))
         import_tx.save()
+        reserve_utxos(self.utxos, import_tx)
         return import_tx
 
+    def sync_utxos(self):
+        sync_utxos(self.network_id, PChainAlias, self._get_p_chain_bech32(), source_chain=CChainAlias)
+
     def get_utxos(self):
         address = self._get_p_chain_bech32()
-        c_chain_blockchain_id_str: str = DEFAULTS['networks'][self.network_id]['C']['blockchainID']
-        client = AvalancheClient(RPC_URL=settings.AVAX_RPC_URL)
-        response = client.platform_get_utxos(addresses=[address], source_chain=c_chain_blockchain_id_str)
-        print(response.json())
-        return response.json()
+        return available_utxos(PChainAlias, address, source_chain=CChainAlias)[:MAX_IMPORT_INPUTS]
+
+    def _get_avax_asset_id(self) -> bytes:
+        return Base58Decoder.CheckDecode(DEFAULTS['networks'][self.network_id]['X']['avaxAssetID'])
 
     def create_ins_and_outs(self):
         outputs: list[TransferableOutput] = []
         inputs: list[TransferableInput] = []
+        # Every UTXO is imported into a single output per asset
+        amounts: dict[bytes, int] = {}
+        p_address = self._get_p_chain_address()
 
-        # For each UTXO we create this set of ins and outs
-        response = self.get_utxos()
-        utxos: list[str] = response['result']['utxos']
-        for utxo in utxos:
-            utxo_bytes = Base58Decoder.CheckDecode(utxo)
-            print(HexBytes(utxo_bytes).hex())
-            utxo = UTXO.from_bytes(utxo_bytes)
+        for indexed_utxo in self.get_utxos():
+            utxo = indexed_utxo.get_utxo()
             print(utxo)
+            if p_address not in utxo.output.addresses:
+                continue
+            self.utxos.append(indexed_utxo)
 
             amount = utxo.output.amount
-            fee = 1000000
-            amt = uint_to_num(amount) - fee
             asset_id = utxo.asset_id
-            locktime = num_to_uint64(0)
-            threshold = num_to_uint32(1)
-            p_address = self._get_p_chain_address()
+            amounts[asset_id] = amounts.get(asset_id, 0) + amount
 
-            print('-----------Outputs ---------')
-            sec_out = SECPTransferOutput(num_to_uint64(amt), locktime, threshold, [p_address])
-            print(sec_out.to_hex())
-            xfer_out = TransferableOutput(asset_id, sec_out)
-            outputs.append(xfer_out)
-            print(xfer_out.to_hex())
             print('-----------Inputs ---------')
-            index = num_to_uint32(0)
-            sec_in = SECPTransferInput(amount=amount, address_indices=[index])
+            sec_in = SECPTransferInput(amount=amount, address_indices=[utxo.output.addresses.index(p_address)])
             print(sec_in.to_hex())
             xfer_in = TransferableInput(tx_id=utxo.tx_id, utxo_index=utxo.output_index, asset_id=asset_id,
                                         input=sec_in)
             print(xfer_in.to_hex())
             inputs.append(xfer_in)
+
+        print('-----------Outputs ---------')
+        # The P-Chain fee is the same however many UTXOs are imported
+        avax_asset_id = self._get_avax_asset_id()
+        if amounts.get(avax_asset_id, 0) <= IMPORT_FEE:
+            raise Exception('Not enough AVAX to pay the import fee')
+        amounts[avax_asset_id] -= IMPORT_FEE
+        locktime = 0
+        threshold = 1
+        for asset_id, amount in sorted(amounts.items()):
+            sec_out = SECPTransferOutput(amount, locktime, threshold, [p_address])
+            print(sec_out.to_hex())
+            xfer_out = TransferableOutput(asset_id, sec_out)
+            outputs.append(xfer_out)
+            print(xfer_out.to_hex())
+
+        # Avalanche requires inputs to be sorted by UTXO ID
+        inputs.sort(key=lambda xfer_in: (xfer_in.tx_id, xfer_in.utxo_index))
         return outputs, inputs
 
     def _get_p_chain_address(self):
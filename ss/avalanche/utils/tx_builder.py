@@ -1,85 +1,123 @@
 import logging
 
-from django.conf import settings
-
-from avalanche.api import AvalancheClient
-from avalanche.base58 import Base58Encoder
+from avalanche.api import get_avalanche_client
 from avalanche.constants import CChainAlias, PChainAlias, XChainAlias
-from avalanche.datastructures import SECP256K1Credential, SignedTransaction
+from avalanche.datastructures import SECP256K1Credential, SignedTransaction, UnsignedTransaction
+from avalanche.datastructures.types import AtomicTx as AtomicTxType
+from avalanche.encoding import detect_encoding, encode
 from common.bip.bip32 import fireblocks_public_key
 from fireblocks.client import FireblocksApiException, get_fireblocks_client
-from fireblocks.utils.raw_signing import recoverable_signature, verify_message_hash
+from fireblocks.utils.raw_signing import recoverable_signature, signed_messages_for_hash, verify_message_hash
 
 from ..models import AtomicTx
+from .utxo_index import record_atomic_tx
 
 logger = logging.getLogger(__name__)
 
 
 def send_for_signing(tx: AtomicTx):
-    assert tx.status == AtomicTx.STATUS.NEW
-    unsigned_tx = tx.get_unsigned_transaction()
-    message_hash = unsigned_tx.hash().hex()
-    tx.submit()
-    tx.save()
+    send_batch_for_signing([tx])
+
+
+def send_batch_for_signing(txs: list[AtomicTx]):
+    """
+    Send the message hashes of several NEW transactions to Fireblocks as one raw signing
+    request. Every transaction shares the resulting Fireblocks transaction id, the signed
+    messages are matched back to each transaction by hash.
+    """
+    if not txs:
+        return
+    message_hashes = []
+    for tx in txs:
+        assert tx.status == AtomicTx.STATUS.NEW
+        message_hashes.append(tx.get_unsigned_transaction().hash().hex())
+        tx.submit()
+        tx.save()
 
     client = get_fireblocks_client()
+    note = '; '.join(tx.description for tx in txs)
 
     try:
-        response = client.vault_raw_transaction(vault_account_id='0', asset_id='AVAXTEST', message_hash=message_hash,
-                                                note=tx.description)
+        response = client.vault_raw_messages(vault_account_id='0', asset_id='AVAXTEST',
+                                             message_hashes=message_hashes, note=note)
         logger.info(response)
     except FireblocksApiException as e:
         # TODO handle certain types of exception from Fireblocks
         logger.exception(e)
     else:
         if 'status' in response and response['status'] in ['SUBMITTED', 'COMPLETED']:
-            tx.fireblocks_tx_id = response['id']
-            tx.queue()  # Move status to AWAITING_SIGNATURE
-            tx.save()
+            for tx in txs:
+                tx.fireblocks_tx_id = response['id']
+                tx.queue()  # Move status to AWAITING_SIGNATURE
+                tx.save()
 
 
-def _get_signed_messages(tx: AtomicTx):
+def _get_signed_messages(tx: AtomicTx, transaction_data: dict = None):
     """
     Fetch signed messages from Fireblocks for the given Transaction
     :param tx:
+    :param transaction_data: Fireblocks transaction data already received, e.g. from a webhook
     :return:
     """
-    client = get_fireblocks_client()
-    response = client.get_transaction_by_id(txid=tx.fireblocks_tx_id)
+    response = transaction_data
+    if response is None:
+        client = get_fireblocks_client()
+        response = client.get_transaction_by_id(txid=tx.fireblocks_tx_id)
     if 'status' in response and response['status'] == 'COMPLETED':
         if 'signedMessages' in response:
             return response['signedMessages']
     return None
 
 
-def _check_for_signature(tx: AtomicTx):
-    signed_messages = _get_signed_messages(tx)
+def _check_for_signature(tx: AtomicTx, unsigned_tx: UnsignedTransaction, transaction_data: dict = None):
+    signed_messages = _get_signed_messages(tx, transaction_data)
     if signed_messages is not None:
         pub_key = fireblocks_public_key(tx.from_derivation_path)
-        unsigned_tx = tx.get_unsigned_transaction()
         message_hash = unsigned_tx.hash()
-        sig = recoverable_signature(signed_messages)
+        sig = recoverable_signature(signed_messages_for_hash(signed_messages, message_hash.hex()))
         verify_message_hash(pub=pub_key.ToBytes(), msg_hash=message_hash, sig=sig)
         return sig
     return None
 
 
-def check_for_signature(tx: AtomicTx):
+def build_credentials(atomic_tx: AtomicTxType, signature: bytes) -> list[SECP256K1Credential]:
+    """
+    One credential per input, in input order, holding a signature for every address index
+    the input spends from. All of our UTXOs are owned by the same Fireblocks key, so the
+    single signature of the transaction hash is reused for each of them.
+    """
+    return [SECP256K1Credential([signature] * input.signature_count()) for input in atomic_tx.get_inputs()]
+
+
+def check_for_signature(tx: AtomicTx, transaction_data: dict = None):
     assert tx.status == tx.STATUS.AWAITING_SIGNATURE
-    sig = _check_for_signature(tx)
+    unsigned_tx = tx.get_unsigned_transaction()
+    sig = _check_for_signature(tx, unsigned_tx, transaction_data)
     if sig is not None:
-        atomic_tx = tx.get_unsigned_transaction().atomic_tx
         print('-----------Signed---------')
-        cred = SECP256K1Credential([sig.to_bytes()])
-        signed_tx = SignedTransaction(atomic_tx, [cred])
-        b58_signed_tx = Base58Encoder.CheckEncode(signed_tx.to_bytes())
-        tx.signed_transaction = b58_signed_tx
+        credentials = build_credentials(unsigned_tx.atomic_tx, sig.to_bytes())
+        signed_tx = SignedTransaction(unsigned_tx.atomic_tx, credentials)
+        encoded_signed_tx = encode(signed_tx.to_bytes())
+        tx.signed_transaction = encoded_signed_tx
         tx.sign()
         tx.save()
-        return b58_signed_tx
+        return encoded_signed_tx
     return None
 
 
+def check_batch_for_signature(txs: list[AtomicTx]):
+    """
+    Check several AWAITING_SIGNATURE transactions, fetching each Fireblocks transaction
+    only once even when it was signed for several of them.
+    """
+    client = get_fireblocks_client()
+    responses = {}
+    for tx in txs:
+        if tx.fireblocks_tx_id not in responses:
+            responses[tx.fireblocks_tx_id] = client.get_transaction_by_id(txid=tx.fireblocks_tx_id)
+        check_for_signature(tx, transaction_data=responses[tx.fireblocks_tx_id])
+
+
 def broadcast_transaction(tx: AtomicTx):
     assert tx.status == tx.STATUS.SIGNED
     unsigned_tx = tx.get_unsigned_transaction()
@@ -92,7 +130,7 @@ def broadcast_transaction(tx: AtomicTx):
         raise Exception(msg)  # TODO customise exception class
 
     def get_issue_tx():
-        client = AvalancheClient(RPC_URL=settings.AVAX_RPC_URL)
+        client = get_avalanche_client()
         issue_tx = {
             PChainAlias: client.platform_issue_tx,
             XChainAlias: client.avm_issue_tx,
@@ -103,15 +141,15 @@ def broadcast_transaction(tx: AtomicTx):
     issue_tx = get_issue_tx()
     tx.broadcast()
     tx.save()
-    response = issue_tx(tx.signed_transaction)
+    response = issue_tx(tx.signed_transaction, encoding=detect_encoding(tx.signed_transaction))
     if response.status_code == 200:
         response = response.json()
         if 'result' in response:
             logger.info(response)
             result = response['result']
             if 'txID' in result:
+                # Confirmed once the network has accepted it, see check_transaction_status
                 tx.avalanche_tx_id = result['txID']
-                tx.confirm()
                 tx.save()
 
         elif 'error' in response:
@@ -125,3 +163,39 @@ def broadcast_transaction(tx: AtomicTx):
         # Some other error code. Unknown response
         logger.error('Unknown response type from Avalanche')
         fail_tx(response, msg="Unknown error while issuing transaction")
+
+
+# Final statuses reported by avax.getAtomicTxStatus, platform.getTxStatus and avm.getTxStatus
+ACCEPTED_STATUSES = ('Accepted', 'Committed')
+FAILED_STATUSES = ('Rejected', 'Dropped')
+
+
+def check_transaction_status(txs: list[AtomicTx]):
+    """
+    Check whether broadcast transactions have been accepted by the network. The status
+    of every transaction is requested in a single JSON-RPC batch per chain.
+    """
+    client = get_avalanche_client()
+    with client.batch() as batch:
+        get_status = {
+            PChainAlias: batch.platform_get_tx_status,
+            XChainAlias: batch.avm_get_tx_status,
+            CChainAlias: batch.evm_get_atomic_tx,
+        }
+        responses = [(tx, get_status[tx.get_unsigned_transaction().get_source_chain()](tx.avalanche_tx_id))
+                     for tx in txs]
+
+    for tx, response in responses:
+        data = response.json()
+        if 'result' not in data:
+            logger.error(f'Failed to get status of {tx}: {data.get("error")}')
+            continue
+        status = data['result']['status']
+        if status in ACCEPTED_STATUSES:
+            tx.confirm()
+            tx.save()
+            record_atomic_tx(tx)
+        elif status in FAILED_STATUSES:
+            logger.error(f'Transaction {tx} was not accepted: {status}')
+            tx.fail()
+            tx.save()
@@ -0,0 +1,133 @@
+import logging
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from avalanche.api import get_avalanche_client
+from avalanche.base58 import Base58Decoder
+from avalanche.bech32 import bech32_to_bytes
+from avalanche.constants import DEFAULTS, CChainAlias, PChainAlias, XChainAlias
+from avalanche.datastructures.evm import UTXO, EVMExportTx, EVMImportTx, TransferableInput
+from avalanche.datastructures.types import AtomicTx as AtomicTxType
+from avalanche.models import AtomicTx, IndexedUTXO
+from avalanche.tools import uint_to_num
+
+logger = logging.getLogger(__name__)
+
+
+def _indexed_utxo(raw: bytes, chain: str, source_chain: str, address: str) -> IndexedUTXO:
+    utxo = UTXO.from_bytes(raw)
+    return IndexedUTXO(tx_id=utxo.tx_id.hex(),
+                       output_index=utxo.output_index,
+                       chain=chain,
+                       source_chain=source_chain,
+                       address=address,
+                       asset_id=utxo.asset_id.hex(),
+                       amount=utxo.output.amount,
+                       raw=raw)
+
+
+def _utxo_key(tx_id: bytes, output_index: int) -> tuple[str, int]:
+    return bytes(tx_id).hex(), output_index
+
+
+def unspent_utxos(chain: str, address: str, source_chain: str = '') -> QuerySet:
+    return IndexedUTXO.objects.filter(chain=chain, source_chain=source_chain, address=address, spent=False)
+
+
+def available_utxos(chain: str, address: str, source_chain: str = '') -> QuerySet:
+    """
+    Unspent UTXOs that are not reserved by another transaction. Must be evaluated inside
+    a transaction: the rows are locked until it ends, and rows already locked by a
+    concurrent builder are skipped rather than waited on, so that parallel builders
+    always end up with disjoint UTXO sets.
+    """
+    return unspent_utxos(chain, address, source_chain).filter(reserved_by=None).select_for_update(skip_locked=True)
+
+
+def reserve_utxos(utxos: list[IndexedUTXO], tx: AtomicTx):
+    IndexedUTXO.objects.filter(pk__in=[utxo.pk for utxo in utxos]).update(reserved_by=tx)
+
+
+def sync_utxos(network_id: int, chain: str, address: str, source_chain: str = '') -> QuerySet:
+    """
+    Bring the index for an address up to date with the node. Only UTXOs we have not
+    seen before are decoded and stored, indexed UTXOs the node no longer returns are
+    marked as spent. Returns the unspent UTXOs for the address.
+    """
+    source_chain_id = None
+    if source_chain:
+        source_chain_id = DEFAULTS['networks'][network_id][source_chain]['blockchainID']
+
+    # Rows are only marked spent once the spending transaction is accepted, which is final
+    known = {
+        (tx_id, output_index): (pk, spent) for tx_id, output_index, pk, spent in
+        IndexedUTXO.objects.filter(chain=chain, source_chain=source_chain, address=address).values_list(
+            'tx_id', 'output_index', 'pk', 'spent')
+    }
+    seen = set()
+    new_utxos = []
+    client = get_avalanche_client()
+    for raw in client.iter_utxo_bytes(chain, [address], source_chain=source_chain_id):
+        key = _utxo_key(*UTXO.id_from_bytes(raw))
+        seen.add(key)
+        if key not in known:
+            new_utxos.append(_indexed_utxo(raw, chain, source_chain, address))
+
+    gone = [pk for key, (pk, spent) in known.items() if not spent and key not in seen]
+    with transaction.atomic():
+        IndexedUTXO.objects.bulk_create(new_utxos, ignore_conflicts=True)
+        IndexedUTXO.objects.filter(pk__in=gone).update(spent=True)
+    logger.info(f'Synced UTXOs for {address} on {chain}-Chain: {len(new_utxos)} new, {len(gone)} spent')
+    return unspent_utxos(chain, address, source_chain)
+
+
+def _consumed_inputs(atomic_tx: AtomicTxType) -> list[TransferableInput]:
+    if isinstance(atomic_tx, EVMExportTx):
+        # C-Chain exports spend account balance, not UTXOs
+        return []
+    if isinstance(atomic_tx, EVMImportTx):
+        return atomic_tx.imported_inputs
+    return atomic_tx.base_tx.inputs + getattr(atomic_tx, 'ins', [])
+
+
+def _exported_utxos(tx: AtomicTx, atomic_tx: AtomicTxType) -> list[IndexedUTXO]:
+    if isinstance(atomic_tx, EVMExportTx):
+        outputs, first_index = atomic_tx.exported_outs, 0
+    elif hasattr(atomic_tx, 'destination_chain'):
+        # Exported UTXOs are numbered after the outputs that stay on the source chain
+        outputs, first_index = atomic_tx.outs, len(atomic_tx.base_tx.outputs)
+    else:
+        return []
+
+    network_id = uint_to_num(atomic_tx.network_id if isinstance(atomic_tx, EVMExportTx)
+                             else atomic_tx.base_tx.network_id)
+    chains = {Base58Decoder.CheckDecode(DEFAULTS['networks'][network_id][alias]['blockchainID']): alias
+              for alias in (CChainAlias, PChainAlias, XChainAlias)}
+    destination_chain = chains[bytes(atomic_tx.destination_chain)]
+    tx_id = Base58Decoder.CheckDecode(tx.avalanche_tx_id)
+    owner = bech32_to_bytes(tx.to_address.split('-')[1])
+
+    utxos = []
+    for i, output in enumerate(outputs):
+        if owner not in output.output.addresses:
+            # Rows are indexed by the address that can spend them
+            continue
+        utxo = UTXO(tx_id, first_index + i, output.asset_id, output.output)
+        utxos.append(_indexed_utxo(utxo.to_bytes(), destination_chain, atomic_tx.SOURCE_CHAIN, tx.to_address))
+    return utxos
+
+
+def record_atomic_tx(tx: AtomicTx):
+    """
+    Update the index with a transaction we have issued: the UTXOs it consumed are
+    spent, and the UTXOs it exported are added so the matching import can be built
+    without waiting for a sync.
+    """
+    assert tx.status == AtomicTx.STATUS.CONFIRMED
+    atomic_tx = tx.get_atomic_transaction()
+    consumed = [_utxo_key(tx_input.tx_id, tx_input.utxo_index) for tx_input in _consumed_inputs(atomic_tx)]
+    with transaction.atomic():
+        for tx_id, output_index in consumed:
+            IndexedUTXO.objects.filter(tx_id=tx_id, output_index=output_index).update(spent=True, spent_by=tx)
+        IndexedUTXO.objects.bulk_create(_exported_utxos(tx, atomic_tx), ignore_conflicts=True)
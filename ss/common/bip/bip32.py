@@ -1,21 +1,62 @@
+from functools import lru_cache
+
 from bip_utils import EthAddrEncoder
 from bip_utils.bip.bip32 import Bip32Secp256k1
 from bip_utils.ecc.secp256k1_keys_coincurve import Secp256k1PublicKeyCoincurve
 
 from django.conf import settings
 
+# Bounds on the number of cached parent nodes and derived keys/addresses
+NODE_CACHE_SIZE = 256
+KEY_CACHE_SIZE = 4096
+
 
 def fireblocks_public_key(derivation_path="44/1/0/0/0"):
     fireblocks_xpub = settings.FIREBLOCKS_XPUB
-    return public_key_from_string(fireblocks_xpub, derivation_path).RawCompressed()
+    return _public_key(fireblocks_xpub, derivation_path).RawCompressed()
 
 
 def public_key_from_string(public_key_str: str, derivation_path="44/1/0/0/0"):
-    bip32_ctx = Bip32Secp256k1.FromExtendedKey(public_key_str)
-    derrived = bip32_ctx.DerivePath(derivation_path)
-    return derrived.PublicKey()
+    return _public_key(public_key_str, derivation_path)
+
+
+def derive_range(prefix: str, start: int, count: int, public_key_str: str = None):
+    """
+    Derive the public keys of `count` consecutive children of the `prefix` path starting
+    at index `start`. The parent node is derived once and reused for every child.
+    :return: list of (derivation path, compressed public key) tuples
+    """
+    if public_key_str is None:
+        public_key_str = settings.FIREBLOCKS_XPUB
+    parent = _node(public_key_str, prefix.strip('/'))
+    return [(_child_path(prefix, index), parent.ChildKey(index).PublicKey().RawCompressed())
+            for index in range(start, start + count)]
+
+
+def _child_path(prefix: str, index: int) -> str:
+    prefix = prefix.strip('/')
+    return f'{prefix}/{index}' if prefix else str(index)
+
+
+@lru_cache(maxsize=NODE_CACHE_SIZE)
+def _node(public_key_str: str, derivation_path: str) -> Bip32Secp256k1:
+    """
+    Derive the node at a path, reusing the cached parent node so that sibling paths
+    share all but the last derivation step.
+    """
+    if not derivation_path:
+        return Bip32Secp256k1.FromExtendedKey(public_key_str)
+    parent_path, _, index = derivation_path.rpartition('/')
+    return _node(public_key_str, parent_path).DerivePath(index)
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _public_key(public_key_str: str, derivation_path: str):
+    parent_path, _, index = derivation_path.strip('/').rpartition('/')
+    return _node(public_key_str, parent_path).DerivePath(index).PublicKey()
 
 
+@lru_cache(maxsize=KEY_CACHE_SIZE)
 def eth_address_from_public_key(public_key: bytes):
     secp_pub = Secp256k1PublicKeyCoincurve.FromBytes(public_key)
     addr = EthAddrEncoder.EncodeKey(secp_pub)
@@ -0,0 +1,71 @@
+"""
+Bulk derivation of Fireblocks deposit addresses. Every child of a parent path is
+derived from a single parent node, and large ranges can be split into chunks that
+are derived in a process pool.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, NamedTuple
+
+from django.conf import settings
+
+from avalanche.bech32 import bech32_address_from_public_key
+
+from .bip32 import derive_range, eth_address_from_public_key
+from .bip44_coins import Bip44Coins
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class DerivedAddress(NamedTuple):
+    path: str
+    public_key: bytes
+    eth_address: str
+    p_address: str
+    x_address: str
+
+
+def _derive_chunk(public_key_str: str, prefix: str, start: int, count: int,
+                  p_coin: Bip44Coins, x_coin: Bip44Coins) -> list[DerivedAddress]:
+    addresses = []
+    for path, key in derive_range(prefix, start, count, public_key_str):
+        public_key = key.ToBytes()
+        addresses.append(DerivedAddress(
+            path=path,
+            public_key=public_key,
+            eth_address=eth_address_from_public_key(public_key),
+            p_address=bech32_address_from_public_key(public_key, p_coin),
+            x_address=bech32_address_from_public_key(public_key, x_coin),
+        ))
+    return addresses
+
+
+def derive_addresses(prefix: str, start: int, count: int, public_key_str: str = None, workers: int = 1,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, p_coin: Bip44Coins = Bip44Coins.FB_P_CHAIN,
+                     x_coin: Bip44Coins = Bip44Coins.FB_X_CHAIN) -> Iterator[DerivedAddress]:
+    """
+    Stream the addresses of `count` consecutive children of the `prefix` path, starting
+    at index `start`, in index order. With more than one worker the range is derived in
+    chunks across a process pool.
+    """
+    if public_key_str is None:
+        public_key_str = settings.FIREBLOCKS_XPUB
+    prefix = prefix.strip('/')
+    chunks = [(chunk_start, min(chunk_size, start + count - chunk_start))
+              for chunk_start in range(start, start + count, chunk_size)]
+
+    if workers <= 1:
+        for chunk_start, chunk_count in chunks:
+            yield from _derive_chunk(public_key_str, prefix, chunk_start, chunk_count, p_coin, x_coin)
+        return
+
+    # Only keep a few chunks in flight per worker so memory stays bounded for large ranges
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_start, chunk_count in chunks:
+            pending.append(executor.submit(_derive_chunk, public_key_str, prefix, chunk_start, chunk_count,
+                                           p_coin, x_coin))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -4,8 +4,9 @@ from django.utils.translation import ngettext
 from common.utils.explorer import get_explorer_link
 from common.utils.urls import get_admin_link
 
-from .models import (ExternalWallet, ExternalWalletAsset, FireblocksWallet, Transaction, VaultAccount, VaultAsset,
-                     VaultDeposit, VaultWalletAddress, VaultWithdrawal, WithdrawalJob)
+from .models import (ExternalWallet, ExternalWalletAsset, FireblocksWallet, ImportCursor, Transaction, VaultAccount,
+                     VaultAsset, VaultBalanceSnapshot, VaultDeposit, VaultWalletAddress, VaultWithdrawal,
+                     WithdrawalJob)
 from .utils.deposit import get_or_create_deposit, update_deposit_status
 
 
@@ -83,9 +84,23 @@ class VaultWalletAddressAdmin(admin.ModelAdmin):
         return VaultDeposit.objects.filter(address=obj).count()
 
 
+@admin.register(VaultBalanceSnapshot)
+class VaultBalanceSnapshotAdmin(admin.ModelAdmin):
+    list_filter = ('vault_id', 'asset_id')
+    readonly_fields = ('created_date', 'vault_id', 'asset_id', 'total', 'available', 'pending', 'frozen', 'data')
+    list_display = ('__str__', 'created_date', 'vault_id', 'asset_id', 'total', 'available', 'pending')
+
+
+@admin.register(ImportCursor)
+class ImportCursorAdmin(admin.ModelAdmin):
+    readonly_fields = ('created_date', 'modified_date', 'name')
+    list_display = ('__str__', 'modified_date', 'timestamp')
+
+
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
-    list_filter = ('asset_id', )
+    list_filter = ('asset_id', 'status')
+    search_fields = ['tx_id', 'tx_hash', 'destination_address']
     exclude = ('deposit', 'withdrawal')
     readonly_fields = ('created_date', 'modified_date', 'tx_id', 'created_at', 'asset_id', 'amount', 'fee', 'status',
                        '_deposit', '_withdrawal', 'destination', 'destination_address', 'explorer_link', 'data')
@@ -1,17 +1,68 @@
+import json
 import logging
 import os.path
+import random
+import threading
+import time
 from decimal import Decimal
+from functools import lru_cache
 
+import requests
+from cryptography.hazmat.primitives import serialization
 from fireblocks_sdk import CONTRACT_CALL, EXTERNAL_WALLET, UNKNOWN_PEER, VAULT_ACCOUNT, RawMessage, UnsignedMessage
-from fireblocks_sdk.sdk import DestinationTransferPeerPath, FireblocksApiException, FireblocksSDK, TransferPeerPath
+from fireblocks_sdk.sdk import (DestinationTransferPeerPath, FireblocksApiException, FireblocksSDK, TransferPeerPath,
+                                handle_response)
+from fireblocks_sdk.sdk_token_provider import SdkTokenProvider
+from requests.adapters import HTTPAdapter
 from web3 import Web3
 from web3.types import Wei
 
 from django.conf import settings
+from django.core.cache import cache
+
+from .models import VaultBalanceSnapshot
 
 logger = logging.getLogger(__name__)
 
 
+class RateLimiter:
+    """
+    Token bucket allowing `rate` requests per second on average, with bursts of up to
+    `burst` requests. Safe to share between threads.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, sleeping until one is available.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class TokenProvider(SdkTokenProvider):
+    """
+    SdkTokenProvider that parses the private key once, rather than on every request signed.
+    """
+
+    def __init__(self, private_key: str, api_key: str):
+        super().__init__(serialization.load_pem_private_key(private_key.encode(), password=None), api_key)
+
+
 class FireblocksClient(FireblocksSDK):
     """
     FireblocksSDK that supports reading the private key either directly
@@ -34,10 +85,106 @@ class FireblocksClient(FireblocksSDK):
                 with open(path, 'r') as f:
                     setattr(cls, 'FIREBLOCKS_PRIVATE_KEY', f.read())
 
-        return super().__new__(cls, *args, **kwargs)
+        return super().__new__(cls)
 
-    def __init__(self):
-        super().__init__(private_key=self.FIREBLOCKS_PRIVATE_KEY, api_key=settings.FIREBLOCKS_API_KEY)
+    # HTTP status codes that indicate a request was not processed and can be sent again
+    RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+    def __init__(self, pool_size=10, timeout=30, max_retries=3, backoff_factor=0.5, rate_limit=5, burst=10,
+                 balance_cache_ttl=10):
+        super().__init__(private_key=self.FIREBLOCKS_PRIVATE_KEY, api_key=settings.FIREBLOCKS_API_KEY,
+                         timeout=timeout)
+        self.balance_cache_ttl = balance_cache_ttl
+        self.token_provider = TokenProvider(self.FIREBLOCKS_PRIVATE_KEY, settings.FIREBLOCKS_API_KEY)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = RateLimiter(rate=rate_limit, burst=burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _backoff_delay(self, attempt: int, response: requests.Response = None) -> float:
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return float(response.headers['Retry-After'])
+        # Full jitter so that workers limited at the same time do not retry in lockstep
+        return random.uniform(0, self.backoff_factor * (2 ** attempt))
+
+    def _request(self, method: str, path: str, body=None, headers: dict = None, idempotent=True):
+        """
+        Send a signed request through the pooled session, waiting for the rate limiter first.
+        Rate limited requests are always retried. Connection errors and temporary server
+        errors are only retried for idempotent requests, as a transaction may have been created.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            # Tokens contain a nonce and expire, so every attempt is signed again
+            token = self.token_provider.sign_jwt(path, '' if body is None else body)
+            request_headers = {'X-API-Key': self.api_key, 'Authorization': f'Bearer {token}', **(headers or {})}
+            data = json.dumps(body) if body is not None else None
+            response = None
+            try:
+                response = self.session.request(method, self.base_url + path, headers=request_headers, data=data,
+                                                timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries or not idempotent:
+                    raise
+                logger.warning(f'Fireblocks {method} {path} failed ({e}), retrying')
+            else:
+                retry = response.status_code == 429 or (idempotent and response.status_code in self.RETRY_STATUS_CODES)
+                if not retry or attempt == self.max_retries:
+                    return response
+                logger.warning(f'Fireblocks {method} {path} returned {response.status_code}, retrying')
+            time.sleep(self._backoff_delay(attempt, response))
+
+    def _get_request(self, path, page_mode=False):
+        return handle_response(self._request('GET', path), page_mode)
+
+    def _post_request(self, path, body={}, idempotency_key=None):
+        headers = {'Content-Type': 'application/json'}
+        if idempotency_key is not None:
+            headers['Idempotency-Key'] = idempotency_key
+        # A POST can only be sent again safely if Fireblocks can recognise the repeat
+        response = self._request('POST', path, body, headers, idempotent=idempotency_key is not None)
+        return handle_response(response)
+
+    def _put_request(self, path, body={}):
+        return handle_response(self._request('PUT', path, body, {'Content-Type': 'application/json'}))
+
+    def _delete_request(self, path):
+        return handle_response(self._request('DELETE', path))
+
+    @staticmethod
+    def _balance_cache_key(vault_account_id, asset_id) -> str:
+        return f'fireblocks:balance:{vault_account_id}:{asset_id}'
+
+    def get_vault_account_asset(self, vault_account_id, asset_id, fresh=False):
+        """
+        Read-through cache of vault balances, so that balance checks repeated within the
+        TTL do not each call Fireblocks. Every balance fetched is recorded as a snapshot.
+        Pass fresh=True to skip the cache before spending funds, as another process may
+        have spent from the vault without invalidating our cache.
+        """
+        key = self._balance_cache_key(vault_account_id, asset_id)
+        asset = None if fresh else cache.get(key)
+        if asset is None:
+            asset = super().get_vault_account_asset(vault_account_id, asset_id)
+            cache.set(key, asset, self.balance_cache_ttl)
+            VaultBalanceSnapshot.record(vault_account_id, asset_id, asset)
+        return asset
+
+    def invalidate_balance(self, vault_account_id, asset_id):
+        cache.delete(self._balance_cache_key(vault_account_id, asset_id))
+
+    def create_transaction(self, asset_id=None, amount=None, source=None, destination=None, **kwargs):
+        try:
+            return super().create_transaction(asset_id, amount=amount, source=source, destination=destination,
+                                              **kwargs)
+        finally:
+            # Whether or not the request succeeded, the vault balances may have changed
+            for peer in (source, destination):
+                if peer is not None and peer.type == VAULT_ACCOUNT and hasattr(peer, 'id'):
+                    self.invalidate_balance(peer.id, asset_id)
 
     def one_time_address_withdrawal(self, vault_account_id: str, asset_id: str, amount: Decimal, address: str):
         one_time_address = {'address': address}
@@ -58,10 +205,17 @@ class FireblocksClient(FireblocksSDK):
         return self.create_transaction(asset_id, amount=str(amount), source=source, destination=dest)
 
     def vault_raw_transaction(self, vault_account_id: str, asset_id: str, message_hash: str, note: str):
+        return self.vault_raw_messages(vault_account_id, asset_id, message_hashes=[message_hash], note=note)
+
+    def vault_raw_messages(self, vault_account_id: str, asset_id: str, message_hashes: list[str], note: str):
+        """
+        Sign several message hashes with a single raw transaction. Fireblocks returns one
+        signed message per hash, with the hash as its `content`.
+        """
         source = TransferPeerPath(peer_type=VAULT_ACCOUNT, peer_id=vault_account_id)
         raw_message = RawMessage(
             messages=[
-                UnsignedMessage(content=message_hash)
+                UnsignedMessage(content=message_hash) for message_hash in message_hashes
             ]
         )
         return self.create_raw_transaction(asset_id=asset_id, source=source, raw_message=raw_message, note=note)
@@ -82,11 +236,28 @@ class FireblocksClient(FireblocksSDK):
             tx_type=CONTRACT_CALL,
         )
 
-    def available_balance_wei(self, vault_account_id: str, asset_id: str) -> Wei:
-        asset = self.get_vault_account_asset(vault_account_id, asset_id)
+    def available_balance_wei(self, vault_account_id: str, asset_id: str, fresh=False) -> Wei:
+        asset = self.get_vault_account_asset(vault_account_id, asset_id, fresh=fresh)
         available = asset['available']
         return Web3.toWei(available, 'ether')
 
 
-def get_fireblocks_client():
-    return FireblocksClient()
+@lru_cache(maxsize=None)
+def _shared_fireblocks_client() -> FireblocksClient:
+    return FireblocksClient(
+        pool_size=settings.FIREBLOCKS_API_POOL_SIZE,
+        timeout=(settings.FIREBLOCKS_API_CONNECT_TIMEOUT, settings.FIREBLOCKS_API_READ_TIMEOUT),
+        max_retries=settings.FIREBLOCKS_API_MAX_RETRIES,
+        backoff_factor=settings.FIREBLOCKS_API_BACKOFF_FACTOR,
+        rate_limit=settings.FIREBLOCKS_API_RATE_LIMIT,
+        burst=settings.FIREBLOCKS_API_BURST,
+        balance_cache_ttl=settings.FIREBLOCKS_BALANCE_CACHE_TTL,
+    )
+
+
+def get_fireblocks_client() -> FireblocksClient:
+    """
+    Return the FireblocksClient shared by everything running in this process, so that
+    connections are pooled and every request counts against the same rate limiter.
+    """
+    return _shared_fireblocks_client()
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from fireblocks.models import Transaction
+from fireblocks.utils.transaction_fields import backfill_data_fields
+
+
+class Command(BaseCommand):
+    help = 'Copy the indexed Transaction fields out of the stored Fireblocks data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Transactions updated per batch')
+
+    def handle(self, *args, **options):
+        count = backfill_data_fields(Transaction, batch_size=options['batch_size'],
+                                     progress=lambda n: self.stdout.write(f'Updated {n} Transaction objects'))
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {count} Transaction objects'))
@@ -23,7 +23,7 @@ class Command(BaseCommand):
                     if transaction.tx_hash:
                         try:
                             self.stdout.write(f'Fetching {transaction.tx_hash}...')
-                            tx = Transaction.objects.get(data__txHash=transaction.tx_hash)
+                            tx = Transaction.objects.get(tx_hash=transaction.tx_hash)
                         except Transaction.DoesNotExist:
                             self.stdout.write(self.style.WARNING('Not found'))
                         else:
@@ -0,0 +1,22 @@
+# Generated by Django 4.0.4 on 2026-10-18 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fireblocks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCursor',
+            fields=[
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('modified_date', models.DateTimeField(auto_now=True)),
+                ('name', models.TextField(primary_key=True, serialize=False, unique=True)),
+                ('timestamp', models.BigIntegerField(default=0, help_text='Latest Fireblocks timestamp imported, in milliseconds')),
+            ],
+        ),
+    ]
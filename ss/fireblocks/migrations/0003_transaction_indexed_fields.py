@@ -0,0 +1,49 @@
+# Generated by Django 4.0.4 on 2026-10-18 08:30
+
+from django.db import migrations, models
+
+from fireblocks.utils.transaction_fields import backfill_data_fields
+
+
+def backfill_transaction_fields(apps, schema_editor):
+    backfill_data_fields(apps.get_model('fireblocks', 'Transaction'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fireblocks', '0002_importcursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='destination_address',
+            field=models.TextField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='destination_id',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='destination_type',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='status',
+            field=models.TextField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='tx_hash',
+            field=models.TextField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['destination_type', 'destination_id'], name='transaction_destination'),
+        ),
+        migrations.RunPython(backfill_transaction_fields, migrations.RunPython.noop),
+    ]
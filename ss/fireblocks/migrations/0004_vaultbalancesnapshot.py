@@ -0,0 +1,35 @@
+# Generated by Django 4.0.4 on 2026-10-18 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fireblocks', '0003_transaction_indexed_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VaultBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('vault_id', models.TextField()),
+                ('asset_id', models.TextField()),
+                ('total', models.DecimalField(decimal_places=18, max_digits=30)),
+                ('available', models.DecimalField(decimal_places=18, max_digits=30)),
+                ('pending', models.DecimalField(decimal_places=18, max_digits=30)),
+                ('frozen', models.DecimalField(decimal_places=18, max_digits=30)),
+                ('data', models.JSONField()),
+            ],
+            options={
+                'ordering': ['-created_date'],
+                'get_latest_by': 'created_date',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='vaultbalancesnapshot',
+            index=models.Index(fields=['vault_id', 'asset_id', 'created_date'], name='balance_snapshot_lookup'),
+        ),
+    ]
@@ -15,6 +15,7 @@ from common.constants import MAX_DEC_PLACES
 from common.validators import validate_positive
 
 from .fields import NullTextField
+from .utils.transaction_fields import DATA_FIELDS, data_field_values
 
 logger = logging.getLogger(__name__)
 
@@ -196,6 +197,63 @@ class VaultWalletAddress(models.Model):
         return self.wallet.asset
 
 
+class VaultBalanceSnapshot(models.Model):
+    """
+    Balance of an asset in a Fireblocks vault account, recorded each time it is fetched.
+    https://docs.fireblocks.com/api/#vaultasset
+    """
+    created_date = models.DateTimeField(auto_now_add=True)
+
+    vault_id = models.TextField()
+    asset_id = models.TextField()
+    total = models.DecimalField(max_digits=30, decimal_places=MAX_DEC_PLACES)
+    available = models.DecimalField(max_digits=30, decimal_places=MAX_DEC_PLACES)
+    pending = models.DecimalField(max_digits=30, decimal_places=MAX_DEC_PLACES)
+    frozen = models.DecimalField(max_digits=30, decimal_places=MAX_DEC_PLACES)
+    data = models.JSONField()
+
+    class Meta:
+        ordering = ['-created_date']
+        get_latest_by = 'created_date'
+        indexes = [
+            models.Index(fields=['vault_id', 'asset_id', 'created_date'], name='balance_snapshot_lookup'),
+        ]
+
+    def __str__(self):
+        return f'{self.vault_id} {self.asset_id} ({self.available})'
+
+    @classmethod
+    def record(cls, vault_id: str, asset_id: str, data: dict) -> 'VaultBalanceSnapshot':
+        def amount(name):
+            return Decimal(str(data.get(name) or 0))
+
+        return cls.objects.create(vault_id=str(vault_id), asset_id=asset_id, total=amount('total'),
+                                  available=amount('available'), pending=amount('pending'),
+                                  frozen=amount('frozen'), data=data)
+
+
+class ImportCursor(models.Model):
+    """
+    High-water mark of an incremental import from Fireblocks, so that each import
+    only fetches objects created since the previous one.
+    """
+    TRANSACTIONS = 'transactions'
+
+    created_date = models.DateTimeField(auto_now_add=True)
+    modified_date = models.DateTimeField(auto_now=True)
+
+    name = models.TextField(primary_key=True, unique=True)
+    timestamp = models.BigIntegerField(default=0, help_text='Latest Fireblocks timestamp imported, in milliseconds')
+
+    def __str__(self):
+        return f'{self.name} ({self.timestamp})'
+
+    @classmethod
+    def get(cls, name: str) -> 'ImportCursor':
+        cursor, _ = cls.objects.get_or_create(name=name)
+        return cursor
+
+
 class UnmatchedTransactionManager(models.Manager):
 
     def get_queryset(self):
@@ -210,6 +268,11 @@ class Transaction(models.Model):
 
     This object is usually linked to a VaultDeposit or VaultWithdrawal.
     """
+    # Fireblocks statuses after which a transaction is never updated again
+    FINAL_STATUSES = ('COMPLETED', 'CANCELLED', 'REJECTED', 'FAILED', 'BLOCKED')
+    # Fields copied from data, which must be written whenever data is
+    DATA_FIELDS = DATA_FIELDS
+
     created_date = models.DateTimeField(auto_now_add=True, help_text='Transaction creation date in SS.')
     created_at = models.DateTimeField(editable=False, help_text='Transaction creation date in Fireblocks.')
     modified_date = models.DateTimeField(auto_now=True)
@@ -218,6 +281,13 @@ class Transaction(models.Model):
     asset_id = models.TextField()
     data = models.JSONField()
 
+    # Copies of frequently queried values in data, kept in sync by sync_data_fields() so they can be indexed
+    status = models.TextField(null=True, blank=True, editable=False, db_index=True)
+    tx_hash = models.TextField(null=True, blank=True, editable=False, db_index=True)
+    destination_type = models.TextField(null=True, blank=True, editable=False)
+    destination_id = models.TextField(null=True, blank=True, editable=False)
+    destination_address = models.TextField(null=True, blank=True, editable=False, db_index=True)
+
     # Each deposit is linked to exactly one transaction that defines the other deposit parameters
     deposit = models.OneToOneField('VaultDeposit', on_delete=models.CASCADE, null=True, blank=True)
     # Each withdrawal is linked to exactly one transaction that confirms the withdrawal
@@ -233,10 +303,27 @@ class Transaction(models.Model):
             CheckConstraint(check=Q(deposit__isnull=True) | Q(withdrawal__isnull=True),
                             name='deposit_or_withdrawal'),
         ]
+        indexes = [
+            models.Index(fields=['destination_type', 'destination_id'], name='transaction_destination'),
+        ]
 
     def __str__(self):
         return f'{self.tx_id}'
 
+    def save(self, *args, update_fields=None, **kwargs):
+        self.sync_data_fields()
+        if update_fields is not None and 'data' in update_fields:
+            update_fields = {*update_fields, *self.DATA_FIELDS}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def sync_data_fields(self):
+        """
+        Copy the indexed fields out of data. Must be called before bulk_create/bulk_update,
+        which do not call save().
+        """
+        for field, value in data_field_values(self.data).items():
+            setattr(self, field, value)
+
     def get_created_at(self):
         if 'createdAt' in self.data:
             timestamp = self.data['createdAt']
@@ -266,44 +353,22 @@ class Transaction(models.Model):
             return Decimal(str(self.data['networkFee']))
         return None
 
-    @property
-    def tx_hash(self):
-        if 'txHash' in self.data:
-            return self.data['txHash']
-        return None
-
-    @property
-    def status(self):
-        if 'status' in self.data:
-            return self.data['status']
-        return None
-
     @property
     def destination(self):
         if 'destination' in self.data:
             return self.data['destination']
         return None
 
-    @property
-    def destination_address(self):
-        if 'destinationAddress' in self.data:
-            return self.data['destinationAddress']
-        return None
-
     @property
     def destination_vault_account(self):
-        if 'destination' in self.data:
-            destination = self.data['destination']
-            if 'type' in destination and destination['type'] == 'VAULT_ACCOUNT':
-                return destination['id']
+        if self.destination_type == 'VAULT_ACCOUNT':
+            return self.destination_id
         return None
 
     @property
     def destination_external_wallet(self):
-        if 'destination' in self.data:
-            destination = self.data['destination']
-            if 'type' in destination and destination['type'] == 'EXTERNAL_WALLET':
-                return destination['id']
+        if self.destination_type == 'EXTERNAL_WALLET':
+            return self.destination_id
         return None
 
     def get_vault_account(self):
@@ -336,7 +401,7 @@ class Transaction(models.Model):
         """
         try:
             return VaultAsset.objects.get(asset_id=self.asset_id)
-        except VaultAccount.DoesNotExist:
+        except VaultAsset.DoesNotExist:
             return None
 
     def get_fireblocks_wallet(self):
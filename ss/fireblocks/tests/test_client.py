@@ -0,0 +1,122 @@
+from decimal import Decimal
+from unittest import mock
+
+import requests
+from fireblocks_sdk.sdk import FireblocksApiException
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..client import FireblocksClient, RateLimiter, get_fireblocks_client
+from ..models import VaultBalanceSnapshot
+
+
+def _response(status_code: int, data=None, headers: dict = None) -> mock.Mock:
+    response = mock.Mock(status_code=status_code, headers=headers or {}, text='')
+    response.json.return_value = data
+    return response
+
+
+@mock.patch('fireblocks.client.time.sleep')
+class FireblocksClientTestCase(TestCase):
+
+    def setUp(self):
+        self.client = FireblocksClient(max_retries=2, rate_limit=1000, burst=1000)
+        self.request = mock.patch.object(self.client.session, 'request').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_shared_client(self, mock_sleep):
+        self.assertIs(get_fireblocks_client(), get_fireblocks_client())
+
+    def test_get_retried(self, mock_sleep):
+        self.request.side_effect = [_response(429, headers={'Retry-After': '2'}), _response(503),
+                                    _response(200, [{'id': '0'}])]
+        self.assertEqual(self.client.get_vault_accounts(), [{'id': '0'}])
+        self.assertEqual(self.request.call_count, 3)
+        # Retry-After is respected when Fireblocks sends it
+        self.assertEqual(mock_sleep.call_args_list[0], mock.call(2.0))
+        # Every attempt is signed separately
+        tokens = {call.kwargs['headers']['Authorization'] for call in self.request.call_args_list}
+        self.assertEqual(len(tokens), 3)
+
+    def test_get_retries_exhausted(self, mock_sleep):
+        self.request.return_value = _response(503, {'code': 1})
+        with self.assertRaises(FireblocksApiException):
+            self.client.get_vault_accounts()
+        self.assertEqual(self.request.call_count, 3)
+
+    def test_get_connection_error_retried(self, mock_sleep):
+        self.request.side_effect = [requests.ConnectionError(), _response(200, [])]
+        self.assertEqual(self.client.get_vault_accounts(), [])
+
+    def test_post_not_retried_on_server_error(self, mock_sleep):
+        self.request.return_value = _response(503)
+        with self.assertRaises(FireblocksApiException):
+            self.client.vault_raw_transaction(vault_account_id='0', asset_id='AVAXTEST', message_hash='00', note='')
+        # The transaction may have been created, so it is never sent twice
+        self.assertEqual(self.request.call_count, 1)
+
+    def test_post_retried_when_rate_limited(self, mock_sleep):
+        self.request.side_effect = [_response(429), _response(200, {'id': '1', 'status': 'SUBMITTED'})]
+        response = self.client.vault_raw_transaction(vault_account_id='0', asset_id='AVAXTEST', message_hash='00',
+                                                     note='')
+        self.assertEqual(response['id'], '1')
+        self.assertEqual(self.request.call_count, 2)
+
+
+class BalanceCacheTestCase(TestCase):
+    VAULT_ASSET = {'id': 'AVAXTEST', 'total': '12.5', 'available': '10', 'pending': '2.5', 'frozen': '0',
+                   'lockedAmount': '0'}
+
+    def setUp(self):
+        cache.clear()
+        self.client = FireblocksClient()
+        self.request = mock.patch.object(self.client.session, 'request').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_balance_cached(self):
+        self.request.return_value = _response(200, self.VAULT_ASSET)
+        self.assertEqual(self.client.available_balance_wei('1', 'AVAXTEST'), 10 * 10 ** 18)
+        self.assertEqual(self.client.available_balance_wei('1', 'AVAXTEST'), 10 * 10 ** 18)
+        self.assertEqual(self.request.call_count, 1)
+        # Each balance fetched from Fireblocks is recorded
+        snapshot = VaultBalanceSnapshot.objects.get()
+        self.assertEqual((snapshot.vault_id, snapshot.asset_id), ('1', 'AVAXTEST'))
+        self.assertEqual(snapshot.total, Decimal('12.5'))
+        self.assertEqual(snapshot.pending, Decimal('2.5'))
+
+    def test_balance_invalidated_by_transaction(self):
+        self.request.side_effect = [_response(200, self.VAULT_ASSET), _response(200, {'id': '1'}),
+                                    _response(200, dict(self.VAULT_ASSET, available='8'))]
+        self.client.available_balance_wei('1', 'AVAXTEST')
+        self.client.external_contract_call(vault_account_id='1', asset_id='AVAXTEST', external_contract_id='2',
+                                           amount='2', data='0x', note='')
+        # The balance is fetched again after funds leave the vault
+        self.assertEqual(self.client.available_balance_wei('1', 'AVAXTEST'), 8 * 10 ** 18)
+        self.assertEqual(VaultBalanceSnapshot.objects.count(), 2)
+
+    def test_fresh_balance_skips_cache(self):
+        self.request.side_effect = [_response(200, self.VAULT_ASSET),
+                                    _response(200, dict(self.VAULT_ASSET, available='8'))]
+        self.client.available_balance_wei('1', 'AVAXTEST')
+        self.assertEqual(self.client.available_balance_wei('1', 'AVAXTEST', fresh=True), 8 * 10 ** 18)
+        # The fresh balance replaces the cached one
+        self.assertEqual(self.client.available_balance_wei('1', 'AVAXTEST'), 8 * 10 ** 18)
+        self.assertEqual(self.request.call_count, 2)
+
+
+class RateLimiterTestCase(TestCase):
+
+    @mock.patch('fireblocks.client.time.sleep')
+    @mock.patch('fireblocks.client.time.monotonic')
+    def test_acquire(self, mock_monotonic, mock_sleep):
+        clock = [100.0]
+        mock_monotonic.side_effect = lambda: clock[0]
+        mock_sleep.side_effect = lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+
+        limiter = RateLimiter(rate=2, burst=2)
+        for _ in range(4):
+            limiter.acquire()
+        # The burst is free, then each request waits for the bucket to refill
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertAlmostEqual(clock[0], 101.0)
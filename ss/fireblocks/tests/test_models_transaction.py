@@ -1,3 +1,6 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.db import IntegrityError
 from django.test import TestCase
 
@@ -5,6 +8,7 @@ from fireblocks.factories import (FireblocksWalletFactory, VaultAccountFactory,
                                   VaultWalletAddressFactory)
 
 from ..factories.transaction import DepositTransactionFactory
+from ..models import Transaction
 
 
 class TransactionTestCase(TestCase):
@@ -15,6 +19,33 @@ class TransactionTestCase(TestCase):
         with self.assertRaises(IntegrityError):
             DepositTransactionFactory(asset_id='ETH_TEST', tx_id='016c6dbf-4c96-4381-90c9-19a940bce4a0')
 
+    def test_data_fields_synced(self):
+        tx = DepositTransactionFactory(asset_id='BTC_TEST', status='CONFIRMING')
+        self.assertEqual(Transaction.objects.get(status='CONFIRMING', tx_hash=tx.data['txHash']), tx)
+        tx.data = dict(tx.data, status='COMPLETED')
+        tx.save()
+        tx.refresh_from_db()
+        self.assertEqual(tx.status, 'COMPLETED')
+        self.assertEqual(tx.destination_type, 'VAULT_ACCOUNT')
+        self.assertEqual(tx.destination_address, tx.data['destinationAddress'])
+
+    def test_data_fields_synced_with_update_fields(self):
+        tx = DepositTransactionFactory(asset_id='BTC_TEST', status='CONFIRMING')
+        tx.data = dict(tx.data, status='COMPLETED', txHash='0xabc')
+        tx.save(update_fields=['data'])
+        tx = Transaction.objects.get(pk=tx.pk)
+        self.assertEqual(tx.status, 'COMPLETED')
+        self.assertEqual(tx.tx_hash, '0xabc')
+
+    def test_backfill_data_fields(self):
+        txs = [DepositTransactionFactory(asset_id='BTC_TEST') for _ in range(3)]
+        # Rows written before the fields existed have them all unset
+        Transaction.objects.update(status=None, tx_hash=None, destination_type=None, destination_id=None,
+                                   destination_address=None)
+        call_command('backfill_transaction_fields', batch_size=2, stdout=StringIO())
+        self.assertEqual(Transaction.objects.filter(status='COMPLETED', destination_type='VAULT_ACCOUNT').count(), 3)
+        self.assertEqual(Transaction.objects.get(tx_hash=txs[0].data['txHash'], tx_id=txs[0].tx_id), txs[0])
+
     def test_destination_vault_account(self):
         account = VaultAccountFactory(vault_id=435)
         destination = {'id': account.vault_id, 'name': 'Default', 'type': 'VAULT_ACCOUNT', 'subType': ''}
@@ -2,9 +2,9 @@ from django.test import TestCase
 
 from ..factories import (FireblocksWalletFactory, VaultAccountFactory, VaultAssetFactory, VaultDepositFactory,
                          VaultWalletAddressFactory)
-from ..factories.transaction import DepositTransactionFactory
-from ..models import VaultDeposit
-from ..utils.deposit import get_or_create_deposit
+from ..factories.transaction import DepositTransactionFactory, TransactionFactory
+from ..models import Transaction, VaultDeposit
+from ..utils.deposit import get_or_create_deposit, link_deposits
 
 
 # TODO we need positive and NEGATIVE tests for this call
@@ -42,3 +42,50 @@ class DepositTransactionUtilsTestCase(TestCase):
         self.assertEqual(VaultDeposit.objects.count(), 1)
         self.assertEqual(new_deposit.address, address)
         self.assertEqual(existing_deposit.id, new_deposit.id)
+
+
+class LinkDepositsTestCase(TestCase):
+
+    def setUp(self):
+        asset = VaultAssetFactory(asset_id='BTC')
+        self.vault_account = VaultAccountFactory()
+        wallet = FireblocksWalletFactory(vault_account=self.vault_account, asset=asset)
+        self.address = VaultWalletAddressFactory(wallet=wallet)
+
+    def _transaction(self, **kwargs):
+        return DepositTransactionFactory(asset_id='BTC', vault_account=self.vault_account,
+                                         destination_address=self.address.address, **kwargs)
+
+    def test_link_deposits(self):
+        existing_deposit = VaultDepositFactory(address=self.address)
+        confirming = self._transaction(status='CONFIRMING')
+        completed = self._transaction()
+        # Transactions to unknown addresses are left unmatched
+        unknown = TransactionFactory(asset_id='BTC')
+        transactions = list(Transaction.unmatched.all())
+
+        # Load the vault objects and deposits, then write the links in bulk
+        with self.assertNumQueries(8):
+            linked = link_deposits(transactions)
+        self.assertEqual([tx.tx_id for tx in linked], [confirming.tx_id, completed.tx_id])
+
+        confirming.refresh_from_db()
+        completed.refresh_from_db()
+        unknown.refresh_from_db()
+        # The earliest transaction is matched to the existing deposit, a deposit is created for the other
+        self.assertEqual(confirming.deposit, existing_deposit)
+        self.assertEqual(confirming.deposit.status, VaultDeposit.STATUS.RECEIVED)
+        self.assertEqual(completed.deposit.status, VaultDeposit.STATUS.CONFIRMED)
+        self.assertEqual(completed.deposit.created_date, completed.created_at)
+        self.assertIsNone(unknown.deposit)
+        self.assertEqual(VaultDeposit.objects.count(), 2)
+
+    def test_link_deposits_matches_get_or_create_deposit(self):
+        deposit = VaultDepositFactory(address=self.address)
+        tx = self._transaction()
+        # Deposits created after the transaction are not matched
+        VaultDepositFactory(address=self.address)
+
+        link_deposits([tx])
+        tx.refresh_from_db()
+        self.assertEqual(tx.deposit, deposit)
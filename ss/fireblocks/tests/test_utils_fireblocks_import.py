@@ -0,0 +1,180 @@
+import threading
+from datetime import datetime
+from unittest import mock
+
+import pytz
+
+from django.test import TestCase, override_settings
+
+from ..factories import (FireblocksWalletFactory, TransactionFactory, VaultAccountFactory, VaultAssetFactory,
+                         VaultDepositFactory, VaultWithdrawalFactory)
+from ..factories.transaction import DepositTransactionFactory, convert_to_timestamp
+from ..models import (ExternalWallet, ExternalWalletAsset, FireblocksWallet, ImportCursor, Transaction, VaultAccount,
+                      VaultAsset, VaultDeposit, VaultWalletAddress, VaultWithdrawal)
+from ..utils.fireblocks_import import (import_addresses, import_external_wallets, import_transactions,
+                                       import_vault_accounts, link_imported_transactions)
+
+
+def _transaction_data(day: int) -> dict:
+    created_at = datetime(2022, 5, day, tzinfo=pytz.utc)
+    return TransactionFactory.build(created_at=created_at, last_updated=convert_to_timestamp(created_at) + 1000).data
+
+
+@mock.patch('fireblocks.utils.fireblocks_import.get_fireblocks_client')
+class ImportTransactionsTestCase(TestCase):
+
+    def test_import_all_pages(self, mock_get_fb_client):
+        newest, middle, oldest = _transaction_data(3), _transaction_data(2), _transaction_data(1)
+        fb = mock_get_fb_client.return_value
+        fb.get_transactions_with_page_info.side_effect = [
+            {'transactions': [newest, middle], 'pageDetails': {'prevPage': '', 'nextPage': '/next'}},
+            {'transactions': [oldest], 'pageDetails': {'prevPage': '/prev', 'nextPage': ''}},
+        ]
+
+        import_transactions()
+        self.assertEqual(Transaction.objects.count(), 3)
+        fb.get_transactions_with_page_info.assert_called_with(next_or_previous_path='/next')
+        # The cursor is moved to the most recently created transaction imported
+        cursor = ImportCursor.get(ImportCursor.TRANSACTIONS)
+        self.assertEqual(cursor.timestamp, newest['createdAt'])
+
+    def test_import_after_cursor(self, mock_get_fb_client):
+        timestamp = convert_to_timestamp(datetime(2022, 5, 1, tzinfo=pytz.utc))
+        ImportCursor.objects.create(name=ImportCursor.TRANSACTIONS, timestamp=timestamp)
+        newest = _transaction_data(2)
+        fb = mock_get_fb_client.return_value
+        fb.get_transactions_with_page_info.return_value = {
+            'transactions': [newest], 'pageDetails': {'prevPage': '', 'nextPage': ''},
+        }
+
+        import_transactions()
+        # Only transactions created since the last import are fetched
+        fb.get_transactions_with_page_info.assert_called_once_with(after=timestamp - 1, limit=mock.ANY)
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(ImportCursor.get(ImportCursor.TRANSACTIONS).timestamp, newest['createdAt'])
+
+    def test_cursor_not_moved_on_failure(self, mock_get_fb_client):
+        fb = mock_get_fb_client.return_value
+        fb.get_transactions_with_page_info.side_effect = [
+            {'transactions': [_transaction_data(3)], 'pageDetails': {'prevPage': '', 'nextPage': '/next'}},
+            Exception('Fireblocks unavailable'),
+        ]
+
+        with self.assertRaises(Exception):
+            import_transactions()
+        # Older pages were not imported, so the next run must fetch them again
+        self.assertEqual(ImportCursor.get(ImportCursor.TRANSACTIONS).timestamp, 0)
+
+    def test_import_existing_transactions(self, mock_get_fb_client):
+        existing = TransactionFactory()
+        fb = mock_get_fb_client.return_value
+        fb.get_transactions_with_page_info.return_value = {
+            'transactions': [existing.data, _transaction_data(2)], 'pageDetails': {'prevPage': '', 'nextPage': ''},
+        }
+
+        import_transactions()
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_refresh_changed_transactions(self, mock_get_fb_client):
+        cursor = ImportCursor.objects.create(name=ImportCursor.TRANSACTIONS,
+                                             timestamp=convert_to_timestamp(datetime(2022, 5, 10, tzinfo=pytz.utc)))
+        deposit = VaultDepositFactory(status=VaultDeposit.STATUS.RECEIVED)
+        created_at = datetime(2022, 5, 1, tzinfo=pytz.utc)
+        pending = DepositTransactionFactory(deposit=deposit, created_at=created_at, status='CONFIRMING')
+        TransactionFactory(created_at=created_at)
+        completed = dict(pending.data, status='COMPLETED', lastUpdated=pending.data['lastUpdated'] + 1000)
+        fb = mock_get_fb_client.return_value
+        fb.get_transactions_with_page_info.return_value = {
+            'transactions': [], 'pageDetails': {'prevPage': '', 'nextPage': ''},
+        }
+        fb.get_transaction_by_id.return_value = completed
+
+        import_transactions()
+        # Only the pending transaction is fetched again, without reaching back before the cursor
+        fb.get_transactions_with_page_info.assert_called_once_with(after=cursor.timestamp - 1, limit=mock.ANY)
+        fb.get_transaction_by_id.assert_called_once_with(txid=pending.tx_id)
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, 'COMPLETED')
+        # The linked deposit follows the refreshed transaction
+        deposit.refresh_from_db()
+        self.assertEqual(deposit.status, VaultDeposit.STATUS.CONFIRMED)
+
+
+class LinkTransactionsTestCase(TestCase):
+
+    def test_link_withdrawal_by_transaction_id(self):
+        tx = TransactionFactory()
+        withdrawal = VaultWithdrawalFactory(status=VaultWithdrawal.STATUS.SENT, transaction_id=tx.tx_id)
+        unknown = TransactionFactory()
+
+        link_imported_transactions()
+        tx.refresh_from_db()
+        unknown.refresh_from_db()
+        self.assertEqual(tx.withdrawal, withdrawal)
+        self.assertIsNone(unknown.withdrawal)
+        self.assertEqual(list(Transaction.unmatched.all()), [unknown])
+
+
+@mock.patch('fireblocks.utils.fireblocks_import.get_fireblocks_client')
+class ImportWalletsTestCase(TestCase):
+
+    def test_import_vault_accounts(self, mock_get_fb_client):
+        account = VaultAccountFactory(vault_id='0')
+        FireblocksWalletFactory(vault_account=account, asset=VaultAssetFactory(asset_id='BTC_TEST'))
+        mock_get_fb_client.return_value.get_vault_accounts.return_value = [
+            {'id': '0', 'name': 'Default', 'assets': [{'id': 'BTC_TEST'}, {'id': 'ETH_TEST'}]},
+            {'id': '1', 'name': 'Staking', 'customerRefId': 'ref', 'assets': [{'id': 'ETH_TEST'}]},
+        ]
+
+        # Prefetch the three sets of existing keys, then insert each model in bulk
+        with self.assertNumQueries(8):
+            import_vault_accounts()
+        self.assertEqual(VaultAccount.objects.count(), 2)
+        self.assertEqual(VaultAsset.objects.count(), 2)
+        self.assertEqual(FireblocksWallet.objects.count(), 3)
+        self.assertEqual(VaultAccount.objects.get(vault_id='1').customer_ref_id, 'ref')
+
+    def test_import_addresses(self, mock_get_fb_client):
+        wallet = FireblocksWalletFactory()
+        address_data = {'address': 'mjwrisAsZ5vZAeYGB4NXTAzCVJKGAS4XxL', 'description': '', 'tag': '',
+                        'type': 'Default'}
+        mock_get_fb_client.return_value.get_deposit_addresses.return_value = [address_data]
+
+        import_addresses()
+        import_addresses()
+        self.assertEqual(VaultWalletAddress.objects.count(), 1)
+        self.assertEqual(VaultWalletAddress.objects.get().wallet, wallet)
+
+    @override_settings(FIREBLOCKS_IMPORT_WORKERS=2)
+    def test_import_addresses_concurrently(self, mock_get_fb_client):
+        wallets = [FireblocksWalletFactory(), FireblocksWalletFactory()]
+        # Both requests must be in flight at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get_deposit_addresses(vault_account_id, asset_id):
+            barrier.wait()
+            return [{'address': f'{vault_account_id}-{asset_id}', 'description': '', 'tag': '', 'type': 'Default'}]
+
+        mock_get_fb_client.return_value.get_deposit_addresses.side_effect = get_deposit_addresses
+        import_addresses()
+        for wallet in wallets:
+            self.assertTrue(VaultWalletAddress.objects.filter(wallet=wallet).exists())
+
+    def test_import_external_wallets(self, mock_get_fb_client):
+        VaultAssetFactory(asset_id='AVAXTEST')
+        mock_get_fb_client.return_value.get_external_wallets.return_value = [{
+            'id': 'dfbf22c0-d586-ed60-d7fd-8e99c54e728c',
+            'name': 'trader 3187996092687990783 wallet',
+            'assets': [
+                {'id': 'AVAXTEST', 'address': '0xc6256f4388d177f446A3AbEd9aB59021Dcc01565', 'status': 'APPROVED',
+                 'tag': ''},
+                # Assets missing from the vault are skipped
+                {'id': 'UNKNOWN', 'address': '0xc6256f4388d177f446A3AbEd9aB59021Dcc01565', 'status': 'APPROVED',
+                 'tag': ''},
+            ],
+        }]
+
+        import_external_wallets()
+        import_external_wallets()
+        self.assertEqual(ExternalWallet.objects.count(), 1)
+        self.assertEqual(ExternalWalletAsset.objects.count(), 1)
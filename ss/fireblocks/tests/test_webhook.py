@@ -0,0 +1,152 @@
+import base64
+import json
+import uuid
+from unittest import mock
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from avalanche.factories import AtomicTxFactory
+from avalanche.models import AtomicTx
+from staking.factories import FillJobFactory
+from staking.models import FillJob
+
+from ..factories import VaultDepositFactory
+from ..factories.transaction import DepositTransactionFactory
+from ..models import Transaction, VaultDeposit
+from ..utils.webhook import process_webhook
+
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+PUBLIC_KEY = PRIVATE_KEY.public_key().public_bytes(
+    serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+
+# Recorded TRANSACTION_STATUS_UPDATED notification for a contract call
+STATUS_UPDATED_PAYLOAD = {
+    'type': 'TRANSACTION_STATUS_UPDATED',
+    'tenantId': '3c9d3bd7-5d4e-5bc6-8d2d-1b9b0a4e3e0a',
+    'timestamp': 1653658543311,
+    'data': {
+        'id': 'e9a0f6c7-4c4c-4f8d-9a2b-5e3c4b1d2a10',
+        'createdAt': 1653658486522,
+        'lastUpdated': 1653658541884,
+        'assetId': 'AVAXTEST',
+        'source': {'id': '1', 'type': 'VAULT_ACCOUNT', 'name': 'Staking', 'subType': ''},
+        'destination': {'id': '290abb68-80bd-59d6-ef42-89f30eeba2e0', 'type': 'EXTERNAL_WALLET',
+                        'name': 'Staking contract', 'subType': 'External'},
+        'amount': 1.5,
+        'networkFee': 0.00052,
+        'netAmount': 1.5,
+        'sourceAddress': '',
+        'destinationAddress': '0x2c2b2c1E4ad2d8D7C95d1Fa6bC38bBfC2E1b5d8B',
+        'destinationAddressDescription': '',
+        'destinationTag': '',
+        'status': 'COMPLETED',
+        'txHash': '0x8d6d2bcb8a3f3c4e7f2a59c1a0a4f0a06a1a0a7d1e5a2c9b7f4c1d2e3f4a5b6c',
+        'subStatus': 'CONFIRMED',
+        'signedBy': [],
+        'createdBy': '',
+        'rejectedBy': '',
+        'amountUSD': 0,
+        'addressType': '',
+        'note': 'Fill contract deficit',
+        'exchangeTxId': '',
+        'requestedAmount': 1.5,
+        'feeCurrency': 'AVAXTEST',
+        'operation': 'CONTRACT_CALL',
+        'numOfConfirmations': 1,
+        'signedMessages': [],
+    },
+}
+
+
+def _post(client, payload: dict, signature: str = None):
+    body = json.dumps(payload).encode()
+    if signature is None:
+        signature = base64.b64encode(PRIVATE_KEY.sign(body, padding.PKCS1v15(), hashes.SHA512())).decode()
+    return client.post(reverse('fireblocks:webhook'), data=body, content_type='application/json',
+                       HTTP_FIREBLOCKS_SIGNATURE=signature)
+
+
+def _status_updated(tx_data: dict) -> dict:
+    return dict(STATUS_UPDATED_PAYLOAD, data=tx_data)
+
+
+@override_settings(FIREBLOCKS_WEBHOOK_PUBLIC_KEY=PUBLIC_KEY)
+class WebhookTestCase(TestCase):
+
+    def test_invalid_signature(self):
+        response = _post(self.client, STATUS_UPDATED_PAYLOAD, signature=base64.b64encode(b'forged').decode())
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    @override_settings(FIREBLOCKS_WEBHOOK_PUBLIC_KEY=None)
+    def test_public_key_not_set(self):
+        response = _post(self.client, STATUS_UPDATED_PAYLOAD)
+        self.assertEqual(response.status_code, 403)
+
+    def test_only_post(self):
+        response = self.client.get(reverse('fireblocks:webhook'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_ignore_other_events(self):
+        response = _post(self.client, {'type': 'VAULT_ACCOUNT_ADDED', 'data': {'id': '2', 'name': 'New'}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    def test_transaction_created(self):
+        response = _post(self.client, STATUS_UPDATED_PAYLOAD)
+        self.assertEqual(response.status_code, 200)
+        tx = Transaction.objects.get()
+        self.assertEqual(tx.tx_id, STATUS_UPDATED_PAYLOAD['data']['id'])
+        self.assertEqual(tx.status, 'COMPLETED')
+
+    def test_out_of_order_update_ignored(self):
+        _post(self.client, STATUS_UPDATED_PAYLOAD)
+        stale = dict(STATUS_UPDATED_PAYLOAD['data'], status='CONFIRMING', lastUpdated=1653658500000)
+        _post(self.client, _status_updated(stale))
+        self.assertEqual(Transaction.objects.get().status, 'COMPLETED')
+
+    def test_deposit_confirmed(self):
+        deposit = VaultDepositFactory(status=VaultDeposit.STATUS.RECEIVED)
+        tx = DepositTransactionFactory(deposit=deposit, status='CONFIRMING')
+        completed = dict(tx.data, status='COMPLETED', lastUpdated=tx.data['lastUpdated'] + 1000)
+
+        response = _post(self.client, _status_updated(completed))
+        self.assertEqual(response.status_code, 200)
+        deposit.refresh_from_db()
+        self.assertEqual(deposit.status, VaultDeposit.STATUS.CONFIRMED)
+        # Repeated notifications are harmless
+        response = _post(self.client, _status_updated(completed))
+        self.assertEqual(response.status_code, 200)
+
+    def test_fill_job_completed(self):
+        job = FillJobFactory(status=FillJob.STATUS.PENDING,
+                             fireblocks_transaction_id=uuid.UUID(STATUS_UPDATED_PAYLOAD['data']['id']))
+        _post(self.client, STATUS_UPDATED_PAYLOAD)
+        job.refresh_from_db()
+        self.assertEqual(job.status, FillJob.STATUS.COMPLETED)
+
+    @mock.patch('fireblocks.utils.webhook.check_for_signature')
+    def test_atomic_tx_signature(self, mock_check_for_signature):
+        atomic_tx = AtomicTxFactory(status=AtomicTx.STATUS.AWAITING_SIGNATURE,
+                                    fireblocks_tx_id=STATUS_UPDATED_PAYLOAD['data']['id'])
+        _post(self.client, STATUS_UPDATED_PAYLOAD)
+        # Signed messages are taken from the notification instead of polling Fireblocks
+        mock_check_for_signature.assert_called_once_with(atomic_tx, transaction_data=STATUS_UPDATED_PAYLOAD['data'])
+
+    @mock.patch('fireblocks.utils.webhook.check_for_signature', side_effect=AssertionError)
+    def test_failure_rolls_back_transaction(self, mock_check_for_signature):
+        atomic_tx = AtomicTxFactory(status=AtomicTx.STATUS.AWAITING_SIGNATURE,
+                                    fireblocks_tx_id=STATUS_UPDATED_PAYLOAD['data']['id'])
+        with self.assertRaises(AssertionError):
+            process_webhook(STATUS_UPDATED_PAYLOAD)
+        self.assertEqual(Transaction.objects.count(), 0)
+
+        # The retried notification is processed as new rather than ignored as stale
+        mock_check_for_signature.side_effect = None
+        process_webhook(STATUS_UPDATED_PAYLOAD)
+        self.assertEqual(Transaction.objects.count(), 1)
+        mock_check_for_signature.assert_called_with(atomic_tx, transaction_data=STATUS_UPDATED_PAYLOAD['data'])
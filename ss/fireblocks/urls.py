@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'fireblocks'
+
+urlpatterns = [
+    path('webhook/', views.webhook, name='webhook'),
+]
@@ -1,8 +1,10 @@
 import logging
+from collections import defaultdict
 
 from django_fsm import TransitionNotAllowed
 
 from django.conf import settings
+from django.utils import timezone
 
 from ..client import get_fireblocks_client
 from ..models import (FireblocksWallet, LabelledAddress, Transaction, VaultAccount, VaultAsset, VaultDeposit,
@@ -68,6 +70,14 @@ def update_deposit_status(transaction: Transaction):
         return
 
     deposit = transaction.deposit
+    if _transition_deposit(deposit, transaction):
+        deposit.save()
+
+
+def _transition_deposit(deposit: VaultDeposit, transaction: Transaction) -> bool:
+    """
+    Move the deposit to the status matching its transaction, without saving it.
+    """
     try:
         if transaction.status == 'CONFIRMING':
             deposit.receive()
@@ -76,8 +86,8 @@ def update_deposit_status(transaction: Transaction):
     except TransitionNotAllowed as e:
         # If we attempt to perform an illegal transition, ignore it but log a warning
         logger.warning(e)
-    else:
-        deposit.save()
+        return False
+    return True
 
 
 # TODO add the from address
@@ -137,3 +147,64 @@ def get_or_create_deposit(transaction: Transaction):
             # Find data for BTC deposit
             return _get_or_create_deposit(address, transaction)
     return None
+
+
+def link_deposits(transactions: list[Transaction]) -> list[Transaction]:
+    """
+    Batch version of get_or_create_deposit followed by update_deposit_status for many
+    unmatched transactions, ordered earliest first. The vault objects referenced by the
+    transactions are loaded up front and matched in memory, and all links are written
+    in bulk. Returns the transactions that were linked to a deposit.
+    """
+    vault_accounts = set(VaultAccount.objects.values_list('vault_id', flat=True))
+    vault_assets = set(VaultAsset.objects.values_list('asset_id', flat=True))
+    wallets = {(account_id, asset_id): wallet_id for wallet_id, account_id, asset_id
+               in FireblocksWallet.objects.values_list('id', 'vault_account_id', 'asset_id')}
+
+    # Natural key of the VaultWalletAddress each transaction was sent to
+    address_keys = {}
+    for tx in transactions:
+        account_id = tx.destination_vault_account
+        if account_id in vault_accounts and tx.asset_id in vault_assets and tx.destination_address:
+            wallet_id = wallets.get((account_id, tx.asset_id))
+            if wallet_id is not None:
+                address_keys[tx.tx_id] = (wallet_id, tx.destination_address)
+
+    addresses = {(address.wallet_id, address.address): address for address in VaultWalletAddress.objects.filter(
+        wallet_id__in={wallet_id for wallet_id, _ in address_keys.values()},
+        address__in={address for _, address in address_keys.values()})}
+
+    # Unlinked NEW deposits that transactions can be matched to, by address
+    pending = defaultdict(list)
+    for deposit in VaultDeposit.objects.filter(address__in=addresses.values(), status=VaultDeposit.STATUS.NEW,
+                                               transaction__isnull=True):
+        pending[deposit.address_id].append(deposit)
+
+    now = timezone.now()
+    new_deposits, matched_deposits, linked = [], [], []
+    for tx in transactions:
+        address = addresses.get(address_keys.get(tx.tx_id))
+        if address is None:
+            continue
+
+        # Deposit must have been created before the Transaction was created
+        candidates = [deposit for deposit in pending[address.id] if deposit.created_date <= tx.created_at]
+        if candidates:
+            deposit = max(candidates, key=lambda deposit_: (deposit_.modified_date, deposit_.created_date))
+            pending[address.id].remove(deposit)
+            deposit.modified_date = now
+            matched_deposits.append(deposit)
+        else:
+            # When creating missing deposits we set the created date manually.
+            deposit = VaultDeposit(created_date=tx.created_at, address=address)
+            new_deposits.append(deposit)
+
+        _transition_deposit(deposit, tx)
+        tx.deposit = deposit
+        tx.modified_date = now
+        linked.append(tx)
+
+    VaultDeposit.objects.bulk_create(new_deposits)
+    VaultDeposit.objects.bulk_update(matched_deposits, ['status', 'modified_date'])
+    Transaction.objects.bulk_update(linked, ['deposit', 'modified_date'])
+    return linked
@@ -1,19 +1,37 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import pytz
+from django_fsm import TransitionNotAllowed
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 
 from fireblocks.client import get_fireblocks_client
-from fireblocks.models import (ExternalWalletAsset, FireblocksWallet, Transaction, VaultAccount, VaultAsset,
-                               VaultWalletAddress)
-from fireblocks.utils.deposit import get_or_create_deposit, update_deposit_status
-from fireblocks.utils.wallet_import import import_external_wallet
-from fireblocks.utils.withdrawal import get_or_create_withdrawal
+from fireblocks.models import (ExternalWallet, ExternalWalletAsset, FireblocksWallet, ImportCursor, Transaction,
+                               VaultAccount, VaultAsset, VaultWalletAddress, VaultWithdrawal)
+from fireblocks.utils.deposit import link_deposits, update_deposit_status
+from fireblocks.utils.withdrawal import get_or_create_withdrawal, update_withdrawal_status
 
 logger = logging.getLogger(__name__)
 
+TRANSACTION_PAGE_SIZE = 500
+BULK_BATCH_SIZE = 500
+LINK_BATCH_SIZE = 1000
+
+
+def _bulk_create(model, objects: list) -> int:
+    """
+    Insert new objects in batches, skipping any created concurrently since the existing keys were fetched.
+    :return: number of new objects found, which may be more than the number of rows actually inserted
+    """
+    model.objects.bulk_create(objects, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+    return len(objects)
+
 
-def _import_vault_accounts():
+def import_vault_accounts():
     vault_count = 0
     asset_count = 0
     wallet_count = 0
@@ -21,99 +39,199 @@ def _import_vault_accounts():
     fb = get_fireblocks_client()
     accounts = fb.get_vault_accounts()
     try:
+        existing_accounts = set(VaultAccount.objects.values_list('vault_id', flat=True))
+        existing_assets = set(VaultAsset.objects.values_list('asset_id', flat=True))
+        existing_wallets = set(FireblocksWallet.objects.values_list('vault_account_id', 'asset_id'))
+
+        new_accounts, new_assets, new_wallets = {}, {}, {}
         for account_data in accounts:
-            customer_ref_id = account_data.get('customerRefId', '')
-            account, created = VaultAccount.objects.get_or_create(
-                vault_id=account_data['id'], defaults={
-                    'name': account_data['name'],
-                    'customer_ref_id': customer_ref_id,
-                })
-            if created:
-                vault_count += 1
+            vault_id = account_data['id']
+            if vault_id not in existing_accounts:
+                new_accounts[vault_id] = VaultAccount(vault_id=vault_id, name=account_data['name'],
+                                                      customer_ref_id=account_data.get('customerRefId', ''))
 
             for asset_data in account_data['assets']:
                 # Create wallets for each asset in the vault
-                asset, created = VaultAsset.objects.get_or_create(asset_id=asset_data['id'])
-                if created:
-                    asset_count += 1
+                asset_id = asset_data['id']
+                if asset_id not in existing_assets:
+                    new_assets[asset_id] = VaultAsset(asset_id=asset_id)
+                if (vault_id, asset_id) not in existing_wallets:
+                    new_wallets[(vault_id, asset_id)] = FireblocksWallet(vault_account_id=vault_id, asset_id=asset_id)
 
-                wallet, created = FireblocksWallet.objects.get_or_create(vault_account=account, asset=asset)
-                if created:
-                    wallet_count += 1
+        with transaction.atomic():
+            vault_count = _bulk_create(VaultAccount, list(new_accounts.values()))
+            asset_count = _bulk_create(VaultAsset, list(new_assets.values()))
+            wallet_count = _bulk_create(FireblocksWallet, list(new_wallets.values()))
     finally:
-        logger.info(f'Imported {vault_count} new VaultAccount objects')
-        logger.info(f'Imported {asset_count} new VaultAsset objects')
-        logger.info(f'Imported {wallet_count} new FireblocksWallet objects')
+        logger.info(f'Found {vault_count} new VaultAccount objects to import')
+        logger.info(f'Found {asset_count} new VaultAsset objects to import')
+        logger.info(f'Found {wallet_count} new FireblocksWallet objects to import')
 
 
-def _import_addresses():
+def import_addresses():
     address_count = 0
     fb = get_fireblocks_client()
 
     try:
-        for wallet in FireblocksWallet.objects.all():
-            addresses = fb.get_deposit_addresses(vault_account_id=wallet.vault_account.vault_id,
-                                                 asset_id=wallet.asset.asset_id)
-            for address_data in addresses:
-                defaults = {
-                    'description': address_data['description'],
-                    'tag': address_data['tag'],
-                    'type': address_data['type'],
-                }
-                address, created = VaultWalletAddress.objects.get_or_create(
-                    wallet=wallet, address=address_data['address'], defaults=defaults)
-                if created:
-                    address_count += 1
+        existing_addresses = set(VaultWalletAddress.objects.values_list('wallet_id', 'address'))
+        wallets = list(FireblocksWallet.objects.all())
+
+        def fetch_addresses(wallet: FireblocksWallet):
+            return fb.get_deposit_addresses(vault_account_id=wallet.vault_account_id, asset_id=wallet.asset_id)
+
+        # The shared client rate limits the requests made by every worker
+        new_addresses = {}
+        with ThreadPoolExecutor(max_workers=settings.FIREBLOCKS_IMPORT_WORKERS) as executor:
+            for wallet, addresses in zip(wallets, executor.map(fetch_addresses, wallets)):
+                for address_data in addresses:
+                    key = (wallet.id, address_data['address'])
+                    if key not in existing_addresses:
+                        new_addresses[key] = VaultWalletAddress(
+                            wallet=wallet, address=address_data['address'], description=address_data['description'],
+                            tag=address_data['tag'], type=address_data['type'])
+
+        with transaction.atomic():
+            address_count = _bulk_create(VaultWalletAddress, list(new_addresses.values()))
     finally:
-        logger.info(f'Imported {address_count} new VaultWalletAddress objects')
+        logger.info(f'Found {address_count} new VaultWalletAddress objects to import')
+
+
+def _iter_transactions(fb, after: int):
+    """
+    Fetch every transaction created after the given timestamp, following the result pages.
+    """
+    response = fb.get_transactions_with_page_info(after=after, limit=TRANSACTION_PAGE_SIZE)
+    while True:
+        yield from response['transactions']
+        next_page = response.get('pageDetails', {}).get('nextPage')
+        if not next_page:
+            break
+        response = fb.get_transactions_with_page_info(next_or_previous_path=next_page)
+
+
+def _fetch_pending(fb, exclude: set) -> dict:
+    """
+    Fetch the transactions imported earlier that are not yet in a final status, one by one,
+    so their status is refreshed without paging through all history since the oldest one.
+    """
+    tx_ids = [tx_id for tx_id in (Transaction.objects.exclude(status=None)
+                                  .exclude(status__in=Transaction.FINAL_STATUSES)
+                                  .values_list('tx_id', flat=True))
+              if tx_id not in exclude]
+
+    def fetch(tx_id: str) -> dict:
+        return fb.get_transaction_by_id(txid=tx_id)
+
+    # The shared client rate limits the requests made by every worker
+    with ThreadPoolExecutor(max_workers=settings.FIREBLOCKS_IMPORT_WORKERS) as executor:
+        return {tx_data['id']: tx_data for tx_data in executor.map(fetch, tx_ids)}
+
+
+def _build_transaction(tx_data: dict) -> Transaction:
+    created_at = datetime.fromtimestamp(tx_data['createdAt'] / 1000, tz=pytz.utc)
+    tx = Transaction(tx_id=tx_data['id'], asset_id=tx_data['assetId'], created_at=created_at, data=tx_data)
+    tx.sync_data_fields()
+    return tx
 
 
-def _import_transactions():
+def _fetch_after(cursor: ImportCursor) -> int:
+    """
+    Timestamp to fetch new transactions from. Fireblocks filters on when transactions were
+    created, so changes to older transactions are picked up by _fetch_pending instead.
+    """
+    # Overlap by a millisecond so transactions created at the same time as the last one imported are not missed
+    return max(cursor.timestamp - 1, 0)
+
+
+def _update_linked_status(tx_ids: list):
+    for tx in Transaction.objects.filter(tx_id__in=tx_ids).exclude(deposit=None, withdrawal=None):
+        try:
+            if tx.deposit_id is not None:
+                update_deposit_status(tx)
+            else:
+                update_withdrawal_status(tx)
+        except TransitionNotAllowed as e:
+            logger.warning(e)
+
+
+def import_transactions():
     tx_count = 0
+    updated_ids = []
     fb = get_fireblocks_client()
+    cursor = ImportCursor.get(ImportCursor.TRANSACTIONS)
 
     try:
-        transactions = fb.get_transactions(limit=1000)
-
-        # Import transactions earliest first
-        for tx_data in sorted(transactions, key=lambda tx_: tx_['createdAt']):
-            timestamp = tx_data['createdAt']
-            created_at = datetime.fromtimestamp(timestamp / 1000, tz=pytz.utc)
-
-            defaults = {
-                'asset_id': tx_data['assetId'],
-                'created_at': created_at,
-                'data': tx_data,
-            }
-            tx, created = Transaction.objects.get_or_create(tx_id=tx_data['id'], defaults=defaults)
-            if created:
-                tx_count += 1
+        new = {tx_data['id']: tx_data for tx_data in _iter_transactions(fb, after=_fetch_after(cursor))}
+        transactions = {**_fetch_pending(fb, exclude=set(new)), **new}
+        tx_ids = list(transactions)
+
+        with transaction.atomic():
+            for i in range(0, len(tx_ids), BULK_BATCH_SIZE):
+                batch = tx_ids[i:i + BULK_BATCH_SIZE]
+                existing = dict(Transaction.objects.filter(tx_id__in=batch).values_list('tx_id', 'data__lastUpdated'))
+                new_transactions = [_build_transaction(transactions[tx_id])
+                                    for tx_id in batch if tx_id not in existing]
+                tx_count += _bulk_create(Transaction, new_transactions)
+
+                # Only rewrite the transactions Fireblocks has updated since they were imported
+                now = timezone.now()
+                changed = [Transaction(tx_id=tx_id, data=transactions[tx_id], modified_date=now)
+                           for tx_id, last_updated in existing.items()
+                           if transactions[tx_id].get('lastUpdated') != last_updated]
+                for tx in changed:
+                    tx.sync_data_fields()
+                Transaction.objects.bulk_update(changed, ['data', *Transaction.DATA_FIELDS, 'modified_date'])
+                updated_ids += [tx.tx_id for tx in changed]
+
+            # Pages are newest first, so only move the cursor once every page has been imported
+            cursor.timestamp = max([cursor.timestamp] + [tx_data['createdAt'] for tx_data in new.values()])
+            cursor.save()
+
+        _update_linked_status(updated_ids)
     finally:
-        logger.info(f'Imported {tx_count} new Transaction objects')
+        logger.info(f'Found {tx_count} new Transaction objects to import')
+        logger.info(f'Updated {len(updated_ids)} changed Transaction objects')
 
 
-def _link_transactions():
+def link_imported_transactions():
     linked_deposit_count = 0
     linked_withdrawal_count = 0
 
     try:
         # Link Transactions starting with the earliest first
-        for tx in Transaction.unmatched.order_by('created_at'):
-            deposit = get_or_create_deposit(transaction=tx)
-            if deposit:
-                update_deposit_status(tx)
-                linked_deposit_count += 1
-            else:
-                withdrawal = get_or_create_withdrawal(transaction=tx)
-                if withdrawal:
-                    linked_withdrawal_count += 1
+        tx_ids = list(Transaction.unmatched.values_list('tx_id', flat=True))
+        external_wallets = set(ExternalWallet.objects.values_list('id', flat=True))
+
+        for i in range(0, len(tx_ids), LINK_BATCH_SIZE):
+            with transaction.atomic():
+                transactions = list(Transaction.objects.filter(tx_id__in=tx_ids[i:i + LINK_BATCH_SIZE])
+                                    .order_by('created_at'))
+                linked = link_deposits(transactions)
+                linked_deposit_count += len(linked)
+
+                remaining = [tx for tx in transactions if tx.deposit is None]
+                withdrawals = VaultWithdrawal.objects.in_bulk([tx.tx_id for tx in remaining],
+                                                              field_name='transaction_id')
+                linked = []
+                now = timezone.now()
+                for tx in remaining:
+                    if tx.tx_id in withdrawals:
+                        tx.withdrawal = withdrawals[tx.tx_id]
+                        tx.modified_date = now
+                        linked.append(tx)
+                    elif tx.destination_external_wallet in external_wallets:
+                        # Fall back to matching on the wallet and amount, which needs the per-row lookups
+                        if get_or_create_withdrawal(transaction=tx):
+                            linked_withdrawal_count += 1
+                Transaction.objects.bulk_update(linked, ['withdrawal', 'modified_date'])
+                linked_withdrawal_count += len(linked)
 
     finally:
         logger.info(f'Linked {linked_deposit_count} Transaction objects to VaultDeposits')
         logger.info(f'Linked {linked_withdrawal_count} Transaction objects to VaultWithdrawals')
 
 
-def _import_external_wallets():
+def import_external_wallets():
     wallets_created = 0
     assets_created = 0
 
@@ -121,10 +239,16 @@ def _import_external_wallets():
     external_wallets = fb.get_external_wallets()
 
     try:
+        existing_wallets = set(ExternalWallet.objects.values_list('id', flat=True))
+        existing_wallet_assets = set(ExternalWalletAsset.objects.values_list('wallet_id', 'asset_id', 'address'))
+        vault_assets = set(VaultAsset.objects.values_list('asset_id', flat=True))
+
+        new_wallets, new_wallet_assets = {}, {}
         for wallet_data in external_wallets:
-            wallet, created = import_external_wallet(wallet_data=wallet_data)
-            if created:
-                wallets_created += 1
+            wallet_id = wallet_data['id']
+            if wallet_id not in existing_wallets:
+                new_wallets[wallet_id] = ExternalWallet(id=wallet_id, name=wallet_data['name'],
+                                                        customer_ref_id=wallet_data.get('customerRefId', ''))
 
             wallet_assets = wallet_data['assets']
 
@@ -134,26 +258,24 @@ def _import_external_wallets():
                 status = wallet_asset['status']
                 tag = wallet_asset['tag']
 
-                try:
-                    asset = VaultAsset.objects.get(asset_id=asset_id)
-                except VaultAsset.DoesNotExist as e:
+                if asset_id not in vault_assets:
                     logger.error(f'Unable to find VaultAsset: {asset_id}')
-                    logger.error(str(e))
-                else:
-                    ewa, created = ExternalWalletAsset.objects.get_or_create(
-                        wallet=wallet, asset=asset, address=address, defaults={'status': status, 'tag': tag})
-                    if created:
-                        assets_created += 1
+                elif (wallet_id, asset_id, address) not in existing_wallet_assets:
+                    new_wallet_assets[(wallet_id, asset_id, address)] = ExternalWalletAsset(
+                        wallet_id=wallet_id, asset_id=asset_id, address=address, status=status, tag=tag)
 
+        with transaction.atomic():
+            wallets_created = _bulk_create(ExternalWallet, list(new_wallets.values()))
+            assets_created = _bulk_create(ExternalWalletAsset, list(new_wallet_assets.values()))
     finally:
-        logger.info(f'Created {wallets_created} new ExternalWallet objects')
-        logger.info(f'Created {assets_created} new ExternalWalletAsset objects')
+        logger.info(f'Found {wallets_created} new ExternalWallet objects to create')
+        logger.info(f'Found {assets_created} new ExternalWalletAsset objects to create')
 
 
 def import_fireblocks(link_transactions=True):
     logger.info('Importing Transactions')
-    _import_transactions()
+    import_transactions()
 
     if link_transactions:
         logger.info('Linking imported Transactions')
-        _link_transactions()
+        link_imported_transactions()
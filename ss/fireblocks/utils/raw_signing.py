@@ -2,6 +2,14 @@ from eth_keys.datatypes import NonRecoverableSignature, PublicKey, Signature
 from hexbytes import HexBytes
 
 
+def signed_messages_for_hash(signed_messages: list[dict], message_hash: str) -> list[dict]:
+    """
+    Select the signed messages of a raw transaction that signed several message hashes.
+    """
+    return [signed_message for signed_message in signed_messages
+            if signed_message.get('content', '').lower() == message_hash.lower()]
+
+
 def recoverable_signature(signed_messages: list[dict]):
     assert len(signed_messages) == 1
     signed_message = signed_messages[0]
@@ -1,4 +1,7 @@
 import logging
+from datetime import datetime
+
+import pytz
 
 from ..models import Transaction
 from .deposit import get_or_create_deposit, update_deposit_status
@@ -40,3 +43,21 @@ def update_status(transaction: Transaction):
         update_deposit_status(transaction=transaction)
     elif transaction.withdrawal:
         update_withdrawal_status(transaction=transaction)
+
+
+def upsert_transaction(tx_data: dict) -> Transaction:
+    """
+    Create or update a Transaction object from Fireblocks transaction data.
+    Data older than the stored data is ignored, as updates can arrive out of order.
+    """
+    created_at = datetime.fromtimestamp(tx_data['createdAt'] / 1000, tz=pytz.utc)
+    defaults = {
+        'asset_id': tx_data['assetId'],
+        'created_at': created_at,
+        'data': tx_data,
+    }
+    transaction, created = Transaction.objects.get_or_create(tx_id=tx_data['id'], defaults=defaults)
+    if not created and (tx_data.get('lastUpdated') or 0) > (transaction.data.get('lastUpdated') or 0):
+        transaction.data = tx_data
+        transaction.save()
+    return transaction
@@ -0,0 +1,51 @@
+"""
+Transaction fields copied out of the Fireblocks data. Kept free of model imports so that
+migrations can backfill the fields using the historical Transaction model.
+"""
+from typing import Callable
+
+from django.db import transaction
+
+# Fields copied from data, which must be written whenever data is
+DATA_FIELDS = ('status', 'tx_hash', 'destination_type', 'destination_id', 'destination_address')
+
+
+def data_field_values(data: dict) -> dict:
+    destination = data.get('destination') or {}
+    return {
+        'status': data.get('status'),
+        'tx_hash': data.get('txHash'),
+        'destination_type': destination.get('type'),
+        'destination_id': destination.get('id'),
+        'destination_address': data.get('destinationAddress'),
+    }
+
+
+def backfill_data_fields(model, batch_size: int = 1000, progress: Callable[[int], None] = None) -> int:
+    """
+    Copy the fields out of data for every row of the Transaction model given, in batches.
+    :return: number of rows updated
+    """
+    count = 0
+    last_tx_id = None
+
+    while True:
+        # Walk the primary key so each batch is an index range scan, however large the table
+        queryset = model.objects.order_by('tx_id').only('tx_id', 'data')
+        if last_tx_id is not None:
+            queryset = queryset.filter(tx_id__gt=last_tx_id)
+        batch = list(queryset[:batch_size])
+        if not batch:
+            break
+
+        for tx in batch:
+            for field, value in data_field_values(tx.data).items():
+                setattr(tx, field, value)
+        with transaction.atomic():
+            model.objects.bulk_update(batch, DATA_FIELDS)
+
+        count += len(batch)
+        last_tx_id = batch[-1].tx_id
+        if progress is not None:
+            progress(count)
+    return count
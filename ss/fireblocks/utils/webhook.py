@@ -0,0 +1,91 @@
+"""
+Handling of webhook notifications sent by Fireblocks.
+https://docs.fireblocks.com/api/#webhooks
+"""
+import base64
+import binascii
+import logging
+import os.path
+from functools import lru_cache
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from django_fsm import TransitionNotAllowed
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+
+from avalanche.models import AtomicTx
+from avalanche.utils.tx_builder import check_for_signature
+from staking.fill import update_fill_job_status
+from staking.models import FillJob
+
+from ..models import Transaction
+from .transaction import match_transaction, update_status, upsert_transaction
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_EVENTS = ('TRANSACTION_CREATED', 'TRANSACTION_STATUS_UPDATED')
+
+
+@lru_cache
+def _load_public_key(public_key: str):
+    if '-----BEGIN PUBLIC KEY-----' not in public_key:
+        # Setting is a file path to the public key
+        with open(os.path.abspath(public_key), 'rb') as f:
+            public_key = f.read()
+    else:
+        public_key = public_key.encode()
+    return serialization.load_pem_public_key(public_key)
+
+
+def verify_signature(body: bytes, signature: str) -> bool:
+    """
+    Check the base64 encoded RSA-SHA512 signature Fireblocks sends with each webhook.
+    """
+    if settings.FIREBLOCKS_WEBHOOK_PUBLIC_KEY is None:
+        logger.error('Unable to verify webhook because the Fireblocks webhook public key is not set')
+        return False
+
+    public_key = _load_public_key(settings.FIREBLOCKS_WEBHOOK_PUBLIC_KEY)
+    try:
+        public_key.verify(base64.b64decode(signature, validate=True), body, padding.PKCS1v15(), hashes.SHA512())
+    except (binascii.Error, InvalidSignature):
+        return False
+    return True
+
+
+def _update_linked_objects(transaction: Transaction):
+    """
+    Apply the Fireblocks transaction state to every object waiting on it.
+    """
+    try:
+        if transaction.deposit is None and transaction.withdrawal is None:
+            match_transaction(transaction)
+        else:
+            update_status(transaction)
+    except TransitionNotAllowed as e:
+        # Repeated notifications may attempt a transition that has already happened
+        logger.warning(e)
+
+    for tx in AtomicTx.objects.filter(fireblocks_tx_id=transaction.tx_id, status=AtomicTx.STATUS.AWAITING_SIGNATURE):
+        check_for_signature(tx, transaction_data=transaction.data)
+
+    for job in FillJob.objects.filter(fireblocks_transaction_id=transaction.tx_id, status=FillJob.STATUS.PENDING):
+        update_fill_job_status(job, transaction.data)
+
+
+def process_webhook(payload: dict):
+    event_type = payload.get('type')
+    if event_type not in TRANSACTION_EVENTS:
+        logger.info(f'Ignoring Fireblocks webhook of type {event_type}')
+        return None
+
+    # If updating a linked object fails the Transaction is not stored either, so that the
+    # notification Fireblocks retries is not ignored as already seen
+    with db_transaction.atomic():
+        transaction = upsert_transaction(payload['data'])
+        logger.info(f'Received {event_type} for Transaction {transaction} with status {transaction.status}')
+        _update_linked_objects(transaction)
+    return transaction
@@ -0,0 +1,29 @@
+import json
+import logging
+
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .utils.webhook import process_webhook, verify_signature
+
+logger = logging.getLogger(__name__)
+
+
+@csrf_exempt
+@require_POST
+def webhook(request):
+    """
+    Receive transaction notifications from Fireblocks.
+    """
+    if not verify_signature(request.body, request.headers.get('Fireblocks-Signature', '')):
+        logger.warning('Rejected Fireblocks webhook with an invalid signature')
+        return HttpResponseForbidden()
+
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return HttpResponseBadRequest()
+
+    process_webhook(payload)
+    return HttpResponse()
@@ -179,11 +179,37 @@ FIREBLOCKS_XPUB = env('FIREBLOCKS_XPUB')
 FIREBLOCKS_API_KEY = env('FIREBLOCKS_API_KEY', default=None)
 # The private key can be either a file path to the key on disk or can directly contain the private key data
 FIREBLOCKS_PRIVATE_KEY = env('FIREBLOCKS_PRIVATE_KEY', default=None)
+# Public key used to verify webhook signatures, either a file path or the PEM key data. Webhooks are rejected if unset
+FIREBLOCKS_WEBHOOK_PUBLIC_KEY = env('FIREBLOCKS_WEBHOOK_PUBLIC_KEY', default=None)
 
 FIREBLOCKS_DEFAULT_VAULT_ID = 0
 
+# Fireblocks API client tuning. The rate limit is in requests per second for each process.
+FIREBLOCKS_API_POOL_SIZE = env.int('FIREBLOCKS_API_POOL_SIZE', default=10)
+FIREBLOCKS_API_CONNECT_TIMEOUT = env.float('FIREBLOCKS_API_CONNECT_TIMEOUT', default=3.05)
+FIREBLOCKS_API_READ_TIMEOUT = env.float('FIREBLOCKS_API_READ_TIMEOUT', default=30)
+FIREBLOCKS_API_MAX_RETRIES = env.int('FIREBLOCKS_API_MAX_RETRIES', default=5)
+FIREBLOCKS_API_BACKOFF_FACTOR = env.float('FIREBLOCKS_API_BACKOFF_FACTOR', default=0.5)
+FIREBLOCKS_API_RATE_LIMIT = env.float('FIREBLOCKS_API_RATE_LIMIT', default=5)
+FIREBLOCKS_API_BURST = env.int('FIREBLOCKS_API_BURST', default=10)
+# Seconds a vault balance read from Fireblocks is reused for
+FIREBLOCKS_BALANCE_CACHE_TTL = env.int('FIREBLOCKS_BALANCE_CACHE_TTL', default=10)
+# Concurrent requests made while importing from Fireblocks, at most FIREBLOCKS_API_POOL_SIZE
+FIREBLOCKS_IMPORT_WORKERS = env.int('FIREBLOCKS_IMPORT_WORKERS', default=4)
+# Send every NEW AtomicTx of a processing run to Fireblocks as a single raw signing request
+FIREBLOCKS_BATCH_SIGNING = env.bool('FIREBLOCKS_BATCH_SIGNING', default=False)
+
 CONTRACT_STAKING = env('CONTRACT_STAKING', default=None)
 
 CONTRACT_ORACLE = env('CONTRACT_ORACLE', default=None)
 
 CUSTODY_WALLET_ADDRESS = env('CUSTODY_WALLET_ADDRESS', default=None)
+
+# Avalanche node HTTP client tuning. Reads are retried with exponential backoff, tx issuance never is.
+AVAX_RPC_POOL_SIZE = env.int('AVAX_RPC_POOL_SIZE', default=10)
+AVAX_RPC_CONNECT_TIMEOUT = env.float('AVAX_RPC_CONNECT_TIMEOUT', default=3.05)
+AVAX_RPC_READ_TIMEOUT = env.float('AVAX_RPC_READ_TIMEOUT', default=30)
+AVAX_RPC_MAX_RETRIES = env.int('AVAX_RPC_MAX_RETRIES', default=3)
+AVAX_RPC_BACKOFF_FACTOR = env.float('AVAX_RPC_BACKOFF_FACTOR', default=0.5)
+# Encoding used for transactions and UTXOs sent to and read from the node, either hex or cb58
+AVAX_RPC_ENCODING = env('AVAX_RPC_ENCODING', default='hex')
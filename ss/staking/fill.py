@@ -60,7 +60,8 @@ class Fill:
 
         # Check we have enough balance to make the tx.
         # TODO: Handle fees
-        balance = self.fb_client.available_balance_wei(VAULT_ACCOUNT, ASSET_ID)
+        # Read the balance from Fireblocks, a cached balance may predate funds spent by another worker
+        balance = self.fb_client.available_balance_wei(VAULT_ACCOUNT, ASSET_ID, fresh=True)
         if balance < deficit:
             logger.info(f'Custody balance {balance} is below deficit of {deficit}')
             return
@@ -106,20 +107,26 @@ class Fill:
 
         try:
             tx = self.fb_client.get_transaction_by_id(job.fireblocks_transaction_id)
-            if tx['status'] == TRANSACTION_STATUS_COMPLETED:
-                logger.info(f"Found completed transaction for job {job.id}")
-                job.complete()
-                job.save()
-                return
-
-            if tx['status'] == TRANSACTION_STATUS_FAILED:
-                logger.warning(f"Found failed transaction for job {job.id}")
-                job.fail()
-                job.save()
-                return
-
-            logger.info(f"Transaction state is {tx['status']}, skipping.")
-
         except FireblocksApiException as e:
             logger.exception("Failed to load transaction by id")
             return
+        update_fill_job_status(job, tx)
+
+
+def update_fill_job_status(job: FillJob, tx: dict):
+    """
+    Complete or fail a pending FillJob given the data of its Fireblocks transaction.
+    """
+    if tx['status'] == TRANSACTION_STATUS_COMPLETED:
+        logger.info(f"Found completed transaction for job {job.id}")
+        job.complete()
+        job.save()
+        return
+
+    if tx['status'] == TRANSACTION_STATUS_FAILED:
+        logger.warning(f"Found failed transaction for job {job.id}")
+        job.fail()
+        job.save()
+        return
+
+    logger.info(f"Transaction state is {tx['status']}, skipping.")
@@ -3,9 +3,7 @@ import random
 
 from web3 import Web3
 
-from django.conf import settings
-
-from avalanche.api import AvalancheClient
+from avalanche.api import get_avalanche_client
 
 logger = logging.Logger(__file__)
 
@@ -23,7 +21,7 @@ class Staking:
         min_staking_period = 14 * 24 * 60 * 60  # seconds
 
         # Load validator data
-        self.client = AvalancheClient(RPC_URL=settings.AVAX_RPC_URL)
+        self.client = get_avalanche_client()
         validators = self.client.platform_get_current_validators()
         print([v.free_space for v in validators])
 
@@ -97,6 +97,8 @@ class TestFillTask(TestCase):
         runner.run_fill()
 
         self.assertEqual(FillJob.objects.count(), 1)
+        # The balance is read from Fireblocks rather than the cache before spending
+        balance_mock.assert_called_once_with(mock.ANY, mock.ANY, fresh=True)
         job = FillJob.objects.first()
         self.assertEqual(job.status, FillJob.STATUS.PENDING)
 